@@ -1,13 +1,58 @@
+import time
+_import_start = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from api.routes import recommend
+from core.agents.orchestrator import warm_up
+from core.rag.nomic_embedder import get_embedding_cache_stats, get_embedding_batcher_stats
+from core.agents.career_intent import get_career_resolver_stats
+from core.services.response_cache import get_response_cache_stats
+from core.services.execution import get_pipeline_stats
+from core.agents.explanation_agent import get_explanation_stats
+from core.services.explanation_cache import get_explanation_cache_stats
+import asyncio
+import traceback
 import uvicorn
 import os
 
+# Startup state reported by /health/ready
+startup_state = {
+    "ready": False,
+    "error": None,
+    "timings": {"api_imports": time.perf_counter() - _import_start}
+}
+
+
+def run_warm_up():
+    """Load the embedding model, vector index and catalog, recording per-component timings"""
+    start = time.perf_counter()
+    try:
+        startup_state["timings"].update(warm_up())
+        startup_state["ready"] = True
+    except Exception as e:
+        startup_state["error"] = f"{type(e).__name__}: {e}"
+        print(f"❌ Warm-up failed: {e}")
+        traceback.print_exc()
+    startup_state["timings"]["warm_up_total"] = time.perf_counter() - start
+    print(f"🔥 Warm-up finished: {startup_state['timings']}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so /health/live answers immediately while
+    # /health/ready stays 503 until the model and index are loaded
+    asyncio.get_running_loop().run_in_executor(None, run_warm_up)
+    yield
+
+
 app = FastAPI(
     title="Agentic Course Recommendation API",
     description="AI-powered course recommendation system using RAG and LLMs",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS Configuration
@@ -34,6 +79,36 @@ app.include_router(recommend.router, tags=["Recommendations"])
 async def root():
     return {"message": "Agentic Course Recommendation API is running 🚀"}
 
+@app.get("/health/live")
+async def health_live():
+    """Liveness: the process is up and serving HTTP"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def health_ready():
+    """Readiness: model and index are loaded; route traffic only when this returns 200"""
+    body = {
+        "status": "ready" if startup_state["ready"] else "starting",
+        "error": startup_state["error"],
+        "timings_seconds": {k: round(v, 4) for k, v in startup_state["timings"].items()}
+    }
+    if startup_state["error"]:
+        body["status"] = "failed"
+    return JSONResponse(body, status_code=200 if startup_state["ready"] else 503)
+
+@app.get("/metrics")
+async def metrics():
+    """Cache counters for monitoring how much work is being saved under real traffic"""
+    return {
+        "embedding_cache": get_embedding_cache_stats(),
+        "embedding_batcher": get_embedding_batcher_stats(),
+        "career_resolver": get_career_resolver_stats(),
+        "response_cache": get_response_cache_stats(),
+        "pipeline": get_pipeline_stats(),
+        "explanations": get_explanation_stats(),
+        "explanation_cache": get_explanation_cache_stats()
+    }
+
 if __name__ == "__main__":
     # Run with uvicorn
     # Host 0.0.0.0 allows access from other containers/machines
@@ -1,11 +1,62 @@
+from typing import Dict, Any, AsyncIterator
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from api.schemas.recommendation import UserProfile, RecommendationResponse, RecommendationResult
-from core.agents.orchestrator import recommend_courses
+from core.services.recommend_service import cached_recommend_courses, cached_recommend_courses_stream
+from core.rag.loader import get_course_features, feature_row, display_fields
 import traceback
+import json
 import uuid
 
 router = APIRouter()
 
+
+def map_result(item: Dict[str, Any], index: int) -> RecommendationResult:
+    """
+    Map one pipeline result to the API schema
+
+    Args:
+        item: Result from recommend_courses()
+        index: 1-based rank
+
+    Returns:
+        RecommendationResult
+    """
+    meta = item.get("metadata", {})
+
+    # Indexed courses read the display strings from the course feature table
+    # (extracted from the same document, so only when the content hash matches)
+    row = feature_row(meta) if meta.get("content_hash") else None
+    if row is not None:
+        fields = get_course_features().display(row)
+    else:
+        fields = display_fields(item.get("document", ""))
+
+    return RecommendationResult(
+        id=str(uuid.uuid4()),
+        rank=index,
+        course_name=item.get("course", "Unknown"),
+        university=meta.get("campus", "Unknown"),
+        department=meta.get("department", "Unknown"),
+        location=meta.get("location", "Unknown"),
+        match_score=item.get("score", 0.0),
+        career_opportunities=fields["career_opportunities"],
+        study_language=fields["study_language"],
+        study_method=fields["study_method"],
+        duration=meta.get("duration", "Unknown"),
+        requirements=fields["requirements"],
+        course_fee=fields["course_fee"],
+        explanation=item.get("explanation", "No explanation provided."),
+        tags=[
+            f"{item.get('score', 0.0):.0f}%", 
+            fields["study_language"], 
+            fields["study_method"]
+        ],
+        url=meta.get("url", "Null"),
+        isSelected=False
+    )
+
+
 @router.post("/recommend", response_model=RecommendationResponse)
 async def get_recommendations(profile: UserProfile):
     """
@@ -15,9 +66,9 @@ async def get_recommendations(profile: UserProfile):
         # Convert Pydantic model to dict
         user_data = profile.model_dump(exclude_none=True)
         
-        # Call the orchestrator
+        # Call the orchestrator (through the response cache)
         # We use default k values for now, can be parameterized if needed
-        response = await recommend_courses(user_data, initial_k=25, final_k=10, explain_top_n=5)
+        response = await cached_recommend_courses(user_data, initial_k=25, final_k=10, explain_top_n=5)
         
         if response["status"] == "error":
             # If it's a critical error, we might still want to return a 200 with error status
@@ -25,79 +76,9 @@ async def get_recommendations(profile: UserProfile):
             pass
 
         # Map responses to schema
-        mapped_recommendations = []
-        if response.get("results"):
-            for index, item in enumerate(response["results"], start=1):
-                meta = item.get("metadata", {})
-
-                # Helper to extract value from document text
-                doc_text = item.get("document", "")
-                
-                def extract_field(label):
-                    try:
-                        # Case insensitive search
-                        lower_doc = doc_text.lower()
-                        lower_label = label.lower()
-                        
-                        if lower_label in lower_doc:
-                            # Find start index using lower case
-                            start_idx = lower_doc.find(lower_label) + len(label)
-                            # Extract substring from original text
-                            substring = doc_text[start_idx:]
-                            
-                            # Get first line
-                            part = substring.split("\n")[0].strip()
-                            
-                            # If empty, check next line (handle formatting where value is on next line)
-                            if not part and "\n" in substring:
-                                part = substring.split("\n")[1].strip()
-                                
-                            return part.strip(": ")
-                    except:
-                        return "N/A"
-                    return "N/A"
-
-                # More robust extraction for multiline fields
-                def extract_multiline(label):
-                    try:
-                        lower_doc = doc_text.lower()
-                        lower_label = label.lower()
-                        
-                        if lower_label in lower_doc:
-                            start_idx = lower_doc.find(lower_label) + len(label)
-                            content = doc_text[start_idx:]
-                            
-                            # Take content up to next double newline or end
-                            if "\n\n" in content:
-                                return content.split("\n\n")[0].strip().strip(": ")
-                            return content.strip().strip(": ")
-                    except:
-                        return "N/A"
-                    return "N/A"
-
-                mapped_recommendations.append(RecommendationResult(
-                    id=str(uuid.uuid4()),
-                    rank=index,
-                    course_name=item.get("course", "Unknown"),
-                    university=meta.get("campus", "Unknown"),
-                    department=meta.get("department", "Unknown"),
-                    location=meta.get("location", "Unknown"),
-                    match_score=item.get("score", 0.0),
-                    career_opportunities=extract_multiline("Career Opportunities"),
-                    study_language=extract_field("Study Language"),
-                    study_method=extract_field("Study Method"),
-                    duration=meta.get("duration", "Unknown"),
-                    requirements=extract_multiline("Admission Requirements"),
-                    course_fee=extract_field("Fees"),
-                    explanation=item.get("explanation", "No explanation provided."),
-                    tags=[
-                        f"{item.get('score', 0.0):.0f}%", 
-                        extract_field("Study Language"), 
-                        extract_field("Study Method")
-                    ],
-                    url=meta.get("url", "Null"),
-                    isSelected=False
-                ))
+        mapped_recommendations = [
+            map_result(item, index) for index, item in enumerate(response.get("results") or [], start=1)
+        ]
         
         return RecommendationResponse(
             status=response.get("status", "success"),
@@ -110,3 +91,78 @@ async def get_recommendations(profile: UserProfile):
         print(f"API Error: {e}")
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def recommendation_events(user_data: Dict[str, Any]) -> AsyncIterator[str]:
+    """
+    /recommend/stream body: pipeline progress as Server-Sent Events
+
+    Events:
+        warnings         {"warnings"}: validation warnings, always first
+        recommendations  RecommendationResponse: the ranked list as soon as ranking is done
+                         (template explanations), or the error/blocked status with no courses
+        explanation      {"rank", "id", "explanation", "source"}: final explanation of a top
+                         course as it is generated ("llm", "template" or "cache")
+        done             {"status"}: last event
+        error            {"detail"}: pipeline failure after the stream started
+    """
+    recommendations = []
+    try:
+        async for event, payload in cached_recommend_courses_stream(user_data, initial_k=25, final_k=10,
+                                                                    explain_top_n=5):
+            if event == "warnings":
+                yield sse_event("warnings", payload)
+            elif event == "ranked":
+                recommendations = [
+                    map_result(item, index) for index, item in enumerate(payload["results"], start=1)
+                ]
+                yield sse_event("recommendations", RecommendationResponse(
+                    status="success",
+                    recommendations=recommendations,
+                    warnings=payload["warnings"],
+                    errors=[]
+                ).model_dump())
+            elif event == "explanation":
+                result = recommendations[payload["index"]]
+                result.explanation = payload["explanation"]
+                yield sse_event("explanation", {
+                    "rank": result.rank,
+                    "id": result.id,
+                    "explanation": payload["explanation"],
+                    "source": payload["source"]
+                })
+            elif event == "complete":
+                if payload.get("status") != "success":
+                    yield sse_event("recommendations", RecommendationResponse(
+                        status=payload.get("status", "error"),
+                        recommendations=[],
+                        warnings=payload.get("warnings", []),
+                        errors=payload.get("errors", [])
+                    ).model_dump())
+                yield sse_event("done", {"status": payload.get("status", "success")})
+    except Exception as e:
+        # Headers are already sent; report the failure in-band
+        print(f"API Error: {e}")
+        traceback.print_exc()
+        yield sse_event("error", {"detail": str(e)})
+
+
+@router.post("/recommend/stream")
+async def stream_recommendations(profile: UserProfile):
+    """
+    Stream course recommendations as Server-Sent Events.
+
+    Results are sent as soon as ranking finishes, before the explanations;
+    see recommendation_events() for the event sequence.
+    """
+    user_data = profile.model_dump(exclude_none=True)
+    return StreamingResponse(
+        recommendation_events(user_data),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,7 +1,29 @@
 """
 Career Intent Classifier - Maps career goals to allowed course domains
+
+Courses carry a career bitset (bit j = j-th CAREER_DOMAIN_MAP career whose
+domains occur in the course title/department), computed by build_index.py
+and stored in the index metadata with the map version. A student's goal is
+resolved to its bits once (CareerGoalResolver memoizes goals), so every
+domain check is a single bit test.
 """
-from typing import List, Dict, Any
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, FrozenSet, Tuple
+
+import numpy as np
+
+from core.rag.loader import get_course_features, feature_row
+from utils.keyword_matcher import KeywordMatcher
+from utils.config import (
+    CAREER_RESOLVER_CACHE_SIZE,
+    CAREER_EMBEDDING_FALLBACK,
+    CAREER_SIMILARITY_THRESHOLD,
+)
 
 
 # Career to allowed course domains mapping
@@ -106,32 +128,307 @@ CAREER_DOMAIN_MAP = {
 }
 
 
-def infer_allowed_domains(career_goal: str) -> List[str]:
+# One precompiled scan finds every career whose domains occur in a course text
+CAREER_MATCHER = KeywordMatcher(CAREER_DOMAIN_MAP)
+
+# Bit j of a course's career_bits = CAREERS[j]
+CAREERS = list(CAREER_DOMAIN_MAP.keys())
+if len(CAREERS) > 63:
+    raise ValueError("career_bits is stored as a signed 64-bit integer (at most 63 careers)")
+
+# Stored with the index; a different value means the bitsets are stale
+CAREER_MAP_VERSION = hashlib.sha1(
+    json.dumps(CAREER_DOMAIN_MAP, sort_keys=False).encode("utf-8")
+).hexdigest()[:12]
+
+
+def career_bits(course_text: str) -> int:
     """
-    Infer allowed course domains based on career goal.
+    Career bitset of a course text (title + department).
     
     Args:
-        career_goal: User's career goal (e.g., "Civil Engineer")
+        course_text: Course text to scan
         
     Returns:
-        List of allowed domain keywords, empty if no match found
+        Integer with bit j set if CAREERS[j] matches the text
     """
-    if not career_goal:
-        return []
+    matched = CAREER_MATCHER.match(course_text)
+    bits = 0
+    for j, career in enumerate(CAREERS):
+        if career in matched:
+            bits |= 1 << j
+    return bits
+
+
+# Whole-word patterns of the career keys, for the parts of a multi-goal input
+KEY_WORD_PATTERNS = {key: re.compile(rf"\b{re.escape(key)}\b") for key in CAREER_DOMAIN_MAP}
+
+
+class CareerGoalResolver:
+    """
+    Maps free-text career goals to CAREER_DOMAIN_MAP careers.
+
+    Resolution order for each goal (or each part of a multi-goal input such
+    as "Software Engineer, Data Scientist", which resolves to the union):
+    exact key, then substring match with a key (for a single goal either
+    way round, as infer_allowed_domains always did; for a part, only a whole
+    key as whole words), then, if enabled, cosine similarity between the goal
+    embedding and precomputed key embeddings.
+    Results are memoized in a bounded LRU keyed on the normalized goal.
+    """
+
+    # Separators between goals in a multi-goal input
+    SPLIT_PATTERN = re.compile(r"\s*(?:[,;/|&+]|\band\b|\bor\b)\s*")
+
+    def __init__(
+        self,
+        capacity: int = CAREER_RESOLVER_CACHE_SIZE,
+        embedding_fallback: bool = CAREER_EMBEDDING_FALLBACK,
+        threshold: float = CAREER_SIMILARITY_THRESHOLD
+    ):
+        """
+        Args:
+            capacity: Maximum number of memoized goals (0 disables the cache)
+            embedding_fallback: Match unmapped goals by embedding similarity
+            threshold: Minimum cosine similarity for an embedding match
+        """
+        self.capacity = capacity
+        self.embedding_fallback = embedding_fallback
+        self.threshold = threshold
+        self._entries: "OrderedDict[str, FrozenSet[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_embeddings: Optional[np.ndarray] = None
+        self._key_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.methods = {"exact": 0, "substring": 0, "embedding": 0, "unresolved": 0}
+        self.resolve_seconds = 0.0
+        self.max_resolve_seconds = 0.0
+
+    @staticmethod
+    def normalize(career_goal: str) -> str:
+        """Lowercase, whitespace-collapsed goal (the cache key)"""
+        return re.sub(r"\s+", " ", (career_goal or "").lower()).strip()
+
+    def resolve(self, career_goal: str) -> FrozenSet[str]:
+        """
+        Careers for a goal string.
+        
+        Args:
+            career_goal: User's career goal (one or several)
+            
+        Returns:
+            Set of CAREER_DOMAIN_MAP keys, empty if nothing matches
+        """
+        key = self.normalize(career_goal)
+        if not key:
+            return frozenset()
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        start = time.perf_counter()
+        careers = self._resolve_uncached(key)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.resolve_seconds += elapsed
+            self.max_resolve_seconds = max(self.max_resolve_seconds, elapsed)
+            if self.capacity > 0:
+                self._entries[key] = careers
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.capacity:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return careers
+
+    def _resolve_uncached(self, goal: str) -> FrozenSet[str]:
+        # The whole string first, so a goal that is already a key is never split
+        if goal in CAREER_DOMAIN_MAP:
+            self._count("exact")
+            return frozenset([goal])
+
+        parts = [p for p in self.SPLIT_PATTERN.split(goal) if p]
+        if len(parts) <= 1:
+            # Single goal: the original exact / two-way substring rules
+            career, method = self._resolve_part(goal, fragment=False)
+            self._count(method)
+            return frozenset([career]) if career else frozenset()
+
+        careers = set()
+        for part in parts:
+            career, method = self._resolve_part(part, fragment=True)
+            self._count(method)
+            if career:
+                careers.add(career)
+        return frozenset(careers)
+
+    def _resolve_part(self, part: str, fragment: bool) -> Tuple[Optional[str], str]:
+        # Direct match
+        if part in CAREER_DOMAIN_MAP:
+            return part, "exact"
+
+        if fragment:
+            # Fragments of a multi-goal input are short ("it", "law"): only a whole
+            # key appearing as whole words counts, never the fragment inside a key
+            for key, pattern in KEY_WORD_PATTERNS.items():
+                if pattern.search(part):
+                    return key, "substring"
+        else:
+            # Fuzzy match - check if any key is contained in career goal
+            for key in CAREER_DOMAIN_MAP:
+                if key in part or part in key:
+                    return key, "substring"
+
+        if self.embedding_fallback:
+            career = self._nearest_career(part)
+            if career:
+                return career, "embedding"
+        return None, "unresolved"
+
+    def _count(self, method: str) -> None:
+        with self._lock:
+            self.methods[method] += 1
+
+    def warm_up(self) -> None:
+        """Embed the career keys (otherwise done on the first fallback)"""
+        if self.embedding_fallback:
+            self._career_key_embeddings()
+
+    def _career_key_embeddings(self) -> np.ndarray:
+        if self._key_embeddings is None:
+            with self._key_lock:
+                if self._key_embeddings is None:
+                    from core.rag.nomic_embedder import embed_text_array
+                    self._key_embeddings = np.stack([
+                        embed_text_array(_goal_text(career), normalize=True) for career in CAREERS
+                    ])
+        return self._key_embeddings
+
+    def _nearest_career(self, part: str) -> Optional[str]:
+        from core.rag.nomic_embedder import embed_text_array
+
+        try:
+            keys = self._career_key_embeddings()
+            vec = embed_text_array(_goal_text(part), normalize=True)
+        except Exception as e:
+            print(f"⚠️ Career embedding fallback failed: {e}")
+            return None
+        if vec.size != keys.shape[1]:
+            return None
+        similarities = keys @ vec
+        best = int(np.argmax(similarities))
+        return CAREERS[best] if similarities[best] >= self.threshold else None
+
+    def clear(self) -> None:
+        """Drop all memoized goals (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rate, resolution methods and miss latency for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "resolutions": dict(self.methods),
+                "avg_resolve_ms": round(self.resolve_seconds / self.misses * 1000, 3) if self.misses else 0.0,
+                "max_resolve_ms": round(self.max_resolve_seconds * 1000, 3),
+            }
+
+
+def _goal_text(goal: str) -> str:
+    """Text embedded for a career key or goal (same template on both sides)"""
+    return f"Career goal: {goal}"
+
+
+_resolver: Optional[CareerGoalResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_career_resolver() -> CareerGoalResolver:
+    """
+    Get or create the career-goal resolver (singleton)
     
-    career_goal_lower = career_goal.lower().strip()
+    Returns:
+        CareerGoalResolver instance
+    """
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = CareerGoalResolver()
+    return _resolver
+
+
+def get_career_resolver_stats() -> Dict[str, Any]:
+    """
+    Career-goal resolver counters
     
-    # Direct match
-    if career_goal_lower in CAREER_DOMAIN_MAP:
-        return CAREER_DOMAIN_MAP[career_goal_lower]
+    Returns:
+        Resolver statistics, or an empty dict if no goal was resolved yet
+    """
+    if _resolver is None:
+        return {}
+    return _resolver.stats()
+
+
+def resolve_careers(career_goal: str) -> FrozenSet[str]:
+    """
+    Resolve a career goal to its CAREER_DOMAIN_MAP keys.
     
-    # Fuzzy match - check if any key is contained in career goal
-    for key, domains in CAREER_DOMAIN_MAP.items():
-        if key in career_goal_lower or career_goal_lower in key:
-            return domains
+    Args:
+        career_goal: User's career goal (e.g., "Civil Engineer" or "Software Engineer, Data Scientist")
+        
+    Returns:
+        Set of matching career keys, empty if no match found
+    """
+    return get_career_resolver().resolve(career_goal)
+
+
+def career_goal_bit(career_goal: str) -> int:
+    """
+    Career bits of a student's goal (memoized by the resolver).
+    
+    Args:
+        career_goal: User's career goal
+        
+    Returns:
+        Mask with one bit per resolved career, 0 if the goal has no mapping
+    """
+    bits = 0
+    for career in resolve_careers(career_goal):
+        bits |= 1 << CAREERS.index(career)
+    return bits
+
+
+def infer_allowed_domains(career_goal: str) -> List[str]:
+    """
+    Infer allowed course domains based on career goal.
     
-    # No match found
-    return []
+    Args:
+        career_goal: User's career goal (e.g., "Civil Engineer")
+        
+    Returns:
+        List of allowed domain keywords (union for several goals), empty if no match found
+    """
+    careers = resolve_careers(career_goal)
+    domains: List[str] = []
+    for career in CAREERS:
+        if career in careers:
+            domains.extend(d for d in CAREER_DOMAIN_MAP[career] if d not in domains)
+    return domains
 
 
 def matches_career_domain(career_goal: str, course_text: str) -> bool:
@@ -145,31 +442,40 @@ def matches_career_domain(career_goal: str, course_text: str) -> bool:
     Returns:
         True if matches career domain, False otherwise
     """
-    allowed_domains = infer_allowed_domains(career_goal)
+    careers = resolve_careers(career_goal)
     
     # If no specific domain mapping, allow all (permissive fallback)
-    if not allowed_domains:
+    if not careers:
         return True
     
-    course_text_lower = course_text.lower()
-    
     # Check if any allowed domain keyword appears in course text
-    return any(domain in course_text_lower for domain in allowed_domains)
+    return bool(careers & CAREER_MATCHER.match(course_text))
 
 
-def get_domain_penalty(user: Dict[str, Any], course_meta: Dict[str, Any]) -> float:
+def course_matches_career(career_goal: str, course_meta: Dict[str, Any]) -> bool:
     """
-    Calculate penalty score for courses that don't match career domain.
+    Check if a retrieved course matches the career domain.
+    Indexed courses are a bit test on the stored career bitset (or the
+    course feature table's when the index predates the current map).
     
     Args:
-        user: User profile with career_goal
+        career_goal: User's career goal
         course_meta: Course metadata
         
     Returns:
-        Penalty value (0 = no penalty, higher = more penalty)
+        True if matches career domain (or the goal has no mapping), False otherwise
     """
-    career_goal = user.get("career_goal", "")
-    
+    goal_bit = career_goal_bit(career_goal or "")
+    if not goal_bit:
+        return True
+
+    if "career_bits" in course_meta and course_meta.get("career_map_version") == CAREER_MAP_VERSION:
+        return bool(int(course_meta["career_bits"]) & goal_bit)
+
+    row = feature_row(course_meta)
+    if row is not None:
+        return bool(int(get_course_features().career_bits[row]) & goal_bit)
+
     # Build searchable course text
     course_text = " ".join([
         course_meta.get("course", ""),
@@ -178,8 +484,23 @@ def get_domain_penalty(user: Dict[str, Any], course_meta: Dict[str, Any]) -> flo
         course_meta.get("Department", ""),
         course_meta.get("Career Opportunities", ""),
     ])
+    return matches_career_domain(career_goal, course_text)
+
+
+def get_domain_penalty(user: Dict[str, Any], course_meta: Dict[str, Any]) -> float:
+    """
+    Calculate penalty score for courses that don't match career domain.
+    
+    Args:
+        user: User profile with career_goal
+        course_meta: Course metadata
+        
+    Returns:
+        Penalty value (0 = no penalty, higher = more penalty)
+    """
+    career_goal = user.get("career_goal", "")
     
-    if matches_career_domain(career_goal, course_text):
+    if course_matches_career(career_goal, course_meta):
         return 0.0  # No penalty - domain matches
     else:
         return 30.0  # Heavy penalty - domain mismatch
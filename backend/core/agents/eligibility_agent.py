@@ -1,5 +1,34 @@
-from typing import List, Dict, Any
-import re
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+
+from core.rag.loader import get_course_features, feature_row, CourseFeatureTable
+from core.services.eligibility_rules import entry_gates, has_ol_results, user_ielts_score
+from utils.keyword_matcher import KeywordMatcher
+from utils.config import ELIGIBILITY_ENTRY_GATES
+
+# Keywords that indicate A/L requirement
+AL_KEYWORDS = [
+    "a/l", "advanced level", "a level",
+    "physical science", "combined mathematics",
+    "physics", "chemistry", "biology",
+    "commerce stream", "arts stream",
+    "gce advanced"
+]
+
+# Exemption keywords (courses that accept O/L or foundation)
+EXEMPTION_KEYWORDS = [
+    "foundation", "diploma", "o/l only",
+    "ordinary level sufficient", "certificate"
+]
+
+# Course level indicators
+DEGREE_KEYWORDS = ["bachelor", "degree", "bsc", "b.sc", "beng", "b.eng"]
+
+AL_RULE_MATCHER = KeywordMatcher({
+    "al": AL_KEYWORDS,
+    "exemption": EXEMPTION_KEYWORDS,
+    "degree": DEGREE_KEYWORDS
+})
 
 def has_al_eligibility(user: Dict[str, Any]) -> bool:
     """
@@ -31,6 +60,14 @@ def course_requires_al(course_meta: Dict[str, Any]) -> bool:
     Returns:
         True if course requires A/L, False otherwise
     """
+    row = feature_row(course_meta)
+    if row is not None:
+        return bool(get_course_features().requires_al[row])
+    return parse_requires_al(course_meta)
+
+
+def parse_requires_al(course_meta: Dict[str, Any]) -> bool:
+    """A/L rule on the metadata strings (used to build the feature table)"""
     # Build searchable text from course metadata
     text = " ".join([
         str(course_meta.get("course", "")),
@@ -42,30 +79,18 @@ def course_requires_al(course_meta: Dict[str, Any]) -> bool:
         str(course_meta.get("Department", "")),
     ]).lower()
     
-    # Keywords that indicate A/L requirement
-    al_keywords = [
-        "a/l", "advanced level", "a level",
-        "physical science", "combined mathematics",
-        "physics", "chemistry", "biology",
-        "commerce stream", "arts stream",
-        "gce advanced"
-    ]
-    
-    # Exemption keywords (courses that accept O/L or foundation)
-    exemption_keywords = [
-        "foundation", "diploma", "o/l only",
-        "ordinary level sufficient", "certificate"
-    ]
+    # One scan for all keyword groups
+    found = AL_RULE_MATCHER.match(text)
     
     # Check if it requires A/L
-    requires_al = any(keyword in text for keyword in al_keywords)
+    requires_al = "al" in found
     
     # Check if it has exemptions
-    has_exemption = any(keyword in text for keyword in exemption_keywords)
+    has_exemption = "exemption" in found
     
     # Require A/L unless explicitly exempted
     # Also check course level indicators
-    is_degree = any(word in text for word in ["bachelor", "degree", "bsc", "b.sc", "beng", "b.eng"])
+    is_degree = "degree" in found
     
     # Degrees typically require A/L unless stated otherwise
     if is_degree and not has_exemption:
@@ -74,68 +99,115 @@ def course_requires_al(course_meta: Dict[str, Any]) -> bool:
     return requires_al and not has_exemption
 
 
-def is_eligible_for_course(user: Dict[str, Any], course_meta: Dict[str, Any]) -> bool:
+def course_requirements(course_meta: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Check if user meets eligibility requirements for a course.
-    Enforces A/L and IELTS requirements as HARD constraints.
+    A/L flag, IELTS minimum and O/L flag of a course.
+    Read from the course feature table when the course is in the catalog;
+    otherwise the same rules are applied to the metadata. Catalog courses
+    only carry IELTS/O-L requirements with ELIGIBILITY_ENTRY_GATES (index
+    metadata has no Entry Requirements, so these never applied to them).
     
     Args:
-        user: User profile dictionary
         course_meta: Course metadata dictionary
         
     Returns:
-        True if eligible, False otherwise
+        Dict with 'requires_al', 'ielts_min' (0.0 = none) and 'requires_ol'
+    """
+    row = feature_row(course_meta)
+    if row is not None:
+        features = get_course_features()
+        return {
+            "requires_al": bool(features.requires_al[row]),
+            "ielts_min": float(features.ielts_min[row]) if ELIGIBILITY_ENTRY_GATES else 0.0,
+            "requires_ol": bool(features.requires_ol[row]) and ELIGIBILITY_ENTRY_GATES
+        }
+
+    requirements = entry_gates(course_meta.get("Entry Requirements") or "")
+    requirements["requires_al"] = parse_requires_al(course_meta)
+    return requirements
+
+
+def meets_requirements(user: Dict[str, Any], requirements: Dict[str, Any]) -> bool:
+    """
+    Check a user against course requirements from course_requirements().
+    A/L, IELTS and O/L are HARD constraints (see core.services.eligibility_rules).
     """
-    
     # 1. Check A/L Requirement (HARD GATE)
     # =====================================
-    if course_requires_al(course_meta):
-        if not has_al_eligibility(user):
-            # STRICT: If course requires A/L and user doesn't have it, BLOCK
-            return False
-    
-    entry_req = (course_meta.get("Entry Requirements") or "").lower()
+    if requirements["requires_al"] and not has_al_eligibility(user):
+        # STRICT: If course requires A/L and user doesn't have it, BLOCK
+        return False
 
     # 2. Check IELTS Requirement
     # -------------------------
-    if "ielts" in entry_req:
-        # Extract required score if present (e.g., "IELTS 6.0")
-        required_score = 5.0 # Default minimum
-        match = re.search(r'ielts.*?(\d+\.?\d*)', entry_req)
-        if match:
-            try:
-                required_score = float(match.group(1))
-            except ValueError:
-                pass
-        
-        user_ielts_str = str(user.get("ielts") or user.get("ielts_score") or "0")
-        # Extract number from user string
-        user_score_match = re.search(r'(\d+\.?\d*)', user_ielts_str)
-        
-        if user_score_match:
-            try:
-                user_score = float(user_score_match.group(1))
-                if user_score < required_score:
-                    return False
-            except ValueError:
-                pass
-        elif "ielts" in entry_req and not user_ielts_str:
-             # Course requires IELTS but user didn't provide it
-             # Strict check: return False? Or be lenient?
-             # For now, let's be strict if it's a clear requirement
-             pass 
+    required_score = requirements["ielts_min"]
+    if required_score > 0:
+        user_score = user_ielts_score(user)
+        if user_score is not None and user_score < required_score:
+            return False
 
     # 3. Check O/L Requirement
     # -----------------------
-    if "o/l" in entry_req or "ordinary level" in entry_req:
-        user_ol = (user.get("ol_results") or "").lower()
-        if not user_ol:
-            # If O/L required but not provided
-            return False
+    if requirements["requires_ol"] and not has_ol_results(user):
+        # If O/L required but not provided
+        return False
             
     return True
 
 
+def is_eligible_for_course(user: Dict[str, Any], course_meta: Dict[str, Any]) -> bool:
+    """
+    Check if user meets eligibility requirements for a course.
+    Enforces A/L and IELTS requirements as HARD constraints.
+    
+    Args:
+        user: User profile dictionary
+        course_meta: Course metadata dictionary
+        
+    Returns:
+        True if eligible, False otherwise
+    """
+    return meets_requirements(user, course_requirements(course_meta))
+
+
+def eligibility_masks(user: Dict[str, Any],
+                      rows: Optional[np.ndarray] = None,
+                      features: Optional[CourseFeatureTable] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluate the A/L, IELTS and O/L rules for many courses at once as
+    boolean masks over the course feature table (same verdicts as
+    is_eligible_for_course on the index metadata; IELTS and O/L only with
+    ELIGIBILITY_ENTRY_GATES). scripts/benchmark_eligibility.py checks both.
+    
+    Args:
+        user: User profile dictionary
+        rows: Feature-table rows to evaluate (None = whole catalog)
+        features: Feature table (defaults to get_course_features())
+        
+    Returns:
+        Tuple of (eligible, blocked_by_al) masks aligned with rows;
+        blocked by other requirements = ~eligible & ~blocked_by_al
+    """
+    features = features or get_course_features()
+    requires_al = features.requires_al if rows is None else features.requires_al[rows]
+    ielts_min = features.ielts_min if rows is None else features.ielts_min[rows]
+    requires_ol = features.requires_ol if rows is None else features.requires_ol[rows]
+
+    # User-side facts are scalars, evaluated once per request
+    blocked_by_al = requires_al & (not has_al_eligibility(user))
+    eligible = ~blocked_by_al
+
+    if ELIGIBILITY_ENTRY_GATES:
+        user_score = user_ielts_score(user)
+        if user_score is not None:
+            eligible &= ~((ielts_min > 0) & (ielts_min > user_score))
+
+        if not has_ol_results(user):
+            eligible &= ~requires_ol
+
+    return eligible, blocked_by_al
+
+
 def filter_by_eligibility(user: Dict[str, Any],
                           candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
@@ -152,17 +224,30 @@ def filter_by_eligibility(user: Dict[str, Any],
     eligible = []
     blocked_by_al = []
     blocked_by_other = []
+    has_al = has_al_eligibility(user)
+
+    # Indexed candidates are evaluated in one batch over the feature table
+    rows = [feature_row(c.get("metadata", {})) for c in candidates]
+    indexed = [i for i, row in enumerate(rows) if row is not None]
+    verdicts = {}
+    if indexed:
+        ok, al_blocked = eligibility_masks(user, np.array([rows[i] for i in indexed], dtype=np.int64))
+        for i, is_ok, is_al in zip(indexed, ok.tolist(), al_blocked.tolist()):
+            verdicts[i] = "al" if is_al else ("eligible" if is_ok else "other")
     
-    for c in candidates:
-        meta = c.get("metadata", {})
+    for i, c in enumerate(candidates):
+        verdict = verdicts.get(i)
+        if verdict is None:
+            # Not in the feature table: per-course rules on the metadata
+            requirements = course_requirements(c.get("metadata", {}))
+            if requirements["requires_al"] and not has_al:
+                verdict = "al"
+            else:
+                verdict = "eligible" if meets_requirements(user, requirements) else "other"
         
-        # Check A/L requirement first
-        if course_requires_al(meta) and not has_al_eligibility(user):
+        if verdict == "al":
             blocked_by_al.append(c)
-            continue
-        
-        # Check other eligibility requirements
-        if is_eligible_for_course(user, meta):
+        elif verdict == "eligible":
             eligible.append(c)
         else:
             blocked_by_other.append(c)
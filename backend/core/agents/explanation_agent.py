@@ -1,5 +1,9 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 import asyncio
+import json
+import sqlite3
+import threading
+import time
 import sys
 import os
 
@@ -9,8 +13,16 @@ backend_dir = os.path.dirname(os.path.dirname(current_dir))
 sys.path.insert(0, backend_dir)
 
 # Import Gemini client and career intent checker
-from llm.deepseek_client import chat as gemini_chat
-from core.agents.career_intent import matches_career_domain
+from llm.deepseek_client import chat as gemini_chat, achat as gemini_achat, config as llm_config
+from core.agents.career_intent import course_matches_career
+from core.services.execution import stage_slot, run_stage
+from core.services.explanation_cache import get_explanation_cache, make_explanation_key
+from utils.config import (
+    EXPLANATION_LLM_ENABLED,
+    EXPLANATION_LLM_DEADLINE,
+    EXPLANATION_LLM_MODE,
+    EXPLANATION_CACHE_ENABLED,
+)
 
 
 # System prompt for Gemini
@@ -19,13 +31,40 @@ EXPLANATION_SYSTEM = (
     "Explain clearly and professionally in 3–4 short sentences."
 )
 
+# System prompt for the batched mode (one call, JSON output)
+BATCH_EXPLANATION_SYSTEM = (
+    "You are an academic counselor. "
+    "Reply with valid JSON only, no other text."
+)
+
+# Completion tokens allowed per course in a batched call
+BATCH_TOKENS_PER_COURSE = 160
+
+# Bump when the system prompts, build_explanation_prompt() or
+# build_batch_explanation_prompt() change (invalidates cached explanations)
+EXPLANATION_PROMPT_VERSION = "1"
+
+
+def explanation_prompt_version() -> str:
+    """Prompt version, explanation mode and LLM model: the explanation cache's version tag"""
+    return f"{EXPLANATION_PROMPT_VERSION}:{EXPLANATION_LLM_MODE}:{llm_config['model']}"
+
 
 # -------------------------------------------------------
 # 1️⃣ Simplified Explanation Prompt
 # -------------------------------------------------------
+def _meta_field(meta: Dict[str, Any], title_key: str, index_key: str, default: str) -> str:
+    """Field from raw course data (title-case keys) or index metadata (lowercase keys)"""
+    return meta.get(title_key) or meta.get(index_key) or default
+
+
 def build_explanation_prompt(user: Dict[str, Any], meta: Dict[str, Any]) -> str:
     """Simplified prompt to avoid Gemini safety filters"""
-    return f"""Explain why the {meta.get('Course', 'course')} at {meta.get('Location', 'this institution')} is a good match for a student interested in {user.get('interest_area', 'this field')} who wants to become a {user.get('career_goal', 'professional')}. The course offers {meta.get('Study Method', 'study')} for {meta.get('Duration', 'multiple years')} and leads to careers in {meta.get('Career Opportunities', 'relevant fields')}. Write 3-4 concise sentences."""
+    course = _meta_field(meta, "Course", "course", "course")
+    location = _meta_field(meta, "Location", "campus", "this institution")
+    study_method = _meta_field(meta, "Study Method", "study_method", "study")
+    duration = _meta_field(meta, "Duration", "duration", "multiple years")
+    return f"""Explain why the {course} at {location} is a good match for a student interested in {user.get('interest_area', 'this field')} who wants to become a {user.get('career_goal', 'professional')}. The course offers {study_method} for {duration} and leads to careers in {meta.get('Career Opportunities', 'relevant fields')}. Write 3-4 concise sentences."""
 
 
 # -------------------------------------------------------
@@ -40,8 +79,105 @@ def build_short_prompt(user: Dict[str, Any], meta: Dict[str, Any]) -> str:
 
 
 # -------------------------------------------------------
-# 3️⃣ Synchronous LLM wrapper
+# 3️⃣ Batched Multi-Course Prompt (one call, JSON output)
+# -------------------------------------------------------
+def build_batch_explanation_prompt(user: Dict[str, Any], metas: List[Dict[str, Any]]) -> Tuple[str, List[str]]:
+    """
+    One prompt for several courses: the student once, then one compact line per course
+
+    Args:
+        user: User profile dictionary
+        metas: Course metadata, in order
+
+    Returns:
+        (prompt, course ids) where ids are the short ids ("c1", "c2", ...) the model must answer with
+    """
+    ids = [f"c{i}" for i in range(1, len(metas) + 1)]
+    lines = []
+    for course_id, meta in zip(ids, metas):
+        fields = [
+            _meta_field(meta, "Course", "course", "course"),
+            _meta_field(meta, "Location", "campus", "this institution"),
+            _meta_field(meta, "Study Method", "study_method", "study"),
+            _meta_field(meta, "Duration", "duration", "multiple years"),
+        ]
+        lines.append(f"[{course_id}] " + " | ".join(str(f) for f in fields))
+    prompt = (
+        f"A student is interested in {user.get('interest_area', 'this field')} and wants to become a "
+        f"{user.get('career_goal', 'professional')}. For each course below (name | institution | study method | "
+        f"duration), explain in 2-3 concise sentences why it is a good match for this student.\n\n"
+        + "\n".join(lines)
+        + '\n\nReturn a JSON array with one object per course: [{"id": "c1", "explanation": "..."}]'
+    )
+    return prompt, ids
+
+
+def _load_json(text: str) -> Any:
+    """JSON from a model reply: as is, inside a ``` fence, or the outermost [...] span"""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("\n") + 1:] if "\n" in text else text
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    start, end = text.find("["), text.rfind("]")
+    if start != -1 and end > start:
+        try:
+            return json.loads(text[start:end + 1])
+        except ValueError:
+            pass
+    return None
+
+
+def parse_batch_explanations(text: str, ids: List[str]) -> Dict[str, str]:
+    """
+    Validate a batched reply
+
+    Accepts a JSON array of {"id", "explanation"} objects (also wrapped as
+    {"explanations": [...]}) or an object of id -> explanation. Items with an
+    unknown or repeated id or an empty explanation are dropped.
+
+    Args:
+        text: Model reply
+        ids: Course ids sent in the prompt
+
+    Returns:
+        Dict of course id -> explanation for the valid items (missing ids fall back per item)
+    """
+    data = _load_json(text or "")
+    if isinstance(data, dict):
+        if isinstance(data.get("explanations"), list):
+            data = data["explanations"]
+        else:
+            data = [{"id": k, "explanation": v} for k, v in data.items()]
+    if not isinstance(data, list):
+        return {}
+
+    valid_ids = set(ids)
+    explanations = {}
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        course_id = str(item.get("id", "")).strip()
+        explanation = item.get("explanation")
+        if course_id in valid_ids and course_id not in explanations \
+                and isinstance(explanation, str) and explanation.strip():
+            explanations[course_id] = explanation.strip()
+    return explanations
+
+
+# -------------------------------------------------------
+# 4️⃣ LLM wrappers (sync and async)
 # -------------------------------------------------------
+def _usable(response: Optional[str]) -> bool:
+    """False for empty responses and the client's "(LLM ...)" failure markers"""
+    return bool(response) and not response.startswith("(LLM unavailable") \
+        and not response.startswith("(LLM request timed out") \
+        and not response.startswith("(LLM returned empty")
+
+
 def try_llm_sync(prompt: str):
     """Get explanation from Gemini"""
     try:
@@ -52,7 +188,7 @@ def try_llm_sync(prompt: str):
         )
         
         # Check if response is valid
-        if response and not response.startswith("(LLM unavailable") and not response.startswith("(LLM request timed out") and not response.startswith("(LLM returned empty"):
+        if _usable(response):
             return response
         
         return None
@@ -62,64 +198,337 @@ def try_llm_sync(prompt: str):
         return None
 
 
+async def try_llm_async(prompt: str, timeout: float = 30, system: str = EXPLANATION_SYSTEM,
+                        max_tokens: int = 300) -> Optional[str]:
+    """Get explanation from Gemini on the pooled async client (None on failure)"""
+    try:
+        response = await gemini_achat(prompt, system=system, timeout=timeout, max_tokens=max_tokens)
+        return response if _usable(response) else None
+    except Exception as e:
+        print(f"⚠️ Gemini request failed: {type(e).__name__}: {e}")
+        return None
+
+
+# LLM explanation counters (per process)
+_stats_lock = threading.Lock()
+_llm_stats = {
+    "requests": 0, "prompts": 0, "llm": 0, "timed_out": 0, "failed": 0, "wall_seconds": 0.0,
+    "batch_calls": 0, "batch_courses": 0, "batch_fallbacks": 0
+}
+
+
+async def iter_llm_explanations(user: Dict[str, Any],
+                                candidates: List[Dict[str, Any]],
+                                deadline: Optional[float] = None) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Ask the LLM for every candidate's explanation concurrently, yielding each as it arrives
+
+    Prompts run at once, bounded by the shared "llm" stage limit; whatever
+    has not finished when the deadline passes is cancelled.
+
+    Args:
+        user: User profile dictionary
+        candidates: Candidates to explain (each with "metadata")
+        deadline: Seconds to wait for the whole batch (default EXPLANATION_LLM_DEADLINE)
+
+    Yields:
+        (candidate index, LLM explanation) in completion order; timed-out and failed prompts are skipped
+    """
+    if deadline is None:
+        deadline = EXPLANATION_LLM_DEADLINE
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    expires = loop.time() + deadline
+
+    async def explain(cand: Dict[str, Any]) -> Optional[str]:
+        async with stage_slot("llm"):
+            remaining = expires - loop.time()
+            if remaining <= 0:
+                return None
+            return await try_llm_async(build_explanation_prompt(user, cand["metadata"]), timeout=remaining)
+
+    tasks = {asyncio.ensure_future(explain(cand)): i for i, cand in enumerate(candidates)}
+    pending = set(tasks)
+    answered = failed = 0
+    try:
+        while pending:
+            remaining = expires - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None and task.result():
+                    answered += 1
+                    yield tasks[task], task.result()
+                else:
+                    failed += 1
+    finally:
+        # Also runs when the consumer stops early (e.g. a streaming client disconnects)
+        for task in pending:
+            task.cancel()
+        with _stats_lock:
+            _llm_stats["requests"] += 1
+            _llm_stats["prompts"] += len(tasks)
+            _llm_stats["llm"] += answered
+            _llm_stats["timed_out"] += len(pending)
+            _llm_stats["failed"] += failed
+            _llm_stats["wall_seconds"] += time.perf_counter() - start
+        if pending:
+            print(f"⏱️ {len(pending)}/{len(tasks)} LLM explanations missed the {deadline:.1f}s deadline")
+
+
+async def iter_batch_llm_explanations(user: Dict[str, Any],
+                                      candidates: List[Dict[str, Any]],
+                                      deadline: Optional[float] = None) -> AsyncIterator[Tuple[int, str]]:
+    """
+    One LLM call for all candidates (build_batch_explanation_prompt), with per-item fallback
+
+    Courses missing from the reply, or with an invalid item, are asked again
+    one prompt each (iter_llm_explanations) within what is left of the deadline.
+    If the call itself fails or times out, no per-course prompts are sent
+    (the caller's template fallback applies).
+
+    Args:
+        user: User profile dictionary
+        candidates: Candidates to explain (each with "metadata")
+        deadline: Seconds to wait for everything (default EXPLANATION_LLM_DEADLINE)
+
+    Yields:
+        (candidate index, LLM explanation); courses that still fail are skipped
+    """
+    if deadline is None:
+        deadline = EXPLANATION_LLM_DEADLINE
+    if not candidates:
+        return
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    expires = loop.time() + deadline
+
+    prompt, ids = build_batch_explanation_prompt(user, [c["metadata"] for c in candidates])
+    reply = None
+    try:
+        async with stage_slot("llm"):
+            remaining = expires - loop.time()
+            if remaining > 0:
+                reply = await asyncio.wait_for(
+                    try_llm_async(prompt, timeout=remaining, system=BATCH_EXPLANATION_SYSTEM,
+                                  max_tokens=BATCH_TOKENS_PER_COURSE * len(candidates)),
+                    timeout=remaining
+                )
+    except asyncio.TimeoutError:
+        reply = None
+    parsed = parse_batch_explanations(reply, ids) if reply else {}
+
+    missing = [i for i, course_id in enumerate(ids) if course_id not in parsed]
+    with _stats_lock:
+        _llm_stats["requests"] += 1
+        _llm_stats["prompts"] += 1
+        _llm_stats["batch_calls"] += 1
+        _llm_stats["batch_courses"] += len(candidates)
+        _llm_stats["batch_fallbacks"] += len(missing)
+        _llm_stats["llm"] += len(parsed)
+        _llm_stats["wall_seconds"] += time.perf_counter() - start
+    if missing and reply:
+        print(f"⚠️ Batched explanation reply missing {len(missing)}/{len(ids)} courses, asking per course")
+
+    for i, course_id in enumerate(ids):
+        if course_id in parsed:
+            yield i, parsed[course_id]
+
+    remaining = expires - loop.time()
+    if missing and reply and remaining > 0:
+        async for j, explanation in iter_llm_explanations(user, [candidates[i] for i in missing], remaining):
+            yield missing[j], explanation
+
+
+def _iter_explanations(user: Dict[str, Any], candidates: List[Dict[str, Any]]) -> AsyncIterator[Tuple[int, str]]:
+    """LLM explanations in the configured mode (EXPLANATION_LLM_MODE)"""
+    if EXPLANATION_LLM_MODE == "batched":
+        return iter_batch_llm_explanations(user, candidates)
+    return iter_llm_explanations(user, candidates)
+
+
+async def generate_llm_explanations(user: Dict[str, Any],
+                                    candidates: List[Dict[str, Any]],
+                                    deadline: Optional[float] = None) -> Dict[int, str]:
+    """
+    Collect iter_llm_explanations()
+
+    Args:
+        user: User profile dictionary
+        candidates: Candidates to explain (each with "metadata")
+        deadline: Seconds to wait for the whole batch (default EXPLANATION_LLM_DEADLINE)
+
+    Returns:
+        Dict of candidate index -> LLM explanation (missing = timed out or failed)
+    """
+    return {i: text async for i, text in iter_llm_explanations(user, candidates, deadline)}
+
+
+def get_explanation_stats() -> Dict[str, Any]:
+    """
+    LLM explanation counters
+
+    Returns:
+        Dict with prompts sent, LLM answers used, template fallbacks and average batch time
+    """
+    with _stats_lock:
+        stats = dict(_llm_stats)
+    requests = stats.pop("requests")
+    wall = stats.pop("wall_seconds")
+    stats["enabled"] = EXPLANATION_LLM_ENABLED
+    stats["mode"] = EXPLANATION_LLM_MODE
+    stats["requests"] = requests
+    stats["fallbacks"] = stats["timed_out"] + stats["failed"]
+    stats["avg_batch_ms"] = round(wall / requests * 1000, 3) if requests else 0.0
+    return stats
+
+
 # -------------------------------------------------------
-# 4️⃣ Main function: attaches explanations to ALL items using career-aware logic
+# 5️⃣ Template explanation (career-aware, no LLM)
 # -------------------------------------------------------
-async def add_explanations(user: Dict[str, Any],
-                     ranked: List[Dict[str, Any]],
-                     top_n: int = 5) -> List[Dict[str, Any]]:
+def template_explanation(user: Dict[str, Any], meta: Dict[str, Any]) -> str:
+    """
+    Career-aware template explanation for one course
 
-    limit = min(top_n, len(ranked))
+    Args:
+        user: User profile dictionary
+        meta: Course metadata
+
+    Returns:
+        Explanation text
+    """
     career_goal = user.get("career_goal", "")
 
-    # Generate explanations for all courses using career-aware fallback
-    for i in range(len(ranked)):
-        cand = ranked[i]
-        meta = cand["metadata"]
-        score = cand.get("score", 0.0)
-        
-        # Get course details
-        course_name = meta.get("Course", meta.get("course", "this course"))
-        location = meta.get("Location", meta.get("location", meta.get("campus", "the campus")))
-        interest = user.get("interest_area", "this field")
-        study_method = meta.get("Study Method", meta.get("study_method", "flexible study options"))
-        duration = meta.get("Duration", meta.get("duration", "the course duration"))
-        
-        # Build searchable course text to check career alignment
-        course_text = " ".join([
-            course_name,
-            meta.get("department", ""),
-            meta.get("Department", ""),
-            meta.get("Career Opportunities", ""),
-        ])
-        
-        # Check if course matches career domain
-        is_career_aligned = matches_career_domain(career_goal, course_text)
-        
-        # Generate career-appropriate explanation
-        if is_career_aligned and career_goal:
-            # Direct career match - positive explanation
-            explanation = (
-                f"This {course_name} at {location} is well-suited for students interested in "
-                f"{interest} pursuing careers in {career_goal}. The program offers {study_method} "
-                f"over {duration} and provides comprehensive training leading to opportunities in "
-                f"various career paths."
-            )
-        elif career_goal:
-            # Career mismatch - honest explanation without misleading user
-            explanation = (
-                f"This {course_name} at {location} focuses on {interest}-related skills and offers "
-                f"{study_method} over {duration}. While not directly aligned with {career_goal}, "
-                f"it provides transferable engineering/technical skills that may support related career paths."
-            )
-        else:
-            # No career goal specified - generic explanation
-            explanation = (
-                f"This {course_name} at {location} aligns with your interest in {interest}. "
-                f"The program offers {study_method} over {duration} and provides comprehensive "
-                f"training leading to opportunities in various career paths."
-            )
-        
-        cand["explanation"] = explanation
+    # Get course details
+    course_name = meta.get("Course", meta.get("course", "this course"))
+    location = meta.get("Location", meta.get("location", meta.get("campus", "the campus")))
+    interest = user.get("interest_area", "this field")
+    study_method = meta.get("Study Method", meta.get("study_method", "flexible study options"))
+    duration = meta.get("Duration", meta.get("duration", "the course duration"))
+    
+    # Check if course matches career domain (feature-table career bitset)
+    is_career_aligned = course_matches_career(career_goal, meta)
+    
+    # Generate career-appropriate explanation
+    if is_career_aligned and career_goal:
+        # Direct career match - positive explanation
+        return (
+            f"This {course_name} at {location} is well-suited for students interested in "
+            f"{interest} pursuing careers in {career_goal}. The program offers {study_method} "
+            f"over {duration} and provides comprehensive training leading to opportunities in "
+            f"various career paths."
+        )
+    elif career_goal:
+        # Career mismatch - honest explanation without misleading user
+        return (
+            f"This {course_name} at {location} focuses on {interest}-related skills and offers "
+            f"{study_method} over {duration}. While not directly aligned with {career_goal}, "
+            f"it provides transferable engineering/technical skills that may support related career paths."
+        )
+    else:
+        # No career goal specified - generic explanation
+        return (
+            f"This {course_name} at {location} aligns with your interest in {interest}. "
+            f"The program offers {study_method} over {duration} and provides comprehensive "
+            f"training leading to opportunities in various career paths."
+        )
+
+
+# -------------------------------------------------------
+# 6️⃣ Main functions: attach explanations to ALL items using career-aware logic
+# -------------------------------------------------------
+def add_template_explanations(user: Dict[str, Any], ranked: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Template explanations for all courses (also the fallback for the LLM ones)"""
+    for cand in ranked:
+        cand["explanation"] = template_explanation(user, cand["metadata"])
+    return ranked
+
+
+async def _open_explanation_cache():
+    # First use creates the directory and schema: file I/O, kept off the event loop.
+    # A broken cache only costs the lookup; explanations still come from the LLM
+    try:
+        return await run_stage("cache", get_explanation_cache)
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️ Explanation cache unavailable: {e}")
+        return None
+
+
+async def _cached_explanations(cache, keys: List[str]) -> Dict[str, str]:
+    try:
+        return await run_stage("cache", cache.get_many, keys)
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️ Explanation cache lookup failed: {e}")
+        return {}
+
+
+async def _store_explanations(cache, items: Dict[str, str]) -> None:
+    try:
+        await run_stage("cache", cache.put_many, items)
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️ Explanation cache write failed: {e}")
+
+
+async def stream_explanations(user: Dict[str, Any],
+                              ranked: List[Dict[str, Any]],
+                              top_n: int = 5) -> AsyncIterator[Tuple[int, str, str]]:
+    """
+    Final explanations for the top courses, as each one is ready
+
+    ranked must already carry template explanations (add_template_explanations);
+    cached and LLM explanations replace them in place. The LLM is only asked
+    for courses missing from the explanation cache, and its answers are stored.
+
+    Args:
+        user: User profile dictionary
+        ranked: Ranked candidates
+        top_n: Number of top courses to explain with the LLM
+
+    Yields:
+        (index, explanation, source) once per top course; source is "cache", "llm"
+        or "template". Cache hits come first, LLM answers in completion order,
+        template fallbacks after the deadline
+    """
+    limit = min(top_n, len(ranked))
+    remaining = set(range(limit))
+
+    if EXPLANATION_LLM_ENABLED and limit > 0:
+        cache = await _open_explanation_cache() if EXPLANATION_CACHE_ENABLED else None
+        keys = {}
+        if cache is not None:
+            version = explanation_prompt_version()
+            keys = {i: make_explanation_key(ranked[i]["metadata"], user, version) for i in range(limit)}
+            cached = await _cached_explanations(cache, list(keys.values()))
+            for i in range(limit):
+                if keys[i] in cached:
+                    ranked[i]["explanation"] = cached[keys[i]]
+                    remaining.discard(i)
+                    yield i, cached[keys[i]], "cache"
+
+        # LLM explanations for the rest, concurrently, within the request deadline
+        to_generate = sorted(remaining)
+        generated = {}
+        if to_generate:
+            async for j, explanation in _iter_explanations(user, [ranked[i] for i in to_generate]):
+                i = to_generate[j]
+                ranked[i]["explanation"] = explanation
+                remaining.discard(i)
+                if cache is not None:
+                    generated[keys[i]] = explanation
+                yield i, explanation, "llm"
+        if generated:
+            await _store_explanations(cache, generated)
+
+    for i in sorted(remaining):
+        yield i, ranked[i]["explanation"], "template"
+
+
+async def add_explanations(user: Dict[str, Any],
+                     ranked: List[Dict[str, Any]],
+                     top_n: int = 5) -> List[Dict[str, Any]]:
 
+    add_template_explanations(user, ranked)
+    async for _ in stream_explanations(user, ranked, top_n):
+        pass
     return ranked
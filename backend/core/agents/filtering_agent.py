@@ -1,5 +1,15 @@
 from typing import List, Dict, Any
-from core.agents.career_intent import matches_career_domain
+from core.agents.career_intent import course_matches_career
+from core.rag.loader import get_course_features, feature_row, METHOD_ONSITE, METHOD_ONLINE
+from core.rag.predicates import STUDY_METHOD_MATCHER
+
+
+def course_location_phrases(course_loc: str) -> List[str]:
+    """
+    Locations of a course, split on / and , to handle multi-location
+    strings like "Colombo/Kandy/Matara"
+    """
+    return [loc.strip() for loc in (course_loc or "").lower().replace('/', ',').split(',')]
 
 
 def matches_location(user: Dict[str, Any], course_meta: Dict[str, Any]) -> bool:
@@ -16,15 +26,19 @@ def matches_location(user: Dict[str, Any], course_meta: Dict[str, Any]) -> bool:
     pref = (user.get("preferred_locations") or "").lower()
     if not pref or pref == "n/a":
         return True
-    
-    # Get location from metadata (falls back to campus if location not available)
-    course_loc = (course_meta.get("location") or course_meta.get("campus") or "").lower()
-    
-    # Debug logging
-    print(f"🔍 Location match - User pref: '{pref}', Course loc: '{course_loc}', Match: {any(p.strip() in course_loc for p in pref.split(','))}")
-    
-    # Split course location by / or , to handle multi-location strings like "Colombo/Kandy/Matara"
-    course_locations = [loc.strip() for loc in course_loc.replace('/', ',').split(',')]
+
+    # Indexed courses: location phrases parsed once in the course feature table
+    row = feature_row(course_meta)
+    if row is not None:
+        course_locations = get_course_features().location_phrases[row]
+    else:
+        # Get location from metadata (falls back to campus if location not available)
+        course_loc = (course_meta.get("location") or course_meta.get("campus") or "").lower()
+        
+        # Debug logging
+        print(f"🔍 Location match - User pref: '{pref}', Course loc: '{course_loc}', Match: {any(p.strip() in course_loc for p in pref.split(','))}")
+        
+        course_locations = course_location_phrases(course_loc)
     
     # Check if any user preferred location matches any course location
     for user_loc in pref.split(","):
@@ -53,19 +67,20 @@ def matches_study_method(user: Dict[str, Any], course_meta: Dict[str, Any]) -> b
     
     course_method = (course_meta.get("study_method") or "").lower()
     
-    # Handle synonyms: "onsite" = "full time", "online" = "distance/part time"
-    onsite_keywords = ["onsite", "full time", "full-time", "fulltime"]
-    online_keywords = ["online", "distance", "part time", "part-time", "parttime"]
+    # Synonym groups: "onsite" = "full time", "online" = "distance/part time"
+    wanted = STUDY_METHOD_MATCHER.match(pref_method)
     
-    # Check if user wants onsite and course offers it
-    if any(keyword in pref_method for keyword in onsite_keywords):
-        if any(keyword in course_method for keyword in onsite_keywords):
-            return True
+    # Course side from the feature table's study-method bitmask when indexed
+    row = feature_row(course_meta)
+    if row is not None:
+        course_bits = int(get_course_features().method_bits[row])
+        offered = {name for name, bit in (("onsite", METHOD_ONSITE), ("online", METHOD_ONLINE)) if course_bits & bit}
+    else:
+        offered = STUDY_METHOD_MATCHER.match(course_method)
     
-    # Check if user wants online and course offers it
-    if any(keyword in pref_method for keyword in online_keywords):
-        if any(keyword in course_method for keyword in online_keywords):
-            return True
+    # User wants onsite/online and course offers it
+    if wanted & offered:
+        return True
     
     # Fallback: direct substring match
     return pref_method in course_method or course_method in pref_method
@@ -117,16 +132,7 @@ def matches_career_domain_filter(user: Dict[str, Any], course_meta: Dict[str, An
     if not career_goal:
         return True
     
-    # Build searchable course text
-    course_text = " ".join([
-        course_meta.get("course", ""),
-        course_meta.get("Course", ""),
-        course_meta.get("department", ""),
-        course_meta.get("Department", ""),
-        course_meta.get("Career Opportunities", ""),
-    ])
-    
-    return matches_career_domain(career_goal, course_text)
+    return course_matches_career(career_goal, course_meta)
 
 
 def filter_candidates(user: Dict[str, Any],
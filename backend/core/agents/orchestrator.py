@@ -1,7 +1,8 @@
-from typing import Dict, Any, List, Union
+from typing import Dict, Any, List, Union, AsyncIterator, Tuple
 import sys
 import os
-import json
+import time
+import threading
 
 # Add parent directory to path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -9,33 +10,108 @@ backend_dir = os.path.dirname(os.path.dirname(current_dir))
 if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
-from core.rag.retriever import rag_search
+from core.rag.retriever import rag_search, warm_up as warm_up_retriever
+from core.rag.loader import load_courses, get_course_features
+from core.rag.predicates import build_where_filter
 from core.agents.eligibility_agent import filter_by_eligibility
+from core.agents.career_intent import get_career_resolver
 from core.agents.filtering_agent import filter_candidates
 from core.agents.ranking_agent import rank_candidates
-from core.agents.explanation_agent import add_explanations
+from core.agents.explanation_agent import add_template_explanations, stream_explanations
 from core.validators.validation_layer import validate_user_profile
+from core.services.execution import run_stage
+from core.services.response_cache import refresh_version
+from utils.config import RETRIEVAL_PUSHDOWN_PREFERENCES
 
-# Load course data globally for validation (locations)
-# In a real app, this might be cached or loaded from DB
-try:
-    data_path = os.path.join(backend_dir, "data", "raw", "CourseData.json")
-    with open(data_path, "r", encoding="utf-8") as f:
-        LOADED_COURSES = json.load(f)
-    AVAILABLE_LOCATIONS = list(set([c.get("Location", "") for c in LOADED_COURSES if c.get("Location")]))
-except Exception as e:
-    print(f"⚠️ Failed to load course data for validation: {e}")
-    AVAILABLE_LOCATIONS = []
+# Course locations for validation, loaded on first use (or by warm_up)
+_available_locations = None
+_locations_lock = threading.Lock()
 
 
-async def recommend_courses(user_input: Dict[str, Any],
-                      initial_k: int = 25,
-                      final_k: int = 10,
-                      explain_top_n: int = 5) -> Dict[str, Any]:
+def get_available_locations() -> List[str]:
+    """
+    Distinct course locations from CourseData.json (loaded once)
+    
+    Returns:
+        List of available locations (empty if the catalog cannot be read)
+    """
+    global _available_locations
+    if _available_locations is None:
+        with _locations_lock:
+            if _available_locations is None:
+                try:
+                    courses = load_courses()
+                    _available_locations = list(set([c.get("Location", "") for c in courses if c.get("Location")]))
+                except Exception as e:
+                    print(f"⚠️ Failed to load course data for validation: {e}")
+                    _available_locations = []
+    return _available_locations
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Load every resource the pipeline needs before serving traffic
+    
+    Returns:
+        Seconds spent per component
+    """
+    start = time.perf_counter()
+    get_available_locations()
+    timings = {"course_catalog": time.perf_counter() - start}
+
+    start = time.perf_counter()
+    get_course_features()
+    timings["course_features"] = time.perf_counter() - start
+
+    timings.update(warm_up_retriever())
+
+    # Career key embeddings for the goal resolver's fallback (needs the embedding model)
+    start = time.perf_counter()
+    get_career_resolver().warm_up()
+    timings["career_resolver"] = time.perf_counter() - start
+
+    # Response cache version tag (requests only re-check it periodically)
+    start = time.perf_counter()
+    refresh_version()
+    timings["response_cache_version"] = time.perf_counter() - start
+    return timings
+
+
+def retrieve_candidates(user_input: Dict[str, Any], initial_k: int) -> List[Dict[str, Any]]:
+    """
+    Semantic search for a profile (blocking: query embedding + vector search)
+    
+    Eligibility predicates run inside the vector search, so the top-k budget
+    is spent on courses the student can actually take. Location and study
+    method stay soft preferences (filtering_agent) unless
+    RETRIEVAL_PUSHDOWN_PREFERENCES is set.
+    
+    Args:
+        user_input: User profile dictionary
+        initial_k: Number of candidates to retrieve
+        
+    Returns:
+        Candidate list from rag_search
     """
-    Full agentic recommendation pipeline:
+    where = build_where_filter(user_input, include_preferences=RETRIEVAL_PUSHDOWN_PREFERENCES)
+    rag_results = rag_search(user_input, top_k=initial_k, where=where)
+    if RETRIEVAL_PUSHDOWN_PREFERENCES and len(rag_results) < initial_k:
+        # Sparse preferences must not keep better career matches out of ranking
+        print(f"   ⚠️ Only {len(rag_results)} courses match the location/study preferences - "
+              f"retrying with eligibility predicates only")
+        rag_results = rag_search(user_input, top_k=initial_k,
+                                 where=build_where_filter(user_input, include_preferences=False))
+    return rag_results
+
+
+async def recommend_courses_stream(user_input: Dict[str, Any],
+                                   initial_k: int = 25,
+                                   final_k: int = 10,
+                                   explain_top_n: int = 5) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Full agentic recommendation pipeline, as a stream of progress events:
     1) Validation Layer (Pre-check)
-    2) RAG retrieval (semantic search)
+    2) RAG retrieval (semantic search, with eligibility predicates pushed down)
     3) Eligibility filtering (rule-based)
     4) Preference filtering (location, study method, duration)
     5) Intelligent ranking (distance + heuristics)
@@ -47,8 +123,14 @@ async def recommend_courses(user_input: Dict[str, Any],
         final_k: Number of final recommendations to return
         explain_top_n: Number of top courses to generate explanations for
         
-    Returns:
-        Dictionary with 'status', 'results', 'warnings', or 'errors'
+    Yields:
+        (event, payload) tuples, in order:
+        - ("warnings", {"warnings"}) once validation has passed or failed
+        - ("ranked", {"results", "warnings"}) when ranking is done; every result
+          carries its template explanation
+        - ("explanation", {"index", "explanation", "source"}) once per top course
+          as its final explanation is ready ("llm" or "template")
+        - ("complete", response) last; response is what recommend_courses() returns
     """
     
     print("="*80)
@@ -59,17 +141,20 @@ async def recommend_courses(user_input: Dict[str, Any],
     # 1. VALIDATION LAYER
     # -------------------------
     print(f"\n🛡️ Step 0: Validating user profile...")
-    validation = validate_user_profile(user_input, AVAILABLE_LOCATIONS)
+    validation = validate_user_profile(user_input, get_available_locations())
     
+    warnings = validation.get("warnings", [])
+    yield "warnings", {"warnings": list(warnings)}
+
     if validation["status"] == "error":
         print(f"❌ Validation failed: {validation['errors']}")
-        return {
+        yield "complete", {
             "status": "error", 
             "errors": validation["errors"],
-            "warnings": validation.get("warnings", [])
+            "warnings": warnings
         }
+        return
         
-    warnings = validation.get("warnings", [])
     if warnings:
         print(f"⚠️ Validation warnings: {warnings}")
     else:
@@ -79,27 +164,28 @@ async def recommend_courses(user_input: Dict[str, Any],
     # 2. RAG RETRIEVAL
     # -------------------------
     print(f"\n📚 Step 1: Retrieving top {initial_k} candidates using semantic search...")
-    rag_results = rag_search(user_input, top_k=initial_k)
+    # Embedding + vector search run on the pipeline pool, off the event loop
+    rag_results = await run_stage("retrieval", retrieve_candidates, user_input, initial_k)
     print(f"   Retrieved {len(rag_results)} candidates")
     
     # -------------------------
     # 3. ELIGIBILITY FILTER
     # -------------------------
     print(f"\n✅ Step 2: Filtering by eligibility requirements...")
-    eligible = filter_by_eligibility(user_input, rag_results)
+    eligible = await run_stage("agents", filter_by_eligibility, user_input, rag_results)
     print(f"   {len(eligible)} candidates passed eligibility check")
     
     # -------------------------
     # 4. PREFERENCE FILTER
     # -------------------------
     print(f"\n🔍 Step 3: Filtering by user preferences (location, study method, duration)...")
-    filtered = filter_candidates(user_input, eligible)
+    filtered = await run_stage("agents", filter_candidates, user_input, eligible)
     print(f"   {len(filtered)} candidates match user preferences")
     
     # Handle empty results from strict eligibility filtering
     if not eligible:
         print("\n🚫 No courses meet academic eligibility requirements.")
-        return {
+        yield "complete", {
             "status": "blocked",
             "reason": "Academic eligibility not met",
             "message": "All recommended programs require completed G.C.E. A/L results. Since A/L results were not provided, degree programs cannot be recommended at this time.",
@@ -109,6 +195,7 @@ async def recommend_courses(user_input: Dict[str, Any],
             ],
             "recommendations": []
         }
+        return
     
     # Fallback: if preference filters are too strict, use eligible results
     if not filtered:
@@ -120,7 +207,7 @@ async def recommend_courses(user_input: Dict[str, Any],
     # 5. INTELLIGENT RANKING
     # -------------------------
     print(f"\n⭐ Step 4: Ranking candidates by combined score...")
-    ranked = rank_candidates(user_input, filtered)
+    ranked = await run_stage("agents", rank_candidates, user_input, filtered)
     print(f"   Ranked {len(ranked)} candidates")
     
     # Truncate to final_k
@@ -131,15 +218,44 @@ async def recommend_courses(user_input: Dict[str, Any],
     # 6. LLM EXPLANATIONS
     # -------------------------
     print(f"\n💡 Step 5: Generating AI-powered explanations for top {explain_top_n} courses...")
-    # Pass full 'ranked' list. add_explanations handles LLM for top_n and fallback for others.
-    final_results = await add_explanations(user_input, ranked, top_n=explain_top_n)
+    # Template explanations for the full 'ranked' list first, so results can be sent
+    # before the LLM answers; stream_explanations() replaces the top_n as they arrive.
+    final_results = add_template_explanations(user_input, ranked)
+    yield "ranked", {"results": final_results, "warnings": warnings}
+
+    async for index, explanation, source in stream_explanations(user_input, final_results, top_n=explain_top_n):
+        yield "explanation", {"index": index, "explanation": explanation, "source": source}
     
     print("="*80)
     print("✅ RECOMMENDATION PIPELINE COMPLETE")
     print("="*80 + "\n")
     
-    return {
+    yield "complete", {
         "status": "success",
         "results": final_results,
         "warnings": warnings
     }
+
+
+async def recommend_courses(user_input: Dict[str, Any],
+                      initial_k: int = 25,
+                      final_k: int = 10,
+                      explain_top_n: int = 5) -> Dict[str, Any]:
+    """
+    Full agentic recommendation pipeline (see recommend_courses_stream)
+
+    Args:
+        user_input: User profile dictionary
+        initial_k: Number of candidates to retrieve from RAG
+        final_k: Number of final recommendations to return
+        explain_top_n: Number of top courses to generate explanations for
+        
+    Returns:
+        Dictionary with 'status', 'results', 'warnings', or 'errors'
+    """
+    response = None
+    async for event, payload in recommend_courses_stream(user_input, initial_k=initial_k, final_k=final_k,
+                                                         explain_top_n=explain_top_n):
+        if event == "complete":
+            response = payload
+    return response
@@ -0,0 +1,200 @@
+"""
+BM25 Lexical Index
+
+In-memory Okapi BM25 inverted index over the course documents, used as
+the cheap first stage of hybrid retrieval.
+
+Postings are stored as flat NumPy arrays (one contiguous slice of doc ids
+and precomputed BM25 weights per term), so scoring a query is a gather of
+a few slices plus one bincount instead of a Python loop over documents.
+"""
+
+import re
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Common English words plus the field labels every build_text() document repeats
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it of on or that the to with
+course title offered study language method duration admission requirements
+career opportunities english requirement level fees location url n
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens without stopwords"""
+    return [t for t in TOKEN_PATTERN.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed document set (row i = document i of the dense store).
+    """
+
+    def __init__(
+        self,
+        vocabulary: Dict[str, int],
+        offsets: np.ndarray,
+        postings_docs: np.ndarray,
+        postings_weights: np.ndarray,
+        n_docs: int
+    ):
+        """
+        Args:
+            vocabulary: term -> term id
+            offsets: (n_terms + 1,) start of each term's postings slice
+            postings_docs: Doc ids, grouped by term
+            postings_weights: BM25 weight of the term in each posting doc
+            n_docs: Number of indexed documents
+        """
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.postings_docs = postings_docs
+        self.postings_weights = postings_weights
+        self.n_docs = n_docs
+
+    # -------------------------
+    # Construction
+    # -------------------------
+    @classmethod
+    def build(cls, documents: Sequence[str], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """
+        Tokenize and index documents.
+
+        Args:
+            documents: Document texts (e.g. the stored build_text() output)
+            k1: Term-frequency saturation
+            b: Document-length normalization
+
+        Returns:
+            BM25Index instance
+        """
+        vocabulary: Dict[str, int] = {}
+        doc_ids, term_ids, tfs = [], [], []
+        doc_lengths = np.zeros(len(documents), dtype=np.float32)
+
+        for doc_id, text in enumerate(documents):
+            tokens = tokenize(text)
+            doc_lengths[doc_id] = len(tokens)
+            counts: Dict[int, int] = {}
+            for token in tokens:
+                term = vocabulary.setdefault(token, len(vocabulary))
+                counts[term] = counts.get(term, 0) + 1
+            doc_ids.extend([doc_id] * len(counts))
+            term_ids.extend(counts.keys())
+            tfs.extend(counts.values())
+
+        return cls.from_term_counts(
+            vocabulary,
+            np.asarray(doc_ids, dtype=np.int32),
+            np.asarray(term_ids, dtype=np.int32),
+            np.asarray(tfs, dtype=np.float32),
+            doc_lengths,
+            k1=k1,
+            b=b
+        )
+
+    @classmethod
+    def from_term_counts(
+        cls,
+        vocabulary: Dict[str, int],
+        doc_ids: np.ndarray,
+        term_ids: np.ndarray,
+        tfs: np.ndarray,
+        doc_lengths: np.ndarray,
+        k1: float = 1.5,
+        b: float = 0.75
+    ) -> "BM25Index":
+        """
+        Build from (doc, term, tf) triplets (lets callers index without re-tokenizing).
+
+        Args:
+            vocabulary: term -> term id
+            doc_ids: Doc id of each triplet
+            term_ids: Term id of each triplet
+            tfs: Term frequency of each triplet
+            doc_lengths: Token count per document
+            k1: Term-frequency saturation
+            b: Document-length normalization
+
+        Returns:
+            BM25Index instance
+        """
+        n_docs = len(doc_lengths)
+        n_terms = len(vocabulary)
+        avg_len = float(doc_lengths.mean()) if n_docs else 0.0
+
+        df = np.bincount(term_ids, minlength=n_terms).astype(np.float32)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+        norm = k1 * (1.0 - b + b * doc_lengths[doc_ids] / max(avg_len, 1e-9))
+        weights = idf[term_ids] * tfs * (k1 + 1.0) / (tfs + norm)
+
+        order = np.argsort(term_ids, kind="stable")
+        offsets = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(df.astype(np.int64), out=offsets[1:])
+
+        return cls(
+            vocabulary,
+            offsets,
+            np.ascontiguousarray(doc_ids[order], dtype=np.int32),
+            np.ascontiguousarray(weights[order], dtype=np.float32),
+            n_docs
+        )
+
+    # -------------------------
+    # Search
+    # -------------------------
+    def count(self) -> int:
+        """Number of indexed documents"""
+        return self.n_docs
+
+    def search(
+        self,
+        query_text: str,
+        top_k: int = 100,
+        mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k documents by BM25 score (documents with no query term are never returned).
+
+        Args:
+            query_text: Free-text query
+            top_k: Maximum number of documents to return
+            mask: Optional boolean row mask; only True rows are candidates
+
+        Returns:
+            Tuple of (doc ids, BM25 scores), best match first
+        """
+        terms = {self.vocabulary[t] for t in tokenize(query_text) if t in self.vocabulary}
+        if not terms or top_k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        docs = np.concatenate([self.postings_docs[self.offsets[t]:self.offsets[t + 1]] for t in terms])
+        weights = np.concatenate([self.postings_weights[self.offsets[t]:self.offsets[t + 1]] for t in terms])
+
+        if docs.size * 8 > self.n_docs:
+            # Common terms: a dense accumulator is cheaper than sorting the postings
+            totals = np.bincount(docs, weights=weights, minlength=self.n_docs)
+            rows = np.flatnonzero(totals)
+            scores = totals[rows].astype(np.float32)
+        else:
+            # Rare terms: accumulate per matched doc, so cost follows postings, not catalog size
+            rows, inverse = np.unique(docs, return_inverse=True)
+            scores = np.bincount(inverse, weights=weights).astype(np.float32)
+
+        if mask is not None:
+            keep = mask[rows]
+            rows, scores = rows[keep], scores[keep]
+
+        k = min(top_k, rows.size)
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if k < rows.size:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(rows.size)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return rows[top].astype(np.int64), scores[top]
@@ -1 +1,96 @@
 # Data Chunker
+"""
+Field-Level Course Chunker
+
+Splits a course record into field-aware chunks for the multi-vector index,
+so career and entry-requirement text get their own embeddings instead of
+being diluted in one whole-course document.
+
+Chunks per course:
+- overview:     title, provider, study method, duration, language, location
+- requirements: entry requirements + English level (long text is split on
+                paragraphs into pieces of at most max_chars)
+- careers:      career opportunities
+
+Every chunk starts with the course title so it still identifies the course
+on its own. Fees and URL are not embedded.
+"""
+
+from typing import Dict, Any, List
+
+DEFAULT_MAX_CHARS = 600
+
+
+def _value(course: Dict[str, Any], key: str) -> str:
+    value = course.get(key)
+    text = str(value).strip() if value is not None else ""
+    return "" if text.lower() in ("", "n/a", "none", "null") else text
+
+
+def split_text(text: str, max_chars: int = DEFAULT_MAX_CHARS) -> List[str]:
+    """
+    Split long text on paragraph (then line) boundaries into pieces of at
+    most max_chars; a single over-long line is hard-wrapped.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    pieces, current = [], ""
+    for block in [line.strip() for line in text.replace("\r", "").split("\n") if line.strip()]:
+        while len(block) > max_chars:
+            cut = block.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(block[:cut].strip())
+            block = block[cut:].strip()
+        if current and len(current) + 1 + len(block) > max_chars:
+            pieces.append(current)
+            current = block
+        else:
+            current = f"{current}\n{block}" if current else block
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_course(course: Dict[str, Any], max_chars: int = DEFAULT_MAX_CHARS) -> List[Dict[str, str]]:
+    """
+    Field-aware chunks for one course
+
+    Args:
+        course: Raw course record from CourseData.json
+        max_chars: Maximum body length of a requirements/careers chunk
+
+    Returns:
+        List of {"field": ..., "text": ...} in a fixed field order
+    """
+    title = _value(course, "Course") or "Untitled course"
+    chunks = []
+
+    overview = [f"Course Title: {title}"]
+    provider = " at ".join(v for v in (_value(course, "Department"), _value(course, "Campus")) if v)
+    for label, value in (
+        ("Offered By", provider),
+        ("Study Method", _value(course, "Study Method")),
+        ("Duration", _value(course, "Duration")),
+        ("Study Language", _value(course, "Study Language")),
+        ("Location", _value(course, "Location")),
+    ):
+        if value:
+            overview.append(f"{label}: {value}")
+    chunks.append({"field": "overview", "text": "\n".join(overview)})
+
+    requirements = _value(course, "Entry Requirements")
+    english = _value(course, "English Level")
+    if english:
+        requirements = f"{requirements}\nEnglish Requirement Level: {english}".strip()
+    for piece in split_text(requirements, max_chars):
+        chunks.append({"field": "requirements", "text": f"Course Title: {title}\nAdmission Requirements:\n{piece}"})
+
+    for piece in split_text(_value(course, "Career Opportunities"), max_chars):
+        chunks.append({"field": "careers", "text": f"Course Title: {title}\nCareer Opportunities:\n{piece}"})
+
+    return chunks
@@ -0,0 +1,158 @@
+"""
+Hybrid Retrieval
+
+Two-stage search for large catalogs:
+1. BM25 over the course documents picks a candidate pool (lexical_k rows)
+2. Dense cosine scores are computed for the pool only and used to rerank it
+   ("dense"), or fused with the lexical ranks by reciprocal-rank fusion ("rrf")
+
+Dense scoring reads candidate rows straight from the NumPy store's
+embedding matrix, so stage two costs lexical_k dot products regardless of
+catalog size. When the lexical stage finds fewer than n_results documents
+(no shared terms), the query falls back to a full dense search.
+
+The query() method keeps chromadb's Collection.query() output format and
+adds query_texts for the lexical stage.
+"""
+
+import numpy as np
+from typing import List, Dict, Any, Optional, Sequence
+
+from core.rag.bm25 import BM25Index
+from vectorstore.numpy_store import NumpyVectorStore
+from vectorstore.filters import where_mask
+
+FUSION_METHODS = ("dense", "rrf")
+
+
+def build_lexical_query(user: Dict[str, Any]) -> str:
+    """
+    Subject terms of a profile for the lexical stage (locations and study
+    method are handled by where filters, and the boilerplate of
+    build_user_profile would only add noise)
+    """
+    fields = ["interest_area", "career_goal", "al_stream", "other_qualifications"]
+    values = [str(user.get(f) or "") for f in fields]
+    return " ".join(v for v in values if v and v.lower() not in ("n/a", "none", "null"))
+
+
+class HybridRetriever:
+    """
+    BM25 candidate generation + dense rerank over one NumpyVectorStore.
+    """
+
+    def __init__(
+        self,
+        dense: NumpyVectorStore,
+        lexical: Optional[BM25Index] = None,
+        lexical_k: int = 200,
+        fusion: str = "dense",
+        rrf_k: int = 60
+    ):
+        """
+        Args:
+            dense: Store providing embeddings, ids, documents and metadatas
+            lexical: BM25 index over dense.documents (built if omitted)
+            lexical_k: Candidate pool size from the lexical stage
+            fusion: "dense" (rerank by cosine) or "rrf" (reciprocal-rank fusion)
+            rrf_k: RRF rank constant
+        """
+        if fusion not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion '{fusion}' (expected one of {FUSION_METHODS})")
+
+        self.dense = dense
+        self.lexical = lexical if lexical is not None else BM25Index.build(dense.documents)
+        if self.lexical.count() != dense.count():
+            raise ValueError("Lexical and dense indexes must cover the same rows")
+
+        self.lexical_k = lexical_k
+        self.fusion = fusion
+        self.rrf_k = rrf_k
+
+    # Same surface as the dense stores
+    @property
+    def ids(self) -> List[str]:
+        return self.dense.ids
+
+    @property
+    def metadatas(self) -> List[Dict[str, Any]]:
+        return self.dense.metadatas
+
+    @property
+    def dimension(self) -> int:
+        return self.dense.dimension
+
+    def count(self) -> int:
+        return self.dense.count()
+
+    def search(
+        self,
+        query_vec: Sequence[float],
+        query_text: str,
+        top_k: int = 10,
+        mask: Optional[np.ndarray] = None
+    ):
+        """
+        Two-stage top-k search for one query.
+
+        Args:
+            query_vec: Normalized query embedding
+            query_text: Text for the lexical stage
+            top_k: Number of rows to return
+            mask: Optional boolean row mask applied to both stages
+
+        Returns:
+            Tuple of (row indices, cosine distances), best match first
+        """
+        pool, _ = self.lexical.search(query_text, top_k=max(self.lexical_k, top_k), mask=mask)
+        if pool.size < top_k:
+            return self.dense.search(query_vec, top_k=top_k, mask=mask)
+
+        q = np.asarray(query_vec, dtype=np.float32)
+        # Sorted gather keeps reads sequential on a memory-mapped matrix
+        order = np.argsort(pool)
+        similarity = np.empty(pool.size, dtype=np.float32)
+        similarity[order] = self.dense.embeddings[pool[order]] @ q
+
+        if self.fusion == "rrf":
+            dense_rank = np.empty(pool.size, dtype=np.float32)
+            dense_rank[np.argsort(-similarity, kind="stable")] = np.arange(pool.size)
+            lexical_rank = np.arange(pool.size, dtype=np.float32)  # pool is in BM25 order
+            fused = 1.0 / (self.rrf_k + lexical_rank + 1) + 1.0 / (self.rrf_k + dense_rank + 1)
+            top = np.argsort(-fused, kind="stable")[:top_k]
+        else:
+            top = np.argsort(-similarity, kind="stable")[:top_k]
+
+        return pool[top], 1.0 - similarity[top]
+
+    def query(
+        self,
+        query_embeddings: List[Sequence[float]],
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        query_texts: Optional[List[str]] = None
+    ) -> Dict[str, List[List[Any]]]:
+        """
+        Chroma-compatible query with a lexical first stage.
+
+        Args:
+            query_embeddings: List of query vectors
+            n_results: Number of results per query
+            where: Optional Chroma-style metadata filter
+            query_texts: Lexical query per embedding (dense-only search if omitted)
+
+        Returns:
+            Dict with 'ids', 'documents', 'metadatas', 'distances' (one list per query)
+        """
+        mask = where_mask(self.dense.metadatas, where) if where else None
+        texts = query_texts or [""] * len(query_embeddings)
+
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for query_vec, text in zip(query_embeddings, texts):
+            rows, distances = self.search(query_vec, text, top_k=n_results, mask=mask)
+            results["ids"].append([self.dense.ids[i] for i in rows])
+            results["documents"].append([self.dense.documents[i] for i in rows])
+            results["metadatas"].append([self.dense.metadatas[i] for i in rows])
+            results["distances"].append([float(d) for d in distances])
+
+        return results
@@ -1 +1,364 @@
 # Index Builder
+"""
+Course document and metadata construction shared by the index build
+script and anything that needs the exact text that was embedded, plus
+the batched (optionally multi-process) embedding pipeline used to build
+the index and the field-chunk builder for the multi-vector index.
+"""
+
+import os
+import json
+import time
+import hashlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, Any, List, Tuple, Optional
+
+from core.rag.nomic_embedder import NomicEmbedder
+from core.rag.chunker import chunk_course
+from utils.config import INDEX_VERIFY_SAMPLE, INDEX_VERIFY_TOLERANCE
+
+
+def build_text(course: Dict[str, Any]) -> str:
+    """Build course text with richer structure (this is the embedded document)"""
+    return f"""
+        Course Title: {course.get('Course', 'N/A')}
+        Offered By: {course.get('Department', 'N/A')} at {course.get('Campus', 'N/A')}
+        Study Language: {course.get('Study Language', 'N/A')}
+        Study Method: {course.get('Study Method', 'N/A')}
+        Duration: {course.get('Duration', 'N/A')}
+
+        Admission Requirements:
+        {course.get('Entry Requirements', 'N/A')}
+
+        Career Opportunities:
+        {course.get('Career Opportunities', 'N/A')}
+
+        English Requirement Level: {course.get('English Level', 'N/A')}
+        Fees: {course.get('Course Fees', 'N/A')}
+        Location: {course.get('Location', 'N/A')}
+
+        URL: {course.get('URL', 'N/A')}
+        """
+
+
+def build_metadata(course: Dict[str, Any]) -> Dict[str, str]:
+    """Create clean metadata - convert all values to strings"""
+    return {
+        "course": str(course.get('Course', '')),
+        "department": str(course.get('Department', '')),
+        "campus": str(course.get('Campus', '')),
+        "duration": str(course.get('Duration', '')),
+        "location": str(course.get('Location', '')),
+        "study_method": str(course.get('Study Method', '')),
+        "url": str(course.get('URL', ''))
+    }
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of a course document (changes only when the embedded text changes)"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def assign_ids(texts: List[str]) -> List[str]:
+    """
+    Content-derived course ids
+
+    The id is the document's content hash, so unchanged courses keep their
+    id (and embedding) across rebuilds. Exact duplicate documents get an
+    occurrence suffix to stay unique.
+
+    Args:
+        texts: Course documents from build_text()
+
+    Returns:
+        One id per document, in the same order
+    """
+    seen: Dict[str, int] = {}
+    ids = []
+    for text in texts:
+        h = content_hash(text)
+        n = seen.get(h, 0)
+        seen[h] = n + 1
+        ids.append(h if n == 0 else f"{h}-{n}")
+    return ids
+
+
+# Build fingerprint written next to the index; readers use it to detect rebuilds
+INDEX_VERSION_FILE = "index_version.txt"
+
+
+def index_version(ids: List[str], metadatas: List[Dict[str, Any]], dimension: int) -> str:
+    """
+    Fingerprint of an index build (changes when any document, metadata or the dimension changes)
+
+    Args:
+        ids: Course ids (content hashes)
+        metadatas: Stored metadata, row-aligned with ids
+        dimension: Embedding dimension
+
+    Returns:
+        Short hex digest
+    """
+    payload = json.dumps([dimension, ids, metadatas], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def write_index_version(index_dir: str, version: str) -> None:
+    """Write the build fingerprint to <index_dir>/index_version.txt"""
+    os.makedirs(index_dir, exist_ok=True)
+    path = os.path.join(index_dir, INDEX_VERSION_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(path + ".tmp", path)
+
+
+# -------------------------
+# Batched embedding pipeline
+# -------------------------
+_worker_embedder: Optional[NomicEmbedder] = None
+
+
+def token_lengths(embedder: NomicEmbedder, texts: List[str]) -> List[int]:
+    """Tokenized length of each text (character length if no tokenizer is available)"""
+    try:
+        encoded = embedder.model.tokenizer(texts, add_special_tokens=True, truncation=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+    except Exception:
+        return [len(t) for t in texts]
+
+
+def _init_embed_worker(torch_threads: int) -> None:
+    """Process-pool initializer: load the model once per worker"""
+    global _worker_embedder
+    if torch_threads > 0:
+        try:
+            import torch
+            torch.set_num_threads(torch_threads)
+        except ImportError:
+            pass
+    _worker_embedder = NomicEmbedder(cache_size=0)
+
+
+def _embed_worker_batch(texts: List[str]) -> np.ndarray:
+    return _worker_embedder.embed_batch_array(
+        texts, normalize=True, batch_size=len(texts), show_progress=False
+    )
+
+
+def embed_corpus(
+    texts: List[str],
+    embedder: NomicEmbedder,
+    batch_size: int = 32,
+    workers: int = 1,
+    verify_sample: int = INDEX_VERIFY_SAMPLE,
+    tolerance: float = INDEX_VERIFY_TOLERANCE
+) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    Embed documents for an index build
+
+    Documents are sorted by token length so each batch pads to a similar
+    length, embedded batch_size at a time, and written back in the original
+    order. With workers > 1 the batches fan out over a process pool where
+    each process loads the model once.
+
+    The result is deterministic for a given batch_size, but not bit-identical
+    to embedding each document alone: padding changes the float rounding. The
+    verify_sample most padded documents are therefore re-embedded one at a
+    time, and the build fails if any component differs by more than tolerance.
+
+    Args:
+        texts: Documents to embed
+        embedder: Embedder for the serial path (also supplies the tokenizer)
+        batch_size: Documents per forward pass
+        workers: Number of worker processes (1 = in-process)
+        verify_sample: Documents checked against the per-document path (0 = no check)
+        tolerance: Maximum absolute difference per vector component
+
+    Returns:
+        Tuple of ((len(texts), dim) float32 matrix, throughput stats)
+
+    Raises:
+        RuntimeError: If a batch fails or a checked vector exceeds the tolerance
+    """
+    start = time.perf_counter()
+    n = len(texts)
+    output = np.empty((n, embedder.get_dimension()), dtype=np.float32)
+    if n == 0:
+        return output, {"docs": 0, "seconds": 0.0, "docs_per_sec": 0.0}
+
+    lengths = np.asarray(token_lengths(embedder, texts))
+    order = np.argsort(lengths, kind="stable")
+    batches = [order[i:i + batch_size] for i in range(0, n, batch_size)]
+    batch_texts = [[texts[i] for i in rows] for rows in batches]
+
+    # Share of tokens in the batches that are padding after sorting
+    padded = sum(int(lengths[rows].max()) * len(rows) for rows in batches)
+    padding_ratio = 1.0 - float(lengths.sum()) / padded if padded else 0.0
+
+    def store(batch_idx: int, vectors: np.ndarray) -> None:
+        rows = batches[batch_idx]
+        if vectors.shape[0] != len(rows):
+            raise RuntimeError(f"Embedding batch {batch_idx} failed ({vectors.shape[0]}/{len(rows)} vectors)")
+        output[rows] = vectors
+        print(f"Embedded batch {batch_idx + 1}/{len(batches)} ({len(rows)} docs)")
+
+    if workers <= 1:
+        for batch_idx, chunk in enumerate(batch_texts):
+            store(batch_idx, embedder.embed_batch_array(
+                chunk, normalize=True, batch_size=len(chunk), show_progress=False
+            ))
+    else:
+        # Split the cores between workers to avoid oversubscribing torch threads
+        torch_threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_embed_worker,
+            initargs=(torch_threads,)
+        ) as pool:
+            for batch_idx, vectors in enumerate(pool.map(_embed_worker_batch, batch_texts)):
+                store(batch_idx, vectors)
+
+    elapsed = time.perf_counter() - start
+    max_diff = verify_embeddings(texts, output, embedder, batches, lengths, verify_sample, tolerance)
+    return output, {
+        "docs": n,
+        "seconds": elapsed,
+        "docs_per_sec": n / elapsed if elapsed > 0 else 0.0,
+        "batches": len(batches),
+        "batch_size": batch_size,
+        "workers": workers,
+        "padding_ratio": padding_ratio,
+        "verified": min(verify_sample, n),
+        "verify_max_diff": max_diff
+    }
+
+
+def verify_embeddings(
+    texts: List[str],
+    vectors: np.ndarray,
+    embedder: NomicEmbedder,
+    batches: List[np.ndarray],
+    lengths: np.ndarray,
+    sample: int,
+    tolerance: float
+) -> float:
+    """
+    Compare batched vectors of the most padded documents with per-document embedding
+
+    Args:
+        texts: Embedded documents
+        vectors: Batched vectors, row-aligned with texts
+        embedder: Embedder for the per-document path
+        batches: Row indices of each batch
+        lengths: Token length of each document
+        sample: Number of documents to check
+        tolerance: Maximum absolute difference per vector component
+
+    Returns:
+        Largest absolute difference found (0.0 when nothing was checked)
+
+    Raises:
+        RuntimeError: If the difference exceeds the tolerance
+    """
+    if sample <= 0:
+        return 0.0
+    # Padding fraction of every document within its batch
+    padding = np.zeros(len(texts))
+    for rows in batches:
+        padding[rows] = 1.0 - lengths[rows] / max(int(lengths[rows].max()), 1)
+    rows = np.argsort(-padding, kind="stable")[:sample]
+
+    serial = np.stack([
+        embedder.embed_batch_array([texts[i]], normalize=True, batch_size=1, show_progress=False)[0]
+        for i in rows
+    ])
+    max_diff = float(np.abs(serial - vectors[rows]).max())
+    if max_diff > tolerance:
+        raise RuntimeError(
+            f"Batched embeddings differ from the per-document path by {max_diff:.2e} "
+            f"(tolerance {tolerance:.0e}); lower --batch-size or raise INDEX_VERIFY_TOLERANCE"
+        )
+    return max_diff
+
+
+# -------------------------
+# Multi-vector (field chunk) index
+# -------------------------
+def build_chunk_index(
+    courses: List[Dict[str, Any]],
+    ids: List[str],
+    documents: List[str],
+    metadatas: List[Dict[str, Any]],
+    embedder: NomicEmbedder,
+    batch_size: int = 32,
+    workers: int = 1,
+    previous=None
+):
+    """
+    Chunk every course by field and embed the chunks
+
+    Args:
+        courses: Raw course records (aligned with ids)
+        ids: Content-hash course ids
+        documents: Whole-course documents (kept for display / explanations)
+        metadatas: Course metadata
+        embedder: Embedder for the chunk texts
+        batch_size: Chunks per forward pass
+        workers: Worker processes for embedding
+        previous: Existing MultiVectorStore; chunks of unchanged ids are reused
+
+    Returns:
+        Tuple of (MultiVectorStore, stats{chunks, embedded, reused, seconds})
+    """
+    from vectorstore.multivector_store import MultiVectorStore
+
+    reusable = {}
+    if previous is not None and previous.dimension == embedder.get_dimension():
+        for row, cid in enumerate(previous.ids):
+            reusable[cid] = row
+
+    fields, parents, texts, sources = [], [], [], []
+    for row, (course, cid) in enumerate(zip(courses, ids)):
+        if cid in reusable:
+            # Same id = same content hash = same chunks; copy the old vectors
+            prev_row = reusable[cid]
+            old_fields = previous.chunk_fields or [None] * previous.chunk_count()
+            start = int(previous.chunk_starts[prev_row])
+            for offset in range(previous.chunks_of(prev_row).shape[0]):
+                fields.append(old_fields[start + offset])
+                parents.append(row)
+                texts.append(None)
+                sources.append(start + offset)
+        else:
+            for chunk in chunk_course(course):
+                fields.append(chunk["field"])
+                parents.append(row)
+                texts.append(chunk["text"])
+                sources.append(-1)
+
+    matrix = np.empty((len(texts), embedder.get_dimension()), dtype=np.float32)
+    new_rows = [i for i, t in enumerate(texts) if t is not None]
+    old_rows = [i for i, t in enumerate(texts) if t is None]
+    if old_rows:
+        matrix[old_rows] = np.asarray(previous.chunk_embeddings)[[sources[i] for i in old_rows]]
+
+    stats = {"chunks": len(texts), "embedded": len(new_rows), "reused": len(old_rows), "seconds": 0.0}
+    if new_rows:
+        vectors, embed_stats = embed_corpus(
+            [texts[i] for i in new_rows], embedder, batch_size=batch_size, workers=workers
+        )
+        matrix[new_rows] = vectors
+        stats["seconds"] = embed_stats["seconds"]
+
+    store = MultiVectorStore(
+        chunk_embeddings=matrix,
+        chunk_parents=np.asarray(parents, dtype=np.int32),
+        ids=list(ids),
+        documents=list(documents),
+        metadatas=list(metadatas),
+        chunk_fields=fields
+    )
+    return store, stats
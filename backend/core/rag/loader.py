@@ -1 +1,282 @@
 # Data Loader
+"""
+Course catalog loader.
+
+Besides the raw catalog, this builds the course feature table: every fact
+the agents need per course, parsed from CourseData.json once and stored as
+NumPy columns (row i = course i), indexed by course id. The eligibility,
+filtering, ranking and explanation agents and the API read these columns
+instead of re-parsing metadata strings on every request.
+"""
+
+import re
+import json
+import threading
+import numpy as np
+from typing import List, Dict, Any, Optional
+
+from utils.config import COURSE_DATA_PATH
+
+# Study-method bitmask values
+METHOD_ONSITE = 1
+METHOD_ONLINE = 2
+METHOD_WEEKEND = 4
+
+# index_builder.build_metadata() fields identifying a course without a content hash
+METADATA_KEY_FIELDS = ("course", "department", "campus", "duration", "location", "study_method", "url")
+
+
+def load_courses(path: str = COURSE_DATA_PATH) -> List[Dict[str, Any]]:
+    """
+    Load the raw course catalog
+
+    Args:
+        path: Path to CourseData.json
+
+    Returns:
+        List of course dictionaries
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# -------------------------
+# Field parsers
+# -------------------------
+def parse_duration_months(text: str) -> float:
+    """
+    Course length in months ("4 Years" -> 48, "2 ½ Years" -> 30, "1+1 Year" -> 24,
+    "06 Month" -> 6). Ranges and alternatives use the first value; NaN if unparseable.
+    """
+    value = (text or "").lower().replace("½", " ½")
+    match = re.search(r"(\d+(?:\.\d+)?(?:\s*½)?(?:\s*\+\s*\d+(?:\.\d+)?)*)\s*[–-]?\s*\d*\s*(year|month)", value)
+    if not match:
+        return float("nan")
+    amount = 0.0
+    for part in match.group(1).split("+"):
+        part = part.strip()
+        if "½" in part:
+            amount += float(part.replace("½", "").strip() or 0) + 0.5
+        else:
+            amount += float(part)
+    return amount * (12.0 if match.group(2) == "year" else 1.0)
+
+
+def parse_fee(text: str) -> float:
+    """First rupee amount in the fee text ("Rs.2,370,000.00" -> 2370000.0); NaN if none"""
+    match = re.search(r"rs\.?\s*([\d,]+(?:\.\d+)?)", (text or "").lower())
+    if not match:
+        return float("nan")
+    try:
+        return float(match.group(1).replace(",", ""))
+    except ValueError:
+        return float("nan")
+
+
+def study_method_bits(text: str) -> int:
+    """Study-method bitmask (onsite/online groups as in filtering_agent, plus weekend)"""
+    from core.rag.predicates import study_method_flags
+
+    flags = study_method_flags(text)
+    bits = METHOD_ONSITE if flags["method_onsite"] else 0
+    bits |= METHOD_ONLINE if flags["method_online"] else 0
+    bits |= METHOD_WEEKEND if "weekend" in (text or "").lower() else 0
+    return bits
+
+
+# -------------------------
+# Feature table
+# -------------------------
+class CourseFeatureTable:
+    """
+    Columnar per-course features, row-aligned with the catalog.
+
+    Columns:
+        requires_al (bool), ielts_min (float32, 0 = none), requires_ol (bool),
+        location_phrases (list of location phrases), method_bits (uint8),
+        duration_months (float32, NaN = unknown), fee (float32 LKR, NaN = unknown),
+        career_bits (uint64, bit j = career_intent.CAREERS[j])
+    Display strings for the API response (display_fields() of each course
+    document) are kept as a list.
+    """
+
+    def __init__(self, courses: List[Dict[str, Any]]):
+        """
+        Args:
+            courses: Raw course records from CourseData.json
+        """
+        # Imported here: the agents import this module
+        from core.rag.index_builder import build_text, build_metadata, content_hash, assign_ids
+        from core.services.eligibility_rules import entry_gates
+        from core.agents.filtering_agent import course_location_phrases
+        from core.agents.eligibility_agent import parse_requires_al
+        from core.agents.career_intent import career_bits
+
+        n = len(courses)
+        documents = [build_text(c) for c in courses]
+        metadatas = [build_metadata(c) for c in courses]
+        self.ids = assign_ids(documents)
+        self.index = {cid: row for row, cid in enumerate(self.ids)}
+        # Duplicate documents share a content hash (and features) with their first occurrence
+        self.hash_index: Dict[str, int] = {}
+        for row, text in enumerate(documents):
+            self.hash_index.setdefault(content_hash(text), row)
+        # Metadata from an index built without content hashes is matched on its
+        # display fields; keys shared by courses with different documents are dropped
+        self.meta_index: Dict[tuple, int] = {}
+        ambiguous = set()
+        for row, meta in enumerate(metadatas):
+            key = _metadata_key(meta)
+            first = self.meta_index.setdefault(key, row)
+            if documents[first] != documents[row]:
+                ambiguous.add(key)
+        for key in ambiguous:
+            del self.meta_index[key]
+
+        self.requires_al = np.zeros(n, dtype=bool)
+        self.ielts_min = np.zeros(n, dtype=np.float32)
+        self.requires_ol = np.zeros(n, dtype=bool)
+        self.method_bits = np.zeros(n, dtype=np.uint8)
+        self.duration_months = np.full(n, np.nan, dtype=np.float32)
+        self.fee = np.full(n, np.nan, dtype=np.float32)
+        self.career_bits = np.zeros(n, dtype=np.uint64)
+
+        self.location_phrases: List[List[str]] = []
+
+        self.display_rows: List[Dict[str, str]] = []
+
+        for row, (course, meta) in enumerate(zip(courses, metadatas)):
+            entry = course.get("Entry Requirements") or ""
+            self.requires_al[row] = parse_requires_al(meta)
+            gates = entry_gates(entry)
+            self.ielts_min[row] = gates["ielts_min"]
+            self.requires_ol[row] = gates["requires_ol"]
+            self.method_bits[row] = study_method_bits(meta["study_method"])
+            self.duration_months[row] = parse_duration_months(meta["duration"])
+            self.fee[row] = parse_fee(course.get("Course Fees") or "")
+
+            self.location_phrases.append(course_location_phrases(meta["location"] or meta["campus"]))
+
+            # Same text the agents match careers against (title + department)
+            self.career_bits[row] = career_bits(f"{meta['course']} {meta['department']}")
+
+            # Same extraction the API applies to a retrieved document
+            self.display_rows.append(display_fields(documents[row]))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row(self, course_id: str) -> Optional[int]:
+        """Row of a course id (None if the id is not in the catalog)"""
+        return self.index.get(course_id)
+
+    def lookup(self, course_meta: Dict[str, Any]) -> Optional[int]:
+        """Row for a retrieved course's metadata (via its stored content hash, else its display fields)"""
+        key = course_meta.get("content_hash")
+        if key:
+            return self.hash_index.get(key)
+        return self.meta_index.get(_metadata_key(course_meta))
+
+    def display(self, row: int) -> Dict[str, str]:
+        """Display strings for the API response (see display_fields())"""
+        return dict(self.display_rows[row])
+
+
+def _metadata_key(meta: Dict[str, Any]) -> tuple:
+    return tuple(str(meta.get(k, "")) for k in METADATA_KEY_FIELDS)
+
+
+def display_fields(doc_text: str) -> Dict[str, str]:
+    """
+    Display strings of a course, extracted from its indexed document text
+    (the /recommend response fields)
+
+    Args:
+        doc_text: Course document from index_builder.build_text()
+
+    Returns:
+        Dict with study_language, study_method, requirements, career_opportunities, course_fee
+    """
+    def extract_field(label):
+        try:
+            # Case insensitive search
+            lower_doc = doc_text.lower()
+            lower_label = label.lower()
+
+            if lower_label in lower_doc:
+                # Find start index using lower case
+                start_idx = lower_doc.find(lower_label) + len(label)
+                # Extract substring from original text
+                substring = doc_text[start_idx:]
+
+                # Get first line
+                part = substring.split("\n")[0].strip()
+
+                # If empty, check next line (handle formatting where value is on next line)
+                if not part and "\n" in substring:
+                    part = substring.split("\n")[1].strip()
+
+                return part.strip(": ")
+        except:
+            return "N/A"
+        return "N/A"
+
+    # More robust extraction for multiline fields
+    def extract_multiline(label):
+        try:
+            lower_doc = doc_text.lower()
+            lower_label = label.lower()
+
+            if lower_label in lower_doc:
+                start_idx = lower_doc.find(lower_label) + len(label)
+                content = doc_text[start_idx:]
+
+                # Take content up to next double newline or end
+                if "\n\n" in content:
+                    return content.split("\n\n")[0].strip().strip(": ")
+                return content.strip().strip(": ")
+        except:
+            return "N/A"
+        return "N/A"
+
+    return {
+        "study_language": extract_field("Study Language"),
+        "study_method": extract_field("Study Method"),
+        "requirements": extract_multiline("Admission Requirements"),
+        "career_opportunities": extract_multiline("Career Opportunities"),
+        "course_fee": extract_field("Fees"),
+    }
+
+
+_features: Optional[CourseFeatureTable] = None
+_features_lock = threading.Lock()
+
+
+def get_course_features() -> CourseFeatureTable:
+    """
+    Get or build the course feature table (singleton, parsed once per process)
+
+    Returns:
+        CourseFeatureTable for CourseData.json
+    """
+    global _features
+    if _features is None:
+        with _features_lock:
+            if _features is None:
+                _features = CourseFeatureTable(load_courses())
+    return _features
+
+
+def feature_row(course_meta: Dict[str, Any]) -> Optional[int]:
+    """
+    Feature-table row of a retrieved course
+
+    Args:
+        course_meta: Course metadata from the index
+
+    Returns:
+        Row index, None for courses not in the catalog
+    """
+    if not course_meta.get("content_hash") and not course_meta.get("course"):
+        return None
+    return get_course_features().lookup(course_meta)
@@ -8,12 +8,127 @@ Produces 768-dimensional vectors optimized for:
 - RAG retrieval
 
 Note: This model is for embeddings only, NOT for text generation.
+
+The *_array methods return float32 NumPy arrays straight from the model
+(no Python list round-trip). Arrays handed out by the cache are read-only
+and shared between callers. embed/embed_batch remain as list wrappers.
+
+EMBEDDING_BACKEND selects the forward pass: "torch" (SentenceTransformer)
+or "onnx" (ONNX Runtime, optionally int8-quantized, see onnx_embedder.py).
+
+EMBEDDING_DIMENSION < 768 enables Matryoshka truncation (layer norm ->
+truncate -> re-normalize, as recommended for nomic-embed-text-v1.5). The
+same transform is applied to queries and to the index build.
 """
 
 import os
+import re
+import time
+import hashlib
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from typing import Union, List
+from typing import Union, List, Optional, Dict, Any
+
+from utils.config import (
+    EMBEDDING_BACKEND,
+    EMBEDDING_DIMENSION,
+    ONNX_MODEL_DIR,
+    ONNX_QUANTIZE,
+    ONNX_MAX_SEQ_LENGTH,
+    EMBEDDING_CACHE_SIZE,
+    EMBEDDING_CACHE_TTL,
+    EMBEDDING_BATCHING_ENABLED,
+    EMBEDDING_BATCH_MAX_WAIT_MS,
+    EMBEDDING_BATCH_MAX_SIZE,
+    EMBEDDING_BATCH_TIMEOUT,
+)
+
+
+class EmbeddingCache:
+    """
+    Thread-safe, bounded LRU cache for query embeddings.
+
+    Keys are a SHA-256 of the whitespace-normalized text plus the normalize
+    flag. Whitespace normalization does not change the tokens the model
+    sees, so cached vectors are identical to freshly computed ones.
+    Vectors are stored as read-only float32 arrays and returned without copying.
+    """
+
+    def __init__(self, capacity: int = 1024, ttl: float = 3600.0):
+        """
+        Args:
+            capacity: Maximum number of cached vectors (0 disables the cache)
+            ttl: Seconds before an entry expires (0 = never expires)
+        """
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(text: str, normalize: bool) -> str:
+        """Hash of the whitespace-normalized text and the normalize flag"""
+        canonical = re.sub(r"\s+", " ", text).strip()
+        return hashlib.sha256(f"{int(normalize)}:{canonical}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return the cached (read-only) vector, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            vector, stored_at = entry
+            if self.ttl > 0 and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        """Store a vector, evicting the least recently used entries if full"""
+        if self.capacity <= 0 or vector is None or len(vector) == 0:
+            return
+        vector = np.asarray(vector, dtype=np.float32)
+        vector.flags.writeable = False
+        with self._lock:
+            self._entries[key] = (vector, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
 
 
 class NomicEmbedder:
@@ -23,17 +138,49 @@ class NomicEmbedder:
     Produces 768-dimension vectors for semantic search and RAG retrieval.
     """
     
-    def __init__(self, model_name: str = "nomic-ai/nomic-embed-text-v1.5"):
+    def __init__(
+        self,
+        model_name: str = "nomic-ai/nomic-embed-text-v1.5",
+        cache_size: int = EMBEDDING_CACHE_SIZE,
+        cache_ttl: float = EMBEDDING_CACHE_TTL,
+        backend: str = EMBEDDING_BACKEND,
+        quantize: bool = ONNX_QUANTIZE,
+        dimension: int = EMBEDDING_DIMENSION
+    ):
         """
         Initialize the Nomic embedding model
         
         Args:
             model_name: HuggingFace model identifier
+            cache_size: Max cached query embeddings (0 disables caching)
+            cache_ttl: Seconds before a cached embedding expires (0 = never)
+            backend: "torch" (SentenceTransformer) or "onnx" (ONNX Runtime)
+            quantize: Use the int8-quantized model (onnx backend only)
+            dimension: Output dimension (Matryoshka truncation below 768)
         """
         self.model_name = model_name
-        print(f"📥 Loading embedding model: {model_name}...")
-        self.model = SentenceTransformer(model_name, trust_remote_code=True)
-        print(f"✅ Embedding model loaded (dimension: 768)")
+        self.backend = backend
+        self.cache = EmbeddingCache(capacity=cache_size, ttl=cache_ttl)
+        print(f"📥 Loading embedding model: {model_name} (backend: {backend})...")
+        if backend == "onnx":
+            from core.rag.onnx_embedder import load_onnx_encoder
+            self.model = load_onnx_encoder(
+                model_name,
+                ONNX_MODEL_DIR,
+                quantized=quantize,
+                max_seq_length=ONNX_MAX_SEQ_LENGTH
+            )
+        else:
+            from sentence_transformers import SentenceTransformer
+            self.model = SentenceTransformer(model_name, trust_remote_code=True)
+
+        self.full_dimension = self.model.get_sentence_embedding_dimension()
+        if not 0 < dimension <= self.full_dimension:
+            raise ValueError(
+                f"EMBEDDING_DIMENSION must be between 1 and {self.full_dimension}, got {dimension}"
+            )
+        self.dimension = dimension
+        print(f"✅ Embedding model loaded (dimension: {self.dimension})")
     
     def normalize(self, vector: Union[np.ndarray, List[float]]) -> List[float]:
         """
@@ -45,59 +192,127 @@ class NomicEmbedder:
         Returns:
             Normalized vector as list
         """
-        v = np.array(vector)
+        return self.normalize_array(vector).tolist()
+    
+    @staticmethod
+    def normalize_array(vector: Union[np.ndarray, List[float]]) -> np.ndarray:
+        """
+        L2-normalize a vector as float32 (no list conversion)
+        
+        Args:
+            vector: Input vector (numpy array or list)
+            
+        Returns:
+            Normalized float32 array
+        """
+        v = np.asarray(vector, dtype=np.float32)
         norm = np.linalg.norm(v)
         if norm == 0:
-            return v.tolist()
-        return (v / norm).tolist()
+            return v
+        return v / norm
     
-    def embed(self, text: str, normalize: bool = True) -> List[float]:
+    @staticmethod
+    def matryoshka_truncate(embeddings: np.ndarray, dimension: int, normalize: bool = True) -> np.ndarray:
         """
-        Generate embedding for a single text
+        Reduce full-size embeddings to a Matryoshka prefix
+        
+        Layer norm over the full vector, keep the first `dimension` values,
+        then L2-normalize. Layer norm is scale-invariant, so this gives the
+        same result on normalized and raw model output.
+        
+        Args:
+            embeddings: (dim,) or (n, dim) float32 array
+            dimension: Target dimension
+            normalize: Re-normalize the truncated vectors
+            
+        Returns:
+            (dimension,) or (n, dimension) float32 array
+        """
+        x = np.asarray(embeddings, dtype=np.float32)
+        mean = x.mean(axis=-1, keepdims=True)
+        var = x.var(axis=-1, keepdims=True)
+        x = (x - mean) / np.sqrt(var + 1e-5)
+        x = np.ascontiguousarray(x[..., :dimension])
+        if normalize:
+            norms = np.linalg.norm(x, axis=-1, keepdims=True)
+            x /= np.clip(norms, 1e-12, None)
+        return x
+    
+    def _reduce(self, embeddings: np.ndarray, normalize: bool) -> np.ndarray:
+        """Apply Matryoshka truncation when a reduced dimension is configured"""
+        if self.dimension >= self.full_dimension:
+            return embeddings
+        return self.matryoshka_truncate(embeddings, self.dimension, normalize=normalize)
+    
+    def embed_array(self, text: str, normalize: bool = True) -> np.ndarray:
+        """
+        Generate embedding for a single text as a float32 array
         
         Args:
             text: Input text to embed
             normalize: Whether to normalize the output vector
             
         Returns:
-            768-dimensional embedding vector
+            Read-only float32 array of get_dimension() values (empty on failure)
         """
+        cache_key = EmbeddingCache.make_key(text, normalize)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            # Generate embedding
+            # Generate embedding (SentenceTransformer already returns float32 numpy)
             embedding = self.model.encode(
                 text,
                 convert_to_tensor=False,
                 normalize_embeddings=normalize
             )
             
-            vector = embedding.tolist()
+            vector = np.asarray(embedding, dtype=np.float32)
             
             # Additional normalization if requested and not already done
             if normalize and not self.model.encode.__defaults__:
-                vector = self.normalize(vector)
+                vector = self.normalize_array(vector)
             
+            vector = self._reduce(vector, normalize)
+            self.cache.put(cache_key, vector)
             return vector
             
         except Exception as e:
             print(f"⚠️ Error generating embedding: {e}")
-            return []
+            return np.empty(0, dtype=np.float32)
     
-    def embed_batch(
+    def embed(self, text: str, normalize: bool = True) -> List[float]:
+        """
+        Generate embedding for a single text
+        
+        Args:
+            text: Input text to embed
+            normalize: Whether to normalize the output vector
+            
+        Returns:
+            768-dimensional embedding vector
+        """
+        return self.embed_array(text, normalize=normalize).tolist()
+    
+    def embed_batch_array(
         self,
         texts: List[str],
         normalize: bool = True,
-        batch_size: int = 32
-    ) -> List[List[float]]:
+        batch_size: int = 32,
+        show_progress: bool = True
+    ) -> np.ndarray:
         """
-        Generate embeddings for multiple texts (batched for efficiency)
+        Generate embeddings for multiple texts as one float32 matrix
         
         Args:
             texts: List of input texts
             normalize: Whether to normalize output vectors
             batch_size: Number of texts to process at once
+            show_progress: Show the encode progress bar
             
         Returns:
-            List of 768-dimensional embedding vectors
+            (len(texts), get_dimension()) float32 array (empty on failure)
         """
         try:
             # Generate embeddings in batches
@@ -106,25 +321,221 @@ class NomicEmbedder:
                 convert_to_tensor=False,
                 normalize_embeddings=normalize,
                 batch_size=batch_size,
-                show_progress_bar=True
+                show_progress_bar=show_progress
             )
             
-            # Convert to list format
-            vectors = [emb.tolist() for emb in embeddings]
-            
-            return vectors
+            return self._reduce(np.asarray(embeddings, dtype=np.float32), normalize)
             
         except Exception as e:
             print(f"⚠️ Error generating batch embeddings: {e}")
-            return []
+            return np.empty((0, 0), dtype=np.float32)
+    
+    def embed_batch(
+        self,
+        texts: List[str],
+        normalize: bool = True,
+        batch_size: int = 32,
+        show_progress: bool = True
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for multiple texts (batched for efficiency)
+        
+        Args:
+            texts: List of input texts
+            normalize: Whether to normalize output vectors
+            batch_size: Number of texts to process at once
+            show_progress: Show the encode progress bar
+            
+        Returns:
+            List of 768-dimensional embedding vectors
+        """
+        embeddings = self.embed_batch_array(
+            texts,
+            normalize=normalize,
+            batch_size=batch_size,
+            show_progress=show_progress
+        )
+        return embeddings.tolist()
     
     def get_dimension(self) -> int:
-        """Get the embedding dimension (should be 768 for Nomic)"""
-        return self.model.get_sentence_embedding_dimension()
+        """Get the output embedding dimension (768 for Nomic unless truncated)"""
+        return self.dimension
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching coalescer for concurrent single-text embedding calls.
+
+    Callers on different threads submit one text each. A background worker
+    waits up to max_wait_ms (or until max_batch_size texts are queued), runs
+    a single embed_batch forward pass, and hands every caller its own vector.
+    Cache hits are answered immediately and never enter the queue. A failed
+    batch fails every future in it, and a caller waits at most timeout
+    seconds; either way embed_array returns an empty vector, like
+    NomicEmbedder.embed_array on error.
+    """
+
+    def __init__(
+        self,
+        embedder: NomicEmbedder,
+        max_wait_ms: float = EMBEDDING_BATCH_MAX_WAIT_MS,
+        max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE,
+        timeout: float = EMBEDDING_BATCH_TIMEOUT
+    ):
+        """
+        Args:
+            embedder: Embedder that runs the batched forward pass
+            max_wait_ms: How long to wait for more requests after the first one
+            max_batch_size: Maximum texts per forward pass
+            timeout: Seconds embed_array waits for its result
+        """
+        self.embedder = embedder
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.timeout = timeout
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.texts = 0
+        self.failures = 0
+        self.timeouts = 0
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name="embedding-batcher", daemon=True
+                    )
+                    self._worker.start()
+
+    def submit(self, text: str, normalize: bool = True) -> Future:
+        """
+        Queue a text for the next batch
+        
+        Returns:
+            Future resolving to the float32 embedding array
+        """
+        future: Future = Future()
+        cache_key = EmbeddingCache.make_key(text, normalize)
+        cached = self.embedder.cache.get(cache_key)
+        if cached is not None:
+            future.set_result(cached)
+            return future
+
+        self._ensure_worker()
+        self._queue.put((text, normalize, cache_key, future))
+        return future
+
+    def embed_array(self, text: str, normalize: bool = True) -> np.ndarray:
+        """Blocking single-text embed routed through the batcher (empty on failure or timeout)"""
+        future = self.submit(text, normalize)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Not computed yet: drop it so the worker skips it
+            future.cancel()
+            self.timeouts += 1
+            print(f"⚠️ Batched embedding timed out after {self.timeout}s")
+        except Exception as e:
+            print(f"⚠️ Error in batched embedding: {e}")
+        return np.empty(0, dtype=np.float32)
+
+    def embed(self, text: str, normalize: bool = True) -> List[float]:
+        """List wrapper around embed_array"""
+        return self.embed_array(text, normalize).tolist()
+
+    def _collect(self) -> List[tuple]:
+        """Block for the first request, then gather more until the window closes"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+
+            try:
+                # normalize is part of the forward pass, so group by it
+                for flag in (True, False):
+                    group = [item for item in batch if bool(item[1]) == flag]
+                    if group:
+                        self._process(group, flag)
+            except Exception as e:
+                # Never leave a caller waiting, and keep the worker alive
+                print(f"⚠️ Error in embedding batcher: {e}")
+                self._fail(batch, e)
+
+    def _process(self, group: List[tuple], normalize: bool) -> None:
+        # Callers that timed out have cancelled their futures
+        group = [item for item in group if not item[3].done()]
+        if not group:
+            return
+
+        try:
+            vectors = self.embedder.embed_batch_array(
+                [item[0] for item in group],
+                normalize=normalize,
+                batch_size=len(group),
+                show_progress=False
+            )
+            if len(vectors) != len(group):
+                raise RuntimeError(f"{len(vectors)} embeddings for {len(group)} texts")
+        except Exception as e:
+            print(f"⚠️ Error in batched embedding: {e}")
+            self._fail(group, e)
+            return
+
+        self.batches += 1
+        self.texts += len(group)
+
+        for idx, (_, _, cache_key, future) in enumerate(group):
+            # Each caller gets a row view of the batch matrix (no copy)
+            vector = vectors[idx]
+            self.embedder.cache.put(cache_key, vector)
+            try:
+                future.set_result(vector)
+            except InvalidStateError:
+                # Cancelled by a timed-out caller in the meantime
+                pass
+
+    def _fail(self, group: List[tuple], error: Exception) -> None:
+        """Resolve every pending future of the group with the error"""
+        self.failures += 1
+        for _, _, _, future in group:
+            if future.done():
+                continue
+            try:
+                future.set_exception(error)
+            except InvalidStateError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch counters (avg_batch_size > 1 means forward passes were shared)"""
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_batch_size": self.max_batch_size
+        }
 
 
 # Global embedder instance (singleton pattern)
 _embedder = None
+_batcher = None
+_singleton_lock = threading.Lock()
 
 
 def get_nomic_embedder() -> NomicEmbedder:
@@ -136,10 +547,45 @@ def get_nomic_embedder() -> NomicEmbedder:
     """
     global _embedder
     if _embedder is None:
-        _embedder = NomicEmbedder()
+        with _singleton_lock:
+            if _embedder is None:
+                _embedder = NomicEmbedder()
     return _embedder
 
 
+def get_embedding_batcher() -> EmbeddingBatcher:
+    """
+    Get or create the global micro-batcher in front of the singleton embedder
+    
+    Returns:
+        Singleton EmbeddingBatcher instance
+    """
+    global _batcher
+    if _batcher is None:
+        embedder = get_nomic_embedder()
+        with _singleton_lock:
+            if _batcher is None:
+                _batcher = EmbeddingBatcher(embedder)
+    return _batcher
+
+
+def embed_text_array(text: str, normalize: bool = True) -> np.ndarray:
+    """
+    Convenience function to embed a single text as a float32 array
+    
+    Args:
+        text: Input text
+        normalize: Whether to normalize the vector
+        
+    Returns:
+        Read-only 768-dimensional float32 array (empty on failure)
+    """
+    if EMBEDDING_BATCHING_ENABLED:
+        return get_embedding_batcher().embed_array(text, normalize=normalize)
+    embedder = get_nomic_embedder()
+    return embedder.embed_array(text, normalize=normalize)
+
+
 def embed_text(text: str, normalize: bool = True) -> List[float]:
     """
     Convenience function to embed a single text
@@ -151,8 +597,7 @@ def embed_text(text: str, normalize: bool = True) -> List[float]:
     Returns:
         768-dimensional embedding vector
     """
-    embedder = get_nomic_embedder()
-    return embedder.embed(text, normalize=normalize)
+    return embed_text_array(text, normalize=normalize).tolist()
 
 
 def embed_texts(texts: List[str], normalize: bool = True, batch_size: int = 32) -> List[List[float]]:
@@ -171,6 +616,30 @@ def embed_texts(texts: List[str], normalize: bool = True, batch_size: int = 32)
     return embedder.embed_batch(texts, normalize=normalize, batch_size=batch_size)
 
 
+def get_embedding_cache_stats() -> Dict[str, Any]:
+    """
+    Query-embedding cache counters (hits = transformer forward passes saved)
+    
+    Returns:
+        Cache statistics, or an empty dict if the embedder is not loaded yet
+    """
+    if _embedder is None:
+        return {}
+    return _embedder.cache.stats()
+
+
+def get_embedding_batcher_stats() -> Dict[str, Any]:
+    """
+    Micro-batcher counters
+    
+    Returns:
+        Batcher statistics, or an empty dict if batching has not been used
+    """
+    if _batcher is None:
+        return {}
+    return _batcher.stats()
+
+
 if __name__ == "__main__":
     # Test the embedder
     print("\n" + "="*60)
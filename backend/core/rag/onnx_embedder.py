@@ -0,0 +1,222 @@
+"""
+ONNX Runtime backend for the Nomic embedder
+
+Exports nomic-ai/nomic-embed-text-v1.5 to ONNX (optionally with dynamic
+int8 weight quantization) and runs it through ONNX Runtime on CPU.
+
+OnnxSentenceEncoder exposes the subset of the SentenceTransformer API that
+NomicEmbedder uses (encode / get_sentence_embedding_dimension), so the
+cache, micro-batcher and array API work unchanged on top of it.
+
+Only onnxruntime and the tokenizer are needed at inference time; torch
+and sentence-transformers are only imported to export the model.
+"""
+
+import os
+import numpy as np
+from typing import List, Union
+
+ONNX_FP32_FILE = "model.onnx"
+ONNX_INT8_FILE = "model_int8.onnx"
+
+
+def export_onnx_model(
+    model_name: str,
+    output_dir: str,
+    quantize: bool = True,
+    opset: int = 17
+) -> str:
+    """
+    Export the transformer of a SentenceTransformer model to ONNX
+
+    Args:
+        model_name: HuggingFace model identifier
+        output_dir: Directory for model.onnx, model_int8.onnx and the tokenizer
+        quantize: Also write a dynamic int8-quantized copy
+        opset: ONNX opset version
+
+    Returns:
+        Path to the exported fp32 model
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(output_dir, exist_ok=True)
+    fp32_path = os.path.join(output_dir, ONNX_FP32_FILE)
+
+    print(f"📦 Exporting {model_name} to ONNX at {output_dir}...")
+    st_model = SentenceTransformer(model_name, trust_remote_code=True, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+
+    class _HiddenStates(torch.nn.Module):
+        """Returns last_hidden_state only; pooling is done in NumPy"""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            return self.model(input_ids=input_ids, attention_mask=attention_mask)[0]
+
+    dummy = tokenizer(["course recommendation export"], return_tensors="pt")
+    with torch.no_grad():
+        torch.onnx.export(
+            _HiddenStates(transformer),
+            (dummy["input_ids"], dummy["attention_mask"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=opset,
+        )
+    tokenizer.save_pretrained(output_dir)
+    print(f"✅ ONNX model written: {fp32_path}")
+
+    if quantize:
+        quantize_onnx_model(output_dir)
+
+    return fp32_path
+
+
+def quantize_onnx_model(model_dir: str) -> str:
+    """
+    Apply dynamic int8 weight quantization to an exported model
+
+    Args:
+        model_dir: Directory containing model.onnx
+
+    Returns:
+        Path to the quantized model
+    """
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    int8_path = os.path.join(model_dir, ONNX_INT8_FILE)
+    quantize_dynamic(
+        os.path.join(model_dir, ONNX_FP32_FILE),
+        int8_path,
+        weight_type=QuantType.QInt8
+    )
+    print(f"✅ Quantized int8 model written: {int8_path}")
+    return int8_path
+
+
+class OnnxSentenceEncoder:
+    """
+    SentenceTransformer-compatible encoder running on ONNX Runtime
+    (mean pooling over the last hidden state, optional L2 normalization).
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        quantized: bool = True,
+        max_seq_length: int = 512,
+        num_threads: int = 0
+    ):
+        """
+        Args:
+            model_dir: Directory produced by export_onnx_model()
+            quantized: Load model_int8.onnx instead of model.onnx
+            max_seq_length: Tokenizer truncation length
+            num_threads: ONNX Runtime intra-op threads (0 = runtime default)
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_file = ONNX_INT8_FILE if quantized else ONNX_FP32_FILE
+        model_path = os.path.join(model_dir, model_file)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.max_seq_length = max_seq_length
+        self.model_path = model_path
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self._dimension = self.session.get_outputs()[0].shape[-1]
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return int(self._dimension)
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        convert_to_tensor: bool = False,
+        normalize_embeddings: bool = False,
+        batch_size: int = 32,
+        show_progress_bar: bool = False
+    ) -> np.ndarray:
+        """
+        Embed one text (returns 1-D) or a list of texts (returns 2-D float32)
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        output = np.empty((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        for start in range(0, len(texts), batch_size):
+            chunk = texts[start:start + batch_size]
+            encoded = self.tokenizer(
+                chunk,
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            feeds = {
+                name: encoded[name].astype(np.int64)
+                for name in ("input_ids", "attention_mask")
+                if name in self._input_names
+            }
+            hidden = self.session.run(None, feeds)[0]
+
+            # Mean pooling over real (non-padding) tokens
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            summed = (hidden * mask).sum(axis=1)
+            counts = np.clip(mask.sum(axis=1), 1e-9, None)
+            output[start:start + len(chunk)] = summed / counts
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(output, axis=1, keepdims=True)
+            output /= np.clip(norms, 1e-12, None)
+
+        return output[0] if single else output
+
+
+def load_onnx_encoder(
+    model_name: str,
+    model_dir: str,
+    quantized: bool = True,
+    max_seq_length: int = 512
+) -> OnnxSentenceEncoder:
+    """
+    Load the ONNX encoder, exporting (and quantizing) the model on first use
+
+    Args:
+        model_name: HuggingFace model identifier (used only for export)
+        model_dir: Directory holding the exported model
+        quantized: Use the int8 model
+        max_seq_length: Tokenizer truncation length
+
+    Returns:
+        OnnxSentenceEncoder instance
+    """
+    fp32_path = os.path.join(model_dir, ONNX_FP32_FILE)
+    int8_path = os.path.join(model_dir, ONNX_INT8_FILE)
+
+    if not os.path.exists(fp32_path):
+        print(f"ONNX model not found at {model_dir}. Exporting (one-time)...")
+        export_onnx_model(model_name, model_dir, quantize=quantized)
+    elif quantized and not os.path.exists(int8_path):
+        quantize_onnx_model(model_dir)
+
+    return OnnxSentenceEncoder(model_dir, quantized=quantized, max_seq_length=max_seq_length)
@@ -0,0 +1,133 @@
+"""
+Retrieval Predicates
+
+Structured course attributes stored as index metadata at build time, and
+the matching Chroma-style `where` filter built from a student profile at
+query time. Both sides use the same normalization, so the vector search
+only returns courses the eligibility and preference filters would keep.
+
+Stored per course:
+- loc_<token>: True for each word of the course location ("colombo", "kandy", ...)
+- method_onsite / method_online: study-method flags (same keyword groups as filtering_agent)
+- requires_al: course_requires_al() evaluated on the course metadata
+- ielts_min: eligibility_rules.ielts_requirement() of the entry requirements (0.0 = none)
+- career_bits / career_map_version: career_intent bitset of the course and
+  the CAREER_DOMAIN_MAP version it was computed with
+"""
+
+import re
+from typing import Dict, Any, List, Optional
+
+from utils.keyword_matcher import KeywordMatcher
+from core.services.eligibility_rules import ielts_requirement, user_ielts_score
+from utils.config import ELIGIBILITY_ENTRY_GATES
+
+# Bump when the stored keys change; indexes without them are queried unfiltered
+FILTER_METADATA_VERSION = 2
+
+LOCATION_PREFIX = "loc_"
+
+# Same synonym groups as filtering_agent.matches_study_method
+ONSITE_KEYWORDS = ["onsite", "full time", "full-time", "fulltime"]
+ONLINE_KEYWORDS = ["online", "distance", "part time", "part-time", "parttime"]
+STUDY_METHOD_MATCHER = KeywordMatcher({"onsite": ONSITE_KEYWORDS, "online": ONLINE_KEYWORDS})
+
+
+# -------------------------
+# Index time
+# -------------------------
+def location_tokens(text: str) -> List[str]:
+    """Lowercase alphabetic words of a location string ("Colombo / ESU-Kandy" -> colombo, esu, kandy)"""
+    if not text or text.strip().lower() == "n/a":
+        return []
+    return sorted(set(re.findall(r"[a-z]+", text.lower())))
+
+
+def study_method_flags(text: str) -> Dict[str, bool]:
+    """Onsite/online flags for a course (or preferred) study method"""
+    groups = STUDY_METHOD_MATCHER.match(text or "")
+    return {
+        "method_onsite": "onsite" in groups,
+        "method_online": "online" in groups,
+    }
+
+
+def build_filter_metadata(course: Dict[str, Any], metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Structured filter fields for one course
+
+    Args:
+        course: Raw course record from CourseData.json
+        metadata: Display metadata from index_builder.build_metadata()
+
+    Returns:
+        Dict of scalar fields to merge into the stored metadata
+    """
+    # Imported here: core.agents imports this module via the orchestrator
+    from core.agents.eligibility_agent import course_requires_al
+    from core.agents.career_intent import career_bits, CAREER_MAP_VERSION
+
+    fields: Dict[str, Any] = {
+        f"{LOCATION_PREFIX}{token}": True
+        for token in location_tokens(metadata.get("location") or metadata.get("campus") or "")
+    }
+    fields.update(study_method_flags(metadata.get("study_method", "")))
+    fields["requires_al"] = course_requires_al(metadata)
+    fields["ielts_min"] = ielts_requirement(course.get("Entry Requirements", ""))
+    fields["career_bits"] = career_bits(f"{metadata.get('course', '')} {metadata.get('department', '')}")
+    fields["career_map_version"] = CAREER_MAP_VERSION
+    fields["filter_version"] = FILTER_METADATA_VERSION
+    return fields
+
+
+# -------------------------
+# Query time
+# -------------------------
+def _any_of(clauses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def build_where_filter(user: Dict[str, Any], include_preferences: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Chroma-style `where` filter for a student profile
+
+    Eligibility predicates (A/L, and IELTS with ELIGIBILITY_ENTRY_GATES) are
+    hard constraints, exactly as filter_by_eligibility applies them. Location and
+    study method are preferences and can be left out so a retry can widen
+    the search.
+
+    Args:
+        user: User profile
+        include_preferences: Also filter on preferred locations / study method
+
+    Returns:
+        where dict, or None when nothing restricts the search
+    """
+    from core.agents.eligibility_agent import has_al_eligibility
+
+    clauses: List[Dict[str, Any]] = []
+
+    if not has_al_eligibility(user):
+        clauses.append({"requires_al": False})
+
+    # Same gate as eligibility_agent: IELTS only restricts results when enabled
+    if ELIGIBILITY_ENTRY_GATES:
+        score = user_ielts_score(user)
+        if score is not None:
+            clauses.append({"ielts_min": {"$lte": score}})
+
+    if include_preferences:
+        pref = (user.get("preferred_locations") or "")
+        tokens = location_tokens(pref)
+        if tokens:
+            clauses.append(_any_of([{f"{LOCATION_PREFIX}{t}": True} for t in tokens]))
+
+        # Only the two keyword groups can be expressed as flags; other
+        # preferences (e.g. "weekend") are left to filtering_agent
+        wanted = [flag for flag, on in study_method_flags(user.get("study_method", "")).items() if on]
+        if wanted:
+            clauses.append(_any_of([{flag: True} for flag in wanted]))
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
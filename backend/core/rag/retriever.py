@@ -1,44 +1,283 @@
-import json
+"""
+RAG Retriever
+
+Heavy resources (embedding model, Chroma client, NumPy/FAISS index) are created
+lazily on first use, so importing this module is cheap. The API process
+calls warm_up() at startup to load them before taking traffic.
+"""
 import os
+import time
+import threading
 import numpy as np
-import chromadb
+from typing import Dict, Any, Optional
 
 # Import Nomic embedder
 try:
-    from core.rag.nomic_embedder import get_nomic_embedder, embed_text
+    from core.rag.nomic_embedder import get_nomic_embedder, embed_text_array
 except ImportError:
-    from nomic_embedder import get_nomic_embedder, embed_text
+    from nomic_embedder import get_nomic_embedder, embed_text_array
+
+from utils.config import (
+    EMBEDDINGS_DIR, RETRIEVAL_BACKEND, RETRIEVAL_MODE, RETRIEVAL_PREDICATE_PUSHDOWN,
+    HYBRID_LEXICAL_K, HYBRID_FUSION, HYBRID_RRF_K, NUMPY_INDEX_DIR, MULTIVECTOR_INDEX_DIR, FAISS_INDEX_DIR, FAISS_INDEX_TYPE,
+    FAISS_NLIST, FAISS_NPROBE, FAISS_HNSW_M, FAISS_EF_SEARCH
+)
+from vectorstore.numpy_store import NumpyVectorStore, EMBEDDINGS_FILE
+from core.rag.index_builder import INDEX_VERSION_FILE
 
 # Get paths
-current_dir = os.path.dirname(os.path.abspath(__file__))
-backend_dir = os.path.dirname(os.path.dirname(current_dir))
-persist_dir = os.path.join(backend_dir, "data", "embeddings")
+persist_dir = EMBEDDINGS_DIR
+
+# Lazily-initialized resources (singleton pattern)
+_collection = None
+_vector_store = None
+_hybrid_store = None
+_supports_predicates = None
+_init_lock = threading.RLock()
+
+
+def get_collection():
+    """
+    Get or open the ChromaDB 'courses' collection
+    
+    Returns:
+        chromadb Collection
+    """
+    global _collection
+    if _collection is None:
+        with _init_lock:
+            if _collection is None:
+                import chromadb
+                print(f"Connecting to ChromaDB at {persist_dir}...")
+                chroma = chromadb.PersistentClient(path=persist_dir)
+                _collection = chroma.get_collection("courses")
+    return _collection
+
+
+def load_numpy_store() -> NumpyVectorStore:
+    """
+    Load the memory-mapped NumPy index, exporting it from Chroma on first use.
+    """
+    if not os.path.exists(os.path.join(NUMPY_INDEX_DIR, EMBEDDINGS_FILE)):
+        print(f"NumPy index not found at {NUMPY_INDEX_DIR}. Exporting from ChromaDB...")
+        NumpyVectorStore.from_chroma(get_collection()).save(NUMPY_INDEX_DIR)
+    store = NumpyVectorStore.load(NUMPY_INDEX_DIR, mmap=True)
+    print(f"NumPy index loaded: {store.count()} courses")
+    return store
+
+
+def load_faiss_store():
+    """
+    Load the FAISS index, building it from the Chroma collection on first use.
+    """
+    # faiss is only needed when RETRIEVAL_BACKEND=faiss
+    from vectorstore.faiss_store import FaissVectorStore, INDEX_FILE
+
+    if not os.path.exists(os.path.join(FAISS_INDEX_DIR, INDEX_FILE)):
+        print(f"FAISS index not found at {FAISS_INDEX_DIR}. Building from ChromaDB...")
+        source = NumpyVectorStore.from_chroma(get_collection())
+        FaissVectorStore.build(
+            source.embeddings, source.ids, source.documents, source.metadatas,
+            index_type=FAISS_INDEX_TYPE, nlist=FAISS_NLIST, hnsw_m=FAISS_HNSW_M
+        ).save(FAISS_INDEX_DIR)
+    store = FaissVectorStore.load(
+        FAISS_INDEX_DIR, mmap=True, nprobe=FAISS_NPROBE, ef_search=FAISS_EF_SEARCH
+    )
+    print(f"FAISS {store.index_type} index loaded: {store.count()} courses")
+    return store
+
+
+def load_multivector_store():
+    """
+    Load the field-chunk multi-vector index (built by build_index.py --multivector).
+    """
+    from vectorstore.multivector_store import MultiVectorStore, CHUNK_EMBEDDINGS_FILE
+
+    if not os.path.exists(os.path.join(MULTIVECTOR_INDEX_DIR, CHUNK_EMBEDDINGS_FILE)):
+        # Unlike the NumPy/FAISS exports this needs every chunk embedded, so it is not built here
+        raise RuntimeError(
+            f"Multi-vector index not found at {MULTIVECTOR_INDEX_DIR}. "
+            f"Run scripts/build_index.py --multivector first."
+        )
+    store = MultiVectorStore.load(MULTIVECTOR_INDEX_DIR, mmap=True)
+    print(f"Multi-vector index loaded: {store.count()} courses, {store.chunk_count()} chunks")
+    return store
+
+
+def index_dimension(store) -> int:
+    """Embedding dimension recorded with the index (pre-Matryoshka indexes are 768)"""
+    # NumPy/FAISS stores know their dimension; Chroma records it in collection metadata
+    if hasattr(store, "dimension"):
+        return store.dimension
+    return int((store.metadata or {}).get("embedding_dimension", 768))
+
+
+def check_index_dimension(store) -> None:
+    """Fail fast when the index was built with a different EMBEDDING_DIMENSION"""
+    built_with = index_dimension(store)
+    expected = get_nomic_embedder().get_dimension()
+    if built_with != expected:
+        raise RuntimeError(
+            f"Vector index was built with {built_with}-d embeddings but the embedder produces "
+            f"{expected}-d vectors. Rebuild the index (scripts/build_index.py) "
+            f"or set EMBEDDING_DIMENSION={built_with}."
+        )
+
+
+def get_vector_store():
+    """
+    Get the vector backend used by rag_search (all expose the same query() contract)
+    
+    Returns:
+        Chroma collection, NumpyVectorStore, FaissVectorStore or MultiVectorStore,
+        depending on RETRIEVAL_BACKEND
+    """
+    global _vector_store
+    if _vector_store is None:
+        with _init_lock:
+            if _vector_store is None:
+                if RETRIEVAL_BACKEND == "numpy":
+                    store = load_numpy_store()
+                elif RETRIEVAL_BACKEND == "faiss":
+                    store = load_faiss_store()
+                elif RETRIEVAL_BACKEND == "multivector":
+                    store = load_multivector_store()
+                else:
+                    store = get_collection()
+                check_index_dimension(store)
+                _vector_store = store
+    return _vector_store
+
+
+def get_hybrid_store():
+    """
+    Get the two-stage BM25 + dense retriever (RETRIEVAL_MODE=hybrid)
+
+    Dense scores come from the NumPy index whatever RETRIEVAL_BACKEND is,
+    since reranking needs direct access to candidate embeddings.
+    """
+    global _hybrid_store
+    if _hybrid_store is None:
+        with _init_lock:
+            if _hybrid_store is None:
+                from core.rag.hybrid import HybridRetriever
 
-# Initialize Nomic embedding model
-print("Loading embedding model: nomic-ai/nomic-embed-text-v1.5...")
-embedder = get_nomic_embedder()
+                dense = load_numpy_store()
+                check_index_dimension(dense)
+                start = time.perf_counter()
+                store = HybridRetriever(
+                    dense, lexical_k=HYBRID_LEXICAL_K, fusion=HYBRID_FUSION, rrf_k=HYBRID_RRF_K
+                )
+                print(f"BM25 index built over {store.count()} courses "
+                      f"({len(store.lexical.vocabulary)} terms) in {time.perf_counter() - start:.2f}s")
+                _hybrid_store = store
+    return _hybrid_store
 
-# Connect to ChromaDB
-chroma = chromadb.PersistentClient(path=persist_dir)
-collection = chroma.get_collection("courses")
+
+def get_search_store():
+    """Store rag_search queries: the hybrid retriever or the dense vector backend"""
+    return get_hybrid_store() if RETRIEVAL_MODE == "hybrid" else get_vector_store()
+
+
+def index_supports_predicates() -> bool:
+    """
+    Whether the index stores the structured filter fields (core.rag.predicates)
+
+    Indexes built before predicate pushdown lack them, and filtering on a
+    missing key would drop every course, so those are queried unfiltered.
+    """
+    global _supports_predicates
+    if _supports_predicates is None:
+        _supports_predicates = "filter_version" in sample_metadata()
+        if not _supports_predicates:
+            print("⚠️ Index has no filter metadata; rebuild it to enable predicate pushdown.")
+    return _supports_predicates
+
+
+def get_index_version() -> str:
+    """
+    Build fingerprint written by scripts/build_index.py (read on every call,
+    so a rebuild is seen without a restart)
+    
+    Returns:
+        Version string, "unversioned" for indexes built before versioning
+    """
+    try:
+        with open(os.path.join(persist_dir, INDEX_VERSION_FILE), "r", encoding="utf-8") as f:
+            return f.read().strip() or "unversioned"
+    except OSError:
+        return "unversioned"
+
+
+def sample_metadata() -> Dict[str, Any]:
+    """Metadata of one indexed course (empty dict for an empty index)"""
+    store = get_search_store()
+    if hasattr(store, "metadatas"):
+        sample = store.metadatas[:1]
+    else:
+        sample = store.get(limit=1, include=["metadatas"])["metadatas"] or []
+    return (sample[0] or {}) if sample else {}
+
+
+def index_career_map_current() -> bool:
+    """
+    Whether the index's career bitsets were built with the current CAREER_DOMAIN_MAP
+
+    Stale bitsets are not used (agents fall back to the course feature table),
+    but the index should be rebuilt.
+    """
+    from core.agents.career_intent import CAREER_MAP_VERSION
+
+    current = sample_metadata().get("career_map_version") == CAREER_MAP_VERSION
+    if not current:
+        print("⚠️ Index career bitsets are missing or built with another CAREER_DOMAIN_MAP; "
+              "rebuild the index (scripts/build_index.py --incremental).")
+    return current
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Load the embedding model and vector index and run one query embedding
+    
+    Returns:
+        Seconds spent per component
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    get_nomic_embedder()
+    timings["embedding_model"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    get_search_store()
+    timings["vector_index"] = time.perf_counter() - start
+    index_career_map_current()
+
+    # First forward pass allocates kernels/buffers; do it before real traffic
+    start = time.perf_counter()
+    get_nomic_embedder().embed_array("warm-up query", normalize=True)
+    timings["first_embedding"] = time.perf_counter() - start
+
+    return timings
 
 
 def normalize(v):
-    """Normalize embedding vector for better similarity"""
-    return (np.array(v) / np.linalg.norm(v)).tolist()
+    """Normalize embedding vector for better similarity (float32, no list round-trip)"""
+    v = np.asarray(v, dtype=np.float32)
+    return v / np.linalg.norm(v)
 
 
-def generate_embedding(text: str):
-    """Generate normalized vector embedding using Nomic embedder"""
+def generate_embedding(text: str) -> np.ndarray:
+    """Generate normalized float32 vector embedding using Nomic embedder"""
     try:
         print(f"Generating embedding for text length: {len(text)}")
         # Use the global embedder
-        vec = embed_text(text, normalize=True)
+        vec = embed_text_array(text, normalize=True)
         print(f"Embedding generated. Dimension: {len(vec)}")
         return vec
     except Exception as e:
         print(f"Error generating embedding: {e}")
-        return []
+        return np.empty(0, dtype=np.float32)
 
 
 def build_user_profile(user):
@@ -73,10 +312,16 @@ def build_user_profile(user):
     return profile
 
 
-def rag_search(user_input: dict, top_k: int = 10):
+def rag_search(user_input: dict, top_k: int = 10, where: Optional[Dict[str, Any]] = None):
     """
     Main RAG search function.
     Takes user input → generates semantic query → retrieves best courses.
+
+    Args:
+        user_input: User profile
+        top_k: Number of courses to retrieve
+        where: Optional metadata filter (see core.rag.predicates.build_where_filter)
+               applied inside the vector search, so top_k counts matching courses only
     """
 
     # Build user profile text
@@ -85,22 +330,37 @@ def rag_search(user_input: dict, top_k: int = 10):
     # Generate embedding using Nomic
     query_vec = generate_embedding(user_profile_text)
     
-    if not query_vec:
+    if query_vec.size == 0:
         print("⚠️ Failed to generate embedding for query.")
         return []
 
-    # Query vector database
-    print(f"Querying ChromaDB with top_k={top_k}...")
-    results = collection.query(
-        query_embeddings=[query_vec],
-        n_results=top_k
-    )
+    if where and not (RETRIEVAL_PREDICATE_PUSHDOWN and index_supports_predicates()):
+        where = None
+
+    # Query vector database (the float32 array is passed through as-is)
+    if RETRIEVAL_MODE == "hybrid":
+        from core.rag.hybrid import build_lexical_query
+
+        print(f"Querying hybrid BM25 + dense index with top_k={top_k}" + (f", where={where}" if where else "") + "...")
+        results = get_hybrid_store().query(
+            query_embeddings=[query_vec],
+            n_results=top_k,
+            where=where,
+            query_texts=[build_lexical_query(user_input)]
+        )
+    else:
+        print(f"Querying {RETRIEVAL_BACKEND} index with top_k={top_k}" + (f", where={where}" if where else "") + "...")
+        results = get_vector_store().query(
+            query_embeddings=[query_vec],
+            n_results=top_k,
+            where=where
+        )
 
     # Format output
     output = []
     if results["documents"]:
         num_found = len(results["documents"][0])
-        print(f"ChromaDB found {num_found} documents.")
+        print(f"Vector search found {num_found} documents.")
         for idx in range(num_found):
             doc = results["documents"][0][idx]
             meta = results["metadatas"][0][idx]
@@ -113,6 +373,6 @@ def rag_search(user_input: dict, top_k: int = 10):
                 "document": doc
             })
     else:
-        print("ChromaDB returned no documents.")
+        print("Vector search returned no documents.")
 
     return output
@@ -1 +1,78 @@
 # Eligibility Rules
+"""
+Entry-requirement rules shared by every eligibility path
+
+The course feature table, the per-course fallback in eligibility_agent and
+the retrieval `where` filter all read the IELTS and O/L requirements and
+the student's IELTS score through these functions, so a course gets the
+same verdict whichever path evaluates it. The rules are the ones
+is_eligible_for_course() always applied to the "Entry Requirements" text:
+
+- IELTS: the first score after "IELTS" (DEFAULT_IELTS_MIN when none is given)
+- O/L: "O/L" or "Ordinary Level" is mentioned
+"""
+
+import re
+from typing import Dict, Any, Optional
+
+# Minimum score when a course mentions IELTS without one
+DEFAULT_IELTS_MIN = 5.0
+
+OL_KEYWORDS = ("o/l", "ordinary level")
+
+
+def ielts_requirement(entry_requirements: str) -> float:
+    """Minimum IELTS score in the entry requirements (0.0 when IELTS is not mentioned)"""
+    text = (entry_requirements or "").lower()
+    if "ielts" not in text:
+        return 0.0
+    match = re.search(r'ielts.*?(\d+\.?\d*)', text)
+    if match:
+        try:
+            return float(match.group(1))
+        except ValueError:
+            pass
+    return DEFAULT_IELTS_MIN
+
+
+def requires_ol(entry_requirements: str) -> bool:
+    """O/L is mentioned in the entry requirements"""
+    text = (entry_requirements or "").lower()
+    return any(k in text for k in OL_KEYWORDS)
+
+
+def entry_gates(entry_requirements: str) -> Dict[str, Any]:
+    """
+    IELTS and O/L gates of a course
+
+    Args:
+        entry_requirements: The course's "Entry Requirements" text
+
+    Returns:
+        Dict with 'ielts_min' (0.0 = none) and 'requires_ol'
+    """
+    return {
+        "ielts_min": ielts_requirement(entry_requirements),
+        "requires_ol": requires_ol(entry_requirements),
+    }
+
+
+def user_ielts_score(user: Dict[str, Any]) -> Optional[float]:
+    """
+    IELTS score the gate compares against, in the retrieval filter and the
+    eligibility agent alike. A missing score counts as 0; text without a
+    number is not checked (None).
+    """
+    raw = str(user.get("ielts") or user.get("ielts_score") or "0")
+    match = re.search(r'(\d+\.?\d*)', raw)
+    if not match:
+        return None
+    try:
+        return float(match.group(1))
+    except ValueError:
+        return None
+
+
+def has_ol_results(user: Dict[str, Any]) -> bool:
+    """Student gave O/L results"""
+    return bool(user.get("ol_results") or "")
@@ -0,0 +1,174 @@
+# Pipeline Execution
+"""
+Execution model for the async recommendation pipeline
+
+recommend_courses() runs on the uvicorn event loop, but its stages are
+synchronous: query embedding and vector search (CPU: the forward pass and
+NumPy/FAISS release the GIL; Chroma reads the local index) and the agent
+rules. Calling them directly blocks the loop, so one slow request stalls
+every other request on the worker, health checks included.
+
+run_stage() moves a synchronous call onto a shared bounded thread pool and
+limits how many calls of each stage run at once (an asyncio semaphore per
+stage), so a burst of requests queues per stage instead of oversubscribing
+the CPU or the index. Threads are used rather than processes: the
+embedding model and index are loaded once and shared, and the heavy work
+releases the GIL.
+
+Async I/O stages (LLM calls) stay on the event loop and take a slot from
+the same per-stage limits through stage_slot().
+"""
+
+import asyncio
+import functools
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from utils.config import (
+    PIPELINE_OFFLOAD,
+    PIPELINE_THREADS,
+    PIPELINE_RETRIEVAL_CONCURRENCY,
+    PIPELINE_AGENT_CONCURRENCY,
+    EXPLANATION_LLM_CONCURRENCY,
+)
+
+# Max concurrent calls per stage (stages not listed are only bounded by the pool)
+STAGE_LIMITS = {
+    "retrieval": PIPELINE_RETRIEVAL_CONCURRENCY,
+    "agents": PIPELINE_AGENT_CONCURRENCY,
+    "llm": EXPLANATION_LLM_CONCURRENCY,
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Semaphores belong to one event loop; keep a set per running loop
+_loop_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+_stats_lock = threading.Lock()
+_stage_stats: Dict[str, Dict[str, float]] = {}
+
+
+def get_pipeline_executor() -> ThreadPoolExecutor:
+    """
+    Get or create the shared pipeline thread pool (singleton)
+
+    Returns:
+        ThreadPoolExecutor with PIPELINE_THREADS workers
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=PIPELINE_THREADS, thread_name_prefix="pipeline")
+    return _executor
+
+
+def _stage_semaphore(stage: str) -> Optional[asyncio.Semaphore]:
+    limit = STAGE_LIMITS.get(stage, 0)
+    if limit <= 0:
+        return None
+    loop = asyncio.get_running_loop()
+    semaphores = _loop_semaphores.setdefault(loop, {})
+    if stage not in semaphores:
+        semaphores[stage] = asyncio.Semaphore(limit)
+    return semaphores[stage]
+
+
+def _stage_counters(stage: str) -> Dict[str, float]:
+    # Caller holds _stats_lock
+    return _stage_stats.setdefault(stage, {
+        "calls": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0,
+        "run_seconds": 0.0, "max_run_seconds": 0.0, "active": 0
+    })
+
+
+def _record(stage: str, wait: float, run: float) -> None:
+    with _stats_lock:
+        stats = _stage_counters(stage)
+        stats["calls"] += 1
+        stats["wait_seconds"] += wait
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], wait)
+        stats["run_seconds"] += run
+        stats["max_run_seconds"] = max(stats["max_run_seconds"], run)
+
+
+def _set_active(stage: str, delta: int) -> None:
+    with _stats_lock:
+        _stage_counters(stage)["active"] += delta
+
+
+@asynccontextmanager
+async def stage_slot(stage: str) -> AsyncIterator[None]:
+    """
+    Hold one of a stage's concurrency slots (waits while the stage is at its limit)
+
+    Args:
+        stage: Stage name (concurrency limit from STAGE_LIMITS)
+    """
+    queued = time.perf_counter()
+    semaphore = _stage_semaphore(stage)
+    if semaphore is not None:
+        await semaphore.acquire()
+    started = time.perf_counter()
+    _set_active(stage, 1)
+    try:
+        yield
+    finally:
+        _set_active(stage, -1)
+        _record(stage, started - queued, time.perf_counter() - started)
+        if semaphore is not None:
+            semaphore.release()
+
+
+async def run_stage(stage: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a synchronous pipeline stage without blocking the event loop
+
+    Args:
+        stage: Stage name (concurrency limit from STAGE_LIMITS)
+        fn: Synchronous callable
+        *args, **kwargs: Passed to fn
+
+    Returns:
+        fn's return value (exceptions propagate)
+    """
+    if not PIPELINE_OFFLOAD:
+        # Legacy behaviour: run on the event loop thread
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        _record(stage, 0.0, time.perf_counter() - start)
+        return result
+
+    async with stage_slot(stage):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_pipeline_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def get_pipeline_stats() -> Dict[str, Any]:
+    """
+    Per-stage call counts, queueing and run times
+
+    Returns:
+        Dict of stage -> counters (times in milliseconds)
+    """
+    with _stats_lock:
+        result = {}
+        for stage, stats in _stage_stats.items():
+            calls = stats["calls"]
+            result[stage] = {
+                "limit": STAGE_LIMITS.get(stage, 0),
+                "active": stats["active"],
+                "calls": calls,
+                "avg_wait_ms": round(stats["wait_seconds"] / calls * 1000, 3) if calls else 0.0,
+                "max_wait_ms": round(stats["max_wait_seconds"] * 1000, 3),
+                "avg_run_ms": round(stats["run_seconds"] / calls * 1000, 3) if calls else 0.0,
+                "max_run_ms": round(stats["max_run_seconds"] * 1000, 3),
+            }
+        return {"offload": PIPELINE_OFFLOAD, "threads": PIPELINE_THREADS, "stages": result}
@@ -0,0 +1,292 @@
+# Explanation Cache
+"""
+Persistent LLM explanation cache
+
+An LLM explanation depends only on the course and two profile fields
+(interest_area, career_goal), so the same text would otherwise be
+regenerated for every student with the same goal. Explanations are stored
+in a local SQLite database keyed on:
+
+- the course content hash (index metadata; a hash of the prompt fields otherwise)
+- the normalized career goal and interest area
+- the prompt version and LLM model
+
+SQLite in WAL mode lets every worker process on the host share the file
+(concurrent readers, one writer at a time). Entries expire after a TTL
+and the least recently used ones are pruned above a maximum entry count.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any, Iterable, Optional
+
+from utils.config import (
+    EXPLANATION_CACHE_PATH,
+    EXPLANATION_CACHE_MAX_ENTRIES,
+    EXPLANATION_CACHE_TTL,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS explanations (
+    key TEXT PRIMARY KEY,
+    explanation TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+# Pruning scans the table, so only check every few writes
+PRUNE_EVERY = 64
+
+
+def _normalize(value: Any) -> str:
+    return re.sub(r"\s+", " ", str(value or "").lower()).strip()
+
+
+def course_key(meta: Dict[str, Any]) -> str:
+    """
+    Stable identifier of a course's explanation inputs
+
+    Args:
+        meta: Course metadata
+
+    Returns:
+        content_hash from the index metadata, or a hash of the fields the prompt uses
+    """
+    if meta.get("content_hash"):
+        return meta["content_hash"]
+    fields = [meta.get(k) or meta.get(k.lower().replace(" ", "_")) or ""
+              for k in ("Course", "Campus", "Location", "Study Method", "Duration", "Career Opportunities")]
+    return hashlib.sha256("\x1f".join(map(str, fields)).encode("utf-8")).hexdigest()[:32]
+
+
+def make_explanation_key(meta: Dict[str, Any], user: Dict[str, Any], prompt_version: str) -> str:
+    """
+    Cache key for one course explanation
+
+    Args:
+        meta: Course metadata
+        user: User profile (only interest_area and career_goal are used)
+        prompt_version: Prompt/model version (changing it invalidates every entry)
+
+    Returns:
+        Hex digest
+    """
+    payload = "\x1f".join([
+        course_key(meta),
+        _normalize(user.get("career_goal")),
+        _normalize(user.get("interest_area")),
+        prompt_version,
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExplanationCache:
+    """
+    SQLite-backed explanation store with TTL and LRU pruning, shared across processes.
+    """
+
+    def __init__(
+        self,
+        path: str = EXPLANATION_CACHE_PATH,
+        max_entries: int = EXPLANATION_CACHE_MAX_ENTRIES,
+        ttl: float = EXPLANATION_CACHE_TTL
+    ):
+        """
+        Args:
+            path: SQLite database file (created on first use)
+            max_entries: Maximum stored explanations (least recently used are pruned)
+            ttl: Seconds before an entry expires (0 = never expires)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # sqlite3 connections are per thread (calls come from the pipeline pool)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        with self._connect() as conn:
+            conn.execute(_SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS explanations_accessed ON explanations (accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            # WAL: readers in other workers do not block on a writer
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - created_at > self.ttl
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Cached explanations for a batch of keys (one query)
+
+        Args:
+            keys: make_explanation_key() outputs
+
+        Returns:
+            Dict of key -> explanation for the keys that hit
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            rows = conn.execute(
+                f"SELECT key, explanation, created_at FROM explanations WHERE key IN ({','.join('?' * len(keys))})",
+                keys
+            ).fetchall()
+            found, expired = {}, []
+            for key, explanation, created_at in rows:
+                if self._expired(created_at, now):
+                    expired.append(key)
+                else:
+                    found[key] = explanation
+            if expired:
+                conn.executemany("DELETE FROM explanations WHERE key = ?", [(k,) for k in expired])
+            if found:
+                # LRU: recently served entries survive pruning
+                conn.executemany("UPDATE explanations SET accessed_at = ? WHERE key = ?",
+                                 [(now, k) for k in found])
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+            self.expirations += len(expired)
+        return found
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached explanation for one key, or None"""
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Dict[str, str]) -> None:
+        """
+        Store explanations
+
+        Args:
+            items: Dict of make_explanation_key() output -> explanation
+        """
+        if not items:
+            return
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO explanations (key, explanation, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                [(key, text, now, now) for key, text in items.items()]
+            )
+        with self._lock:
+            self.stores += len(items)
+            before = self._writes
+            self._writes += len(items)
+            prune = before // PRUNE_EVERY != self._writes // PRUNE_EVERY
+        if prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """
+        Delete expired entries, then the least recently used above max_entries
+
+        Returns:
+            Number of deleted entries
+        """
+        conn = self._connect()
+        expired = evicted = 0
+        with conn:
+            if self.ttl > 0:
+                expired = conn.execute("DELETE FROM explanations WHERE created_at < ?",
+                                       (time.time() - self.ttl,)).rowcount
+            excess = conn.execute("SELECT COUNT(*) FROM explanations").fetchone()[0] - self.max_entries
+            if excess > 0:
+                evicted = conn.execute(
+                    "DELETE FROM explanations WHERE key IN "
+                    "(SELECT key FROM explanations ORDER BY accessed_at LIMIT ?)", (excess,)
+                ).rowcount
+        with self._lock:
+            self.expirations += expired
+            self.evictions += evicted
+        return expired + evicted
+
+    def size(self) -> int:
+        """Number of stored explanations (all workers)"""
+        return self._connect().execute("SELECT COUNT(*) FROM explanations").fetchone()[0]
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)"""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM explanations")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters (this process) and size (shared file)"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+        stats["size"] = self.size()
+        stats["max_entries"] = self.max_entries
+        stats["ttl_seconds"] = self.ttl
+        try:
+            stats["size_bytes"] = sum(
+                os.path.getsize(p) for p in (self.path, f"{self.path}-wal") if os.path.exists(p)
+            )
+        except OSError:
+            stats["size_bytes"] = 0
+        return stats
+
+
+_explanation_cache: Optional[ExplanationCache] = None
+_explanation_cache_lock = threading.Lock()
+
+
+def get_explanation_cache() -> ExplanationCache:
+    """
+    Get or create the explanation cache (singleton)
+
+    Returns:
+        ExplanationCache instance
+    """
+    global _explanation_cache
+    if _explanation_cache is None:
+        with _explanation_cache_lock:
+            if _explanation_cache is None:
+                _explanation_cache = ExplanationCache()
+    return _explanation_cache
+
+
+def get_explanation_cache_stats() -> Dict[str, Any]:
+    """
+    Explanation cache counters
+
+    Returns:
+        Cache statistics, or an empty dict if the cache was not used yet
+    """
+    if _explanation_cache is None:
+        return {}
+    return _explanation_cache.stats()
@@ -1 +1,146 @@
 # Recommendation Service
+"""
+Recommendation service: recommend_courses() and its event stream behind the response cache.
+"""
+
+from typing import Dict, Any, AsyncIterator, Optional, Tuple
+
+from core.agents.orchestrator import recommend_courses, recommend_courses_stream
+from core.services.response_cache import (
+    ResponseCache, get_response_cache, make_cache_key, current_version, refresh_version
+)
+from core.services.execution import run_stage
+from utils.config import RESPONSE_CACHE_ENABLED, EXPLANATION_LLM_ENABLED
+
+# Deterministic outcomes worth caching (validation errors and failures are recomputed)
+CACHEABLE_STATUSES = ("success", "blocked")
+
+
+async def _version() -> str:
+    version = current_version()
+    if version is None:
+        # Re-checking stats the catalog and reads the index version file
+        version = await run_stage("cache", refresh_version)
+    return version
+
+
+async def _lookup(cache: ResponseCache, key: str, version: str) -> Optional[Dict[str, Any]]:
+    # The disk tier does file I/O; keep it off the event loop
+    if cache.disk_dir:
+        return await run_stage("cache", cache.get, key, version)
+    return cache.get(key, version)
+
+
+async def _store(cache: ResponseCache, key: str, version: str, response: Dict[str, Any],
+                 explanation_fallbacks: int = 0) -> None:
+    if response.get("status") not in CACHEABLE_STATUSES:
+        return
+    if EXPLANATION_LLM_ENABLED and explanation_fallbacks:
+        # LLM calls timed out or failed: do not serve template text for the whole TTL
+        print(f"⏭️ Response not cached ({explanation_fallbacks} template fallback explanations)")
+        return
+    if cache.disk_dir:
+        await run_stage("cache", cache.put, key, version, response)
+    else:
+        cache.put(key, version, response)
+
+
+async def cached_recommend_courses(user_input: Dict[str, Any],
+                                   initial_k: int = 25,
+                                   final_k: int = 10,
+                                   explain_top_n: int = 5) -> Dict[str, Any]:
+    """
+    Cached recommend_courses()
+
+    Args:
+        user_input: User profile dictionary
+        initial_k: Number of candidates to retrieve from RAG
+        final_k: Number of final recommendations to return
+        explain_top_n: Number of top courses to generate explanations for
+
+    Returns:
+        recommend_courses() output (a copy when served from cache). Responses with
+        template fallbacks for LLM explanations are not cached
+    """
+    if not RESPONSE_CACHE_ENABLED:
+        return await recommend_courses(user_input, initial_k=initial_k, final_k=final_k,
+                                       explain_top_n=explain_top_n)
+
+    cache = get_response_cache()
+    key = make_cache_key(user_input, initial_k=initial_k, final_k=final_k, explain_top_n=explain_top_n)
+    version = await _version()
+
+    cached = await _lookup(cache, key, version)
+    if cached is not None:
+        print(f"⚡ Response cache hit ({key[:12]})")
+        return cached
+
+    response, fallbacks = None, 0
+    async for event, payload in recommend_courses_stream(user_input, initial_k=initial_k, final_k=final_k,
+                                                         explain_top_n=explain_top_n):
+        if event == "explanation" and payload["source"] == "template":
+            fallbacks += 1
+        elif event == "complete":
+            response = payload
+    await _store(cache, key, version, response, fallbacks)
+    return response
+
+
+async def replay_events(response: Dict[str, Any],
+                        explain_top_n: int) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    recommend_courses_stream() events for a finished response (e.g. a cache hit)
+
+    Args:
+        response: recommend_courses() output
+        explain_top_n: Number of explained top courses
+
+    Yields:
+        (event, payload) tuples; explanation source is "cache"
+    """
+    yield "warnings", {"warnings": list(response.get("warnings", []))}
+    if response.get("status") == "success":
+        results = response.get("results", [])
+        yield "ranked", {"results": results, "warnings": response.get("warnings", [])}
+        for index in range(min(explain_top_n, len(results))):
+            yield "explanation", {"index": index, "explanation": results[index].get("explanation", ""),
+                                  "source": "cache"}
+    yield "complete", response
+
+
+async def cached_recommend_courses_stream(user_input: Dict[str, Any],
+                                          initial_k: int = 25,
+                                          final_k: int = 10,
+                                          explain_top_n: int = 5) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Cached recommend_courses_stream(): a hit is replayed at once, a miss is
+    streamed from the pipeline and its final response stored
+
+    Args:
+        user_input: User profile dictionary
+        initial_k: Number of candidates to retrieve from RAG
+        final_k: Number of final recommendations to return
+        explain_top_n: Number of top courses to generate explanations for
+
+    Yields:
+        (event, payload) tuples as documented on recommend_courses_stream()
+    """
+    cache = get_response_cache() if RESPONSE_CACHE_ENABLED else None
+    if cache is not None:
+        key = make_cache_key(user_input, initial_k=initial_k, final_k=final_k, explain_top_n=explain_top_n)
+        version = await _version()
+        cached = await _lookup(cache, key, version)
+        if cached is not None:
+            print(f"⚡ Response cache hit ({key[:12]})")
+            async for event in replay_events(cached, explain_top_n):
+                yield event
+            return
+
+    fallbacks = 0
+    async for event, payload in recommend_courses_stream(user_input, initial_k=initial_k, final_k=final_k,
+                                                         explain_top_n=explain_top_n):
+        if event == "explanation" and payload["source"] == "template":
+            fallbacks += 1
+        elif event == "complete" and cache is not None:
+            await _store(cache, key, version, payload, fallbacks)
+        yield event, payload
@@ -0,0 +1,404 @@
+# Response Cache
+"""
+Recommendation response cache
+
+Caches recommend_courses() output keyed on a canonical hash of the user
+profile and the pipeline parameters. Every entry is tagged with a version
+string (index build fingerprint, catalog file, career map, retrieval
+settings); an entry whose tag differs from the current one is dropped on
+read, so rebuilding the index invalidates the cache. The tag is computed
+at warm-up and re-checked at most every RESPONSE_CACHE_VERSION_REFRESH
+seconds, off the event loop (refresh_version()).
+
+Two tiers:
+- memory: bounded LRU with TTL (per process)
+- disk (optional): one JSON file per entry, written atomically, shared by
+  every worker process and kept across restarts; pruned to a maximum entry count
+
+Responses are stored as JSON text, so a hit returns a fresh copy and both
+tiers return the same thing.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from utils.config import (
+    COURSE_DATA_PATH,
+    RETRIEVAL_BACKEND,
+    RETRIEVAL_MODE,
+    RETRIEVAL_PREDICATE_PUSHDOWN,
+    RETRIEVAL_PUSHDOWN_PREFERENCES,
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_DIR,
+    RESPONSE_CACHE_DISK_MAX_ENTRIES,
+    RESPONSE_CACHE_VERSION_REFRESH,
+    EXPLANATION_LLM_ENABLED,
+    ELIGIBILITY_ENTRY_GATES,
+)
+
+
+def canonical_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Profile with None fields dropped and string values stripped and whitespace-collapsed
+
+    Args:
+        profile: User profile dictionary
+
+    Returns:
+        Canonical profile (key order does not matter; keys are sorted when hashed)
+    """
+    canonical = {}
+    for key, value in profile.items():
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = re.sub(r"\s+", " ", value).strip()
+        canonical[key] = value
+    return canonical
+
+
+def make_cache_key(profile: Dict[str, Any], **params: Any) -> str:
+    """Hash of the canonical profile and the pipeline parameters"""
+    payload = json.dumps(
+        {"profile": canonical_profile(profile), "params": params},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def compute_version() -> str:
+    """
+    Version tag for cached responses: changes when the index is rebuilt, the
+    catalog file changes, the career map changes or retrieval/explanation settings differ
+    (blocking: stats the catalog and reads the index version file)
+    """
+    from core.rag.retriever import get_index_version
+    from core.agents.career_intent import CAREER_MAP_VERSION
+    from core.agents.explanation_agent import explanation_prompt_version
+
+    try:
+        stat = os.stat(COURSE_DATA_PATH)
+        catalog = f"{stat.st_mtime_ns}-{stat.st_size}"
+    except OSError:
+        catalog = "missing"
+    return ":".join([
+        get_index_version(), catalog, CAREER_MAP_VERSION,
+        RETRIEVAL_BACKEND, RETRIEVAL_MODE, str(RETRIEVAL_PREDICATE_PUSHDOWN),
+        str(RETRIEVAL_PUSHDOWN_PREFERENCES), str(ELIGIBILITY_ENTRY_GATES),
+        # Explanation settings: template vs LLM text, prompt, mode and model
+        str(EXPLANATION_LLM_ENABLED), explanation_prompt_version()
+    ])
+
+
+_version: Optional[str] = None
+_version_checked = 0.0
+_version_lock = threading.Lock()
+
+
+def refresh_version() -> str:
+    """
+    Recompute and store the version tag (blocking, run it off the event loop)
+
+    Returns:
+        Current version tag
+    """
+    global _version, _version_checked
+    version = compute_version()
+    with _version_lock:
+        _version, _version_checked = version, time.monotonic()
+    return version
+
+
+def current_version(max_age: float = RESPONSE_CACHE_VERSION_REFRESH) -> Optional[str]:
+    """
+    Last computed version tag, without any I/O
+
+    Args:
+        max_age: Seconds after which the stored tag must be re-checked
+
+    Returns:
+        Version tag, None if it was never computed or is older than max_age
+        (call refresh_version())
+    """
+    with _version_lock:
+        if _version is None or time.monotonic() - _version_checked > max_age:
+            return None
+        return _version
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize NumPy scalars/arrays found in pipeline results"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+class ResponseCache:
+    """
+    Thread-safe two-tier (memory + optional disk) response cache with TTL and version tags.
+    """
+
+    def __init__(
+        self,
+        capacity: int = RESPONSE_CACHE_SIZE,
+        ttl: float = RESPONSE_CACHE_TTL,
+        disk_dir: str = RESPONSE_CACHE_DIR,
+        disk_max_entries: int = RESPONSE_CACHE_DISK_MAX_ENTRIES
+    ):
+        """
+        Args:
+            capacity: Maximum responses in memory (0 disables the memory tier)
+            ttl: Seconds before an entry expires (0 = never expires)
+            disk_dir: Directory for the disk tier ("" disables it)
+            disk_max_entries: Maximum responses on disk
+        """
+        self.capacity = capacity
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_max_entries = disk_max_entries
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _expired(self, stored_at: float) -> bool:
+        # Wall-clock time: disk entries outlive the process
+        return self.ttl > 0 and time.time() - stored_at > self.ttl
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def get(self, key: str, version: str) -> Optional[Dict[str, Any]]:
+        """
+        Cached response for a key, or None on miss/expiry/version change
+
+        Args:
+            key: make_cache_key() output
+            version: current_version() output
+
+        Returns:
+            Fresh copy of the cached response
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, entry_version, stored_at = entry
+                if entry_version != version:
+                    del self._entries[key]
+                    self.invalidations += 1
+                elif self._expired(stored_at):
+                    del self._entries[key]
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return json.loads(payload)
+
+        record = self._read_disk(key)
+        if record is not None:
+            if record.get("version") != version or self._expired(record.get("stored_at", 0.0)):
+                with self._lock:
+                    if record.get("version") != version:
+                        self.invalidations += 1
+                    else:
+                        self.expirations += 1
+                self._remove_disk(key)
+            else:
+                payload = record["response"]
+                self._put_memory(key, payload, version, record["stored_at"])
+                with self._lock:
+                    self.disk_hits += 1
+                return json.loads(payload)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, version: str, response: Dict[str, Any]) -> None:
+        """
+        Store a response in both tiers
+
+        Args:
+            key: make_cache_key() output
+            version: current_version() at the time the response was computed
+            response: recommend_courses() output (JSON-serializable, NumPy scalars allowed)
+        """
+        try:
+            payload = json.dumps(response, ensure_ascii=False, default=_json_default)
+        except (TypeError, ValueError) as e:
+            print(f"⚠️ Response not cacheable: {e}")
+            return
+
+        stored_at = time.time()
+        self._put_memory(key, payload, version, stored_at)
+        self._write_disk(key, {"version": version, "stored_at": stored_at, "response": payload})
+        with self._lock:
+            self.stores += 1
+
+    def _put_memory(self, key: str, payload: str, version: str, stored_at: float) -> None:
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (payload, version, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    # -------------------------
+    # Disk tier
+    # -------------------------
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, record: Dict[str, Any]) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False)
+            # Atomic: concurrent readers in other workers see the old file or the new one
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ Could not write response cache entry: {e}")
+            return
+
+        with self._lock:
+            self._disk_writes += 1
+            # Pruning lists the directory, so only check every few writes
+            prune = self._disk_writes % 64 == 0
+        if prune:
+            self.prune_disk()
+
+    def _remove_disk(self, key: str) -> None:
+        try:
+            os.remove(self._disk_path(key))
+        except OSError:
+            pass
+
+    def disk_entries(self) -> int:
+        """Number of responses in the disk tier"""
+        if not self.disk_dir:
+            return 0
+        try:
+            return sum(1 for name in os.listdir(self.disk_dir) if name.endswith(".json"))
+        except OSError:
+            return 0
+
+    def prune_disk(self) -> int:
+        """
+        Delete the oldest disk entries above disk_max_entries
+
+        Returns:
+            Number of deleted entries
+        """
+        if not self.disk_dir:
+            return 0
+        try:
+            entries = [e for e in os.scandir(self.disk_dir) if e.name.endswith(".json")]
+        except OSError:
+            return 0
+        excess = len(entries) - self.disk_max_entries
+        if excess <= 0:
+            return 0
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        removed = 0
+        for entry in entries[:excess]:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def clear(self) -> None:
+        """Drop all entries in both tiers (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+        if self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".json"):
+                    self._remove_disk(name[:-len(".json")])
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters for monitoring"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            stats = {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "ttl_seconds": self.ttl,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+            }
+        if self.disk_dir:
+            stats["disk_entries"] = self.disk_entries()
+            stats["disk_max_entries"] = self.disk_max_entries
+        return stats
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get or create the response cache (singleton)
+
+    Returns:
+        ResponseCache instance
+    """
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache()
+    return _response_cache
+
+
+def get_response_cache_stats() -> Dict[str, Any]:
+    """
+    Response cache counters
+
+    Returns:
+        Cache statistics, or an empty dict if the cache was not used yet
+    """
+    if _response_cache is None:
+        return {}
+    return _response_cache.stats()
@@ -1,6 +1,5 @@
 # LLM Module
 from .deepseek_client import chat, get_llm_config
-from .airllm_client import get_airllm_client, LocalLLMClient
 
 __all__ = [
     'chat', 
@@ -8,3 +7,11 @@ __all__ = [
     'get_airllm_client',
     'LocalLLMClient'
 ]
+
+
+def __getattr__(name):
+    # The local model client imports torch/transformers; only load it when asked for
+    if name in ('get_airllm_client', 'LocalLLMClient'):
+        from . import airllm_client
+        return getattr(airllm_client, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
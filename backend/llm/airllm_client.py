@@ -6,12 +6,23 @@ This module provides two models optimized for CPU-only execution:
 2. TinyLlama-1.1B-Chat - Explanation simplification & ELI5 formatting
 
 Uses transformers library with CPU optimization.
+
+The system prompt and chat template header are the same for every call, so
+their attention keys/values (past_key_values) are computed once per prefix
+text and reused: each generate() call only runs the forward pass over the
+user prompt.
 """
 
 import os
-from typing import Optional
+import copy
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
 import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
+from transformers import AutoTokenizer, AutoModelForCausalLM, DynamicCache, pipeline
+
+# Max cached prompt prefixes (system prompt + template header) across both models (0 disables reuse)
+LOCAL_LLM_PREFIX_CACHE_SIZE = int(os.getenv("LOCAL_LLM_PREFIX_CACHE_SIZE", "8"))
 
 
 class LocalLLMClient:
@@ -34,6 +45,16 @@ class LocalLLMClient:
         
         # Force CPU usage
         self.device = "cpu"
+
+        # Prefix KV cache: (model name, prefix text) -> (prefix token ids, past_key_values)
+        self.prefix_cache_size = LOCAL_LLM_PREFIX_CACHE_SIZE
+        self._prefix_cache: "OrderedDict[Tuple[str, str], Tuple[List[int], DynamicCache]]" = OrderedDict()
+        self._prefix_lock = threading.Lock()
+        self.prefix_hits = 0
+        self.prefix_misses = 0
+        self.prefix_evictions = 0
+        self.prefix_partial = 0
+        self.prefix_tokens_reused = 0
         
         print("🧠 Local LLM Client initialized (models will load on first use)")
     
@@ -109,6 +130,144 @@ class LocalLLMClient:
             _ = self.tinyllama  # Trigger model loading
         return self._tinyllama_tokenizer
     
+    def _prefix_kv(self, model_name: str, model, tokenizer, prefix: str) -> Tuple[List[int], DynamicCache]:
+        """
+        Token ids and past_key_values of a prompt prefix (computed once, LRU-cached)
+
+        Args:
+            model_name: Model identifier (part of the cache key)
+            model: Causal LM
+            tokenizer: Its tokenizer
+            prefix: Prefix text (system prompt + template header)
+
+        Returns:
+            (prefix token ids, past_key_values); callers must copy the cache before generate()
+        """
+        key = (model_name, prefix)
+        with self._prefix_lock:
+            entry = self._prefix_cache.get(key)
+            if entry is not None:
+                self._prefix_cache.move_to_end(key)
+                self.prefix_hits += 1
+                return entry
+            self.prefix_misses += 1
+
+        prefix_ids = tokenizer(prefix, return_tensors="pt").to(self.device)
+        with torch.no_grad():
+            past_key_values = model(**prefix_ids, past_key_values=DynamicCache(), use_cache=True).past_key_values
+        entry = (prefix_ids["input_ids"][0].tolist(), past_key_values)
+
+        with self._prefix_lock:
+            self._prefix_cache[key] = entry
+            self._prefix_cache.move_to_end(key)
+            while len(self._prefix_cache) > self.prefix_cache_size:
+                self._prefix_cache.popitem(last=False)
+                self.prefix_evictions += 1
+        return entry
+
+    def _prefix_past(
+        self,
+        model_name: str,
+        model,
+        tokenizer,
+        prefix: str,
+        input_ids: List[int]
+    ) -> Tuple[Optional[DynamicCache], int]:
+        """
+        past_key_values to start generate() from, for a prompt beginning with prefix
+
+        Tokenizers can merge the last prefix token with the text after it, so
+        only the longest common token prefix is reused (the cached keys/values
+        are cropped to it).
+
+        Args:
+            model_name: Model identifier
+            model: Causal LM
+            tokenizer: Its tokenizer
+            prefix: Fixed leading part of the prompt text
+            input_ids: Token ids of the full prompt
+
+        Returns:
+            (copy of the cached past_key_values or None, number of reused tokens)
+        """
+        prefix_ids, prefix_kv = self._prefix_kv(model_name, model, tokenizer, prefix)
+        common = 0
+        for cached_id, prompt_id in zip(prefix_ids, input_ids):
+            if cached_id != prompt_id:
+                break
+            common += 1
+        # generate() needs at least one uncached token
+        common = min(common, len(input_ids) - 1)
+
+        with self._prefix_lock:
+            if common < len(prefix_ids):
+                self.prefix_partial += 1
+            self.prefix_tokens_reused += max(common, 0)
+        if common <= 0:
+            return None, 0
+
+        # generate() appends to the cache; keep the stored prefix intact
+        past_key_values = copy.deepcopy(prefix_kv)
+        if common < len(prefix_ids):
+            # Negative: number of trailing tokens to drop
+            past_key_values.crop(common - len(prefix_ids))
+        return past_key_values, common
+
+    def _generate(
+        self,
+        model_name: str,
+        model,
+        tokenizer,
+        prefix: str,
+        formatted_prompt: str,
+        **generate_kwargs: Any
+    ) -> torch.Tensor:
+        """
+        model.generate() on formatted_prompt, reusing the cached past_key_values of prefix
+
+        Args:
+            model_name: Model identifier
+            model: Causal LM
+            tokenizer: Its tokenizer
+            prefix: Fixed leading part of formatted_prompt
+            formatted_prompt: Full prompt text
+            **generate_kwargs: Passed to generate()
+
+        Returns:
+            Output token ids (prompt + completion), as generate() returns them
+        """
+        inputs = tokenizer(formatted_prompt, return_tensors="pt").to(self.device)
+
+        if self.prefix_cache_size > 0 and formatted_prompt.startswith(prefix):
+            past_key_values, _ = self._prefix_past(
+                model_name, model, tokenizer, prefix, inputs["input_ids"][0].tolist()
+            )
+            if past_key_values is not None:
+                generate_kwargs["past_key_values"] = past_key_values
+
+        with torch.no_grad():
+            return model.generate(**inputs, **generate_kwargs)
+
+    def prefix_cache_stats(self) -> Dict[str, Any]:
+        """Prefix KV-cache counters"""
+        with self._prefix_lock:
+            lookups = self.prefix_hits + self.prefix_misses
+            return {
+                "size": len(self._prefix_cache),
+                "capacity": self.prefix_cache_size,
+                "hits": self.prefix_hits,
+                "misses": self.prefix_misses,
+                "evictions": self.prefix_evictions,
+                "partial_reuses": self.prefix_partial,
+                "tokens_reused": self.prefix_tokens_reused,
+                "hit_rate": round(self.prefix_hits / lookups, 4) if lookups else 0.0
+            }
+
+    def clear_prefix_cache(self) -> None:
+        """Drop all cached prefixes (counters are kept)"""
+        with self._prefix_lock:
+            self._prefix_cache.clear()
+
     def chat_gemma(
         self,
         prompt: str,
@@ -137,17 +296,16 @@ class LocalLLMClient:
             
             # Format prompt for Gemma-2B-IT
             formatted_prompt = f"{system}\n\nUser: {prompt}\n\nAssistant:"
+            # Fixed part (no trailing space, so the tokens match the full prompt's)
+            prefix = f"{system}\n\nUser:"
             
-            inputs = tokenizer(formatted_prompt, return_tensors="pt").to(self.device)
-            
-            with torch.no_grad():
-                outputs = model.generate(
-                    **inputs,
-                    max_new_tokens=max_tokens,
-                    temperature=temperature,
-                    do_sample=True,
-                    pad_token_id=tokenizer.eos_token_id
-                )
+            outputs = self._generate(
+                self.gemma_model_name, model, tokenizer, prefix, formatted_prompt,
+                max_new_tokens=max_tokens,
+                temperature=temperature,
+                do_sample=True,
+                pad_token_id=tokenizer.eos_token_id
+            )
             
             response = tokenizer.decode(outputs[0], skip_special_tokens=True)
             # Remove the prompt from the response
@@ -186,17 +344,15 @@ class LocalLLMClient:
             
             # Format prompt for TinyLlama
             formatted_prompt = f"<|system|>\n{system}</s>\n<|user|>\n{prompt}</s>\n<|assistant|>\n"
+            prefix = f"<|system|>\n{system}</s>\n<|user|>\n"
             
-            inputs = tokenizer(formatted_prompt, return_tensors="pt").to(self.device)
-            
-            with torch.no_grad():
-                outputs = model.generate(
-                    **inputs,
-                    max_new_tokens=max_tokens,
-                    temperature=temperature,
-                    do_sample=True,
-                    pad_token_id=tokenizer.eos_token_id
-                )
+            outputs = self._generate(
+                self.tinyllama_model_name, model, tokenizer, prefix, formatted_prompt,
+                max_new_tokens=max_tokens,
+                temperature=temperature,
+                do_sample=True,
+                pad_token_id=tokenizer.eos_token_id
+            )
             
             response = tokenizer.decode(outputs[0], skip_special_tokens=True)
             
@@ -1,6 +1,10 @@
 import os
+import asyncio
+import threading
+import weakref
+import httpx
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, APITimeoutError
 
 # Load environment variables from .env file
 load_dotenv()
@@ -29,6 +33,12 @@ GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
 GEMINI_MODEL = "gemini-2.5-flash"
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 
+# Connection pool for the async client (shared by all concurrent requests on a worker)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_KEEPALIVE_CONNECTIONS", "10"))
+# Retries per async request (callers have their own deadline and fallback)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+
 
 def get_llm_config():
     """Get current LLM configuration with GPU settings"""
@@ -89,6 +99,71 @@ else:
     print(f"   ☁️  Cloud GPU: ENABLED")
 
 
+# Async clients are bound to the event loop their connections were opened on
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOpenAI]" = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+
+
+def get_async_client() -> AsyncOpenAI:
+    """
+    Get or create the AsyncOpenAI client for the running event loop
+
+    All requests share one pooled HTTP connection pool (keep-alive), so
+    concurrent prompts reuse connections instead of opening one each.
+
+    Returns:
+        AsyncOpenAI instance
+    """
+    loop = asyncio.get_running_loop()
+    async_client = _async_clients.get(loop)
+    if async_client is None:
+        with _async_clients_lock:
+            async_client = _async_clients.get(loop)
+            if async_client is None:
+                async_client = AsyncOpenAI(
+                    base_url=config["base_url"],
+                    api_key=config["api_key"],
+                    max_retries=LLM_MAX_RETRIES,
+                    http_client=httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=LLM_MAX_CONNECTIONS,
+                            max_keepalive_connections=LLM_KEEPALIVE_CONNECTIONS
+                        )
+                    )
+                )
+                _async_clients[loop] = async_client
+    return async_client
+
+
+def _request_params(prompt: str, system: str, timeout: float, max_tokens: int = 300) -> dict:
+    """Chat completion parameters shared by chat() and achat()"""
+    request_params = {
+        "model": config["model"],
+        "messages": [
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt},
+        ],
+        "max_tokens": max_tokens,
+        "temperature": 0.2,
+        "timeout": timeout
+    }
+
+    # If local and GPU enabled, request layer offloading
+    if config["mode"] == "local" and config["gpu_enabled"]:
+        # n_gpu_layers = -1 means offload ALL layers to GPU
+        request_params["extra_body"] = {"n_gpu_layers": -1}
+    return request_params
+
+
+def _response_text(resp) -> str:
+    # Check if response is valid
+    if resp and resp.choices and len(resp.choices) > 0:
+        content = resp.choices[0].message.content
+        if content:
+            return content.strip()
+    return "(LLM returned empty response)"
+
+
 def chat(prompt: str, system: str = "You are a helpful course advisor.", timeout: int = 30) -> str:
     """
     Send a chat completion request to the LLM.
@@ -103,34 +178,37 @@ def chat(prompt: str, system: str = "You are a helpful course advisor.", timeout
         LLM response text
     """
     try:
-        # Prepare request parameters
-        request_params = {
-            "model": config["model"],
-            "messages": [
-                {"role": "system", "content": system},
-                {"role": "user", "content": prompt},
-            ],
-            "max_tokens": 300,
-            "temperature": 0.2,
-            "timeout": timeout
-        }
+        resp = client.chat.completions.create(**_request_params(prompt, system, timeout))
+        return _response_text(resp)
+    except (TimeoutError, APITimeoutError):
+        print(f"⚠️ LLM request timed out after {timeout}s")
+        return "(LLM request timed out - model may be loading or unresponsive)"
+    except Exception as e:
+        print(f"⚠️ LLM request failed: {e}")
+        return f"(LLM unavailable: {type(e).__name__})"
 
-        # If local and GPU enabled, request layer offloading
-        if config["mode"] == "local" and config["gpu_enabled"]:
-            # n_gpu_layers = -1 means offload ALL layers to GPU
-            request_params["extra_body"] = {"n_gpu_layers": -1}
 
-        resp = client.chat.completions.create(**request_params)
-        
-        # Check if response is valid
-        if resp and resp.choices and len(resp.choices) > 0:
-            content = resp.choices[0].message.content
-            if content:
-                return content.strip()
-        
-        return "(LLM returned empty response)"
-    except TimeoutError:
-        print(f"⚠️ LLM request timed out after {timeout}s")
+async def achat(prompt: str, system: str = "You are a helpful course advisor.", timeout: float = 30,
+                max_tokens: int = 300) -> str:
+    """
+    Async chat(): same request and return values, on the pooled AsyncOpenAI client
+
+    Args:
+        prompt: User message
+        system: System message to set context
+        timeout: Request timeout in seconds
+        max_tokens: Completion token limit
+
+    Returns:
+        LLM response text (or the same "(LLM ...)" markers as chat() on failure)
+    """
+    try:
+        resp = await get_async_client().chat.completions.create(
+            **_request_params(prompt, system, timeout, max_tokens)
+        )
+        return _response_text(resp)
+    except (TimeoutError, APITimeoutError):
+        print(f"⚠️ LLM request timed out after {timeout:.1f}s")
         return "(LLM request timed out - model may be loading or unresponsive)"
     except Exception as e:
         print(f"⚠️ LLM request failed: {e}")
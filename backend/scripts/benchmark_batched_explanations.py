@@ -0,0 +1,101 @@
+# Benchmark: batched multi-course explanation prompt vs one prompt per course
+#
+# Uses the local OpenAI-compatible stand-in model server from
+# benchmark_llm_explanations.py (fixed latency per call plus a decode cost
+# per completion token) and explains the top N courses per request:
+#   per_course  - iter_llm_explanations(): N concurrent prompts
+#   batched     - iter_batch_llm_explanations(): one prompt, JSON reply
+#   batched, 1 missing / malformed - the reply lacks one course or is not
+#                 valid JSON; the missing courses are asked per course
+# Reports LLM calls, prompt/completion tokens (≈4 chars per token) and
+# end-to-end time per request.
+import sys
+import os
+import io
+import time
+import asyncio
+import argparse
+import contextlib
+
+# Add backend directory to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+sys.path.insert(0, backend_dir)
+
+from aiohttp import web
+from llm import deepseek_client
+from core.rag.loader import load_courses
+from core.rag.index_builder import build_metadata
+from core.agents.explanation_agent import iter_llm_explanations, iter_batch_llm_explanations
+from benchmark_llm_explanations import StubLLM
+
+USER = {"interest_area": "Information Technology", "career_goal": "Software Engineer"}
+
+
+async def run_mode(stub, iterate, candidates, requests, deadline):
+    stub.reset()
+    explained = 0
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(requests):
+            explained += len([x async for x in iterate(USER, candidates, deadline)])
+    return time.perf_counter() - start, explained
+
+
+async def main(args):
+    stub = StubLLM(args.latency, per_token=args.per_token, reply_words=args.reply_words)
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", stub.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/v1"
+    deepseek_client.config.update({"mode": "production", "base_url": base_url, "api_key": "stub"})
+
+    courses = load_courses()
+    print(f"\nStand-in model: {args.latency * 1000:.0f} ms per call + {args.per_token * 1000:.1f} ms per "
+          f"completion token | {args.reply_words}-word explanations | {args.requests} requests\n")
+    print(f"{'top N':>5} {'mode':<22} {'calls':>6} {'prompt tok':>11} {'compl. tok':>11} "
+          f"{'ms/request':>11} {'explained':>10}")
+    print("-" * 84)
+
+    for top_n in args.top_n:
+        candidates = [{"metadata": build_metadata(c)} for c in courses[:top_n]]
+        modes = [
+            ("per_course", iter_llm_explanations, set(), False),
+            ("batched", iter_batch_llm_explanations, set(), False),
+            ("batched, 1 missing", iter_batch_llm_explanations, {"c1"}, False),
+            ("batched, malformed", iter_batch_llm_explanations, set(), True),
+        ]
+        for name, iterate, drop_ids, malformed in modes:
+            stub.drop_ids, stub.malformed = drop_ids, malformed
+            wall, explained = await run_mode(stub, iterate, candidates, args.requests, args.deadline)
+            n = args.requests
+            print(f"{top_n:>5} {name:<22} {stub.requests / n:>6.1f} {stub.prompt_tokens / n:>11.0f} "
+                  f"{stub.completion_tokens / n:>11.0f} {wall / n * 1000:>11.0f} {explained / n:>6.1f}/{top_n}")
+        print()
+
+    await runner.cleanup()
+
+
+parser = argparse.ArgumentParser(description="Batched vs per-course explanation prompts")
+parser.add_argument("--top-n", type=int, nargs="+", default=[5, 10], help="Courses explained per request")
+parser.add_argument("--latency", type=float, default=0.3, help="Stand-in latency per call in seconds")
+parser.add_argument("--per-token", type=float, default=0.004, help="Stand-in decode time per completion token")
+parser.add_argument("--reply-words", type=int, default=45, help="Words per explanation")
+parser.add_argument("--requests", type=int, default=3, help="Requests per mode")
+parser.add_argument("--deadline", type=float, default=10.0, help="Per-request deadline in seconds")
+args = parser.parse_args()
+
+print("=" * 84)
+print("📊 Batched Explanation Benchmark: one JSON prompt vs one prompt per course")
+print("=" * 84)
+
+asyncio.run(main(args))
+
+print("Per-request averages. Per-course prompts run concurrently, so their latency is one")
+print("call; the batched reply decodes all N explanations in one sequence.")
+print("\n" + "=" * 84)
+print("✅ Benchmark Complete!")
+print("=" * 84)
@@ -0,0 +1,118 @@
+# Benchmark: /recommend under N parallel requests, stages inline vs offloaded
+#
+# Drives the FastAPI app in-process (one event loop, like one uvicorn
+# worker) with N concurrent POST /recommend requests while a probe hits
+# /health/live every few milliseconds. "inline" runs the blocking stages
+# on the event loop (the old behaviour); "offload" runs them through
+# core.services.execution.run_stage. The response cache is disabled and
+# every request uses a different profile.
+import sys
+import os
+import io
+import time
+import asyncio
+import argparse
+import contextlib
+import numpy as np
+
+# Add backend directory to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+sys.path.insert(0, backend_dir)
+
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+import httpx
+from api.main import app
+from core.agents.orchestrator import warm_up
+from core.services import execution
+
+INTERESTS = ["Information Technology", "Engineering", "Business", "Data Science", "Architecture"]
+CAREERS = ["Software Engineer", "Civil Engineer", "Business Analyst", "Data Scientist", "Architect"]
+
+
+def make_profile(i):
+    return {
+        "age": str(18 + i % 10),
+        "ol_results": "Maths A",
+        "al_stream": "Physical Science",
+        "al_results": "B C C",
+        "ielts": "6.5",
+        "interest_area": INTERESTS[i % len(INTERESTS)],
+        "career_goal": CAREERS[(i // len(INTERESTS)) % len(CAREERS)],
+        "study_method": "Full Time",
+        "preferred_locations": "Colombo",
+        "current_location": f"Colombo {i}",
+    }
+
+
+async def run_load(n_requests, probe_interval):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        latencies, probe_latencies = [], []
+        done = asyncio.Event()
+        # All requests are sent at t0: latency counts time spent waiting for the loop
+        start = time.perf_counter()
+
+        async def one(i):
+            r = await client.post("/recommend", json=make_profile(i))
+            latencies.append(time.perf_counter() - start)
+            return r.status_code
+
+        async def probe():
+            # Latency is measured from when the probe was due, so event-loop stalls count
+            due = time.perf_counter()
+            while True:
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                await client.get("/health/live")
+                probe_latencies.append(time.perf_counter() - due)
+                if done.is_set():
+                    break
+                due += probe_interval
+
+        probe_task = asyncio.create_task(probe())
+        statuses = await asyncio.gather(*(one(i) for i in range(n_requests)))
+        wall = time.perf_counter() - start
+        done.set()
+        await probe_task
+        return latencies, probe_latencies, wall, statuses
+
+
+def ms(values, q):
+    return np.percentile(values, q) * 1000 if values else float("nan")
+
+
+parser = argparse.ArgumentParser(description="Concurrent /recommend benchmark")
+parser.add_argument("--requests", type=int, default=50, help="Parallel requests")
+parser.add_argument("--probe-interval", type=float, default=0.005, help="Seconds between /health/live probes")
+args = parser.parse_args()
+
+print("=" * 80)
+print(f"📊 Concurrency Benchmark: {args.requests} parallel /recommend requests")
+print("=" * 80)
+
+with contextlib.redirect_stdout(io.StringIO()):
+    warm_up()
+    # One untimed request per mode path so lazy initialisation is not measured
+    asyncio.run(run_load(1, args.probe_interval))
+
+print(f"\nPipeline threads: {execution.PIPELINE_THREADS} | stage limits: {execution.STAGE_LIMITS}\n")
+print(f"{'Mode':<9} {'wall (s)':>9} {'req p50':>9} {'req p95':>9} {'req p99':>9} {'req max':>9} "
+      f"{'probe p50':>10} {'probe p99':>10} {'probe max':>10} {'errors':>7}")
+print("-" * 100)
+
+for mode, offload in (("inline", False), ("offload", True)):
+    execution.PIPELINE_OFFLOAD = offload
+    with contextlib.redirect_stdout(io.StringIO()):
+        latencies, probes, wall, statuses = asyncio.run(run_load(args.requests, args.probe_interval))
+    errors = sum(1 for s in statuses if s != 200)
+    print(f"{mode:<9} {wall:>9.2f} {ms(latencies, 50):>9.0f} {ms(latencies, 95):>9.0f} {ms(latencies, 99):>9.0f} "
+          f"{ms(latencies, 100):>9.0f} {ms(probes, 50):>10.1f} {ms(probes, 99):>10.1f} {ms(probes, 100):>10.1f} "
+          f"{errors:>7}")
+
+print("\nTimes in ms. Request latency is measured from the moment all requests were sent;")
+print("'probe' = /health/live latency from when each probe was due, while the requests")
+print("are in flight (how long any other request on the worker waits for the event loop).")
+print("\n" + "=" * 80)
+print("✅ Benchmark Complete!")
+print("=" * 80)
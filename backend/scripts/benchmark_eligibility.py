@@ -0,0 +1,161 @@
+# Benchmark: batch eligibility masks vs per-course eligibility checks
+#
+# Catalogs larger than CourseData.json are the real catalog tiled. Every
+# size is checked for agreement between the batch masks and the per-course
+# rules before timing (with ELIGIBILITY_ENTRY_GATES on, so every rule runs).
+# With the default settings the masks and the eligible / blocked_by_al /
+# blocked_by_other counts must equal the baseline per-course rules (A/L
+# keywords on the index metadata; the IELTS and O/L checks never fired
+# because the metadata had no Entry Requirements), otherwise the script
+# exits with 1. The decisions ELIGIBILITY_ENTRY_GATES would change are reported.
+import sys
+import os
+import copy
+import time
+import argparse
+import numpy as np
+
+# Add backend directory to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+sys.path.insert(0, backend_dir)
+
+from core.rag.loader import get_course_features, load_courses
+from core.rag.index_builder import build_metadata
+from core.agents import eligibility_agent
+from core.agents.eligibility_agent import (
+    eligibility_masks, meets_requirements, course_requirements, has_al_eligibility
+)
+
+PROFILES = [
+    {"al_stream": "Physical Science", "al_results": "ABB", "ielts": "6.5", "ol_results": "9A"},
+    {"al_stream": "", "al_results": "", "ielts": "", "ol_results": "8A 1B"},
+    {"al_stream": "Commerce", "ielts": "5.0"},
+    {"ielts": "N/A"},
+    {"al_results": "CCS", "ol_results": "6A 3C"},
+]
+
+
+def baseline_al_gate(course_meta):
+    """Baseline course_requires_al() (keyword rules on the index metadata)"""
+    text = " ".join(str(course_meta.get(k, "")) for k in (
+        "course", "Course", "course_name", "Entry Requirements", "requirements", "department", "Department"
+    )).lower()
+    al_keywords = ["a/l", "advanced level", "a level", "physical science", "combined mathematics",
+                   "physics", "chemistry", "biology", "commerce stream", "arts stream", "gce advanced"]
+    exemption_keywords = ["foundation", "diploma", "o/l only", "ordinary level sufficient", "certificate"]
+    requires_al = any(k in text for k in al_keywords)
+    has_exemption = any(k in text for k in exemption_keywords)
+    is_degree = any(w in text for w in ["bachelor", "degree", "bsc", "b.sc", "beng", "b.eng"])
+    if is_degree and not has_exemption:
+        return True
+    return requires_al and not has_exemption
+
+
+def compare_with_baseline(features, entry_gates):
+    """
+    Compare the masks with the baseline rules
+
+    Args:
+        features: Course feature table
+        entry_gates: ELIGIBILITY_ENTRY_GATES setting to evaluate
+
+    Returns:
+        (changed decisions, profiles whose eligible/blocked counts differ)
+    """
+    baseline_requires_al = np.array([baseline_al_gate(build_metadata(c)) for c in load_courses()])
+    eligibility_agent.ELIGIBILITY_ENTRY_GATES = entry_gates
+    changed, count_mismatches = 0, 0
+    for user in PROFILES:
+        eligible, _ = eligibility_masks(user, features=features)
+        baseline_blocked_al = baseline_requires_al & (not has_al_eligibility(user))
+        changed += int((eligible != ~baseline_blocked_al).sum())
+        baseline_counts = (int((~baseline_blocked_al).sum()), int(baseline_blocked_al.sum()), 0)
+        count_mismatches += batch(user, features) != baseline_counts
+    return changed, count_mismatches
+
+
+def tiled_features(features, size):
+    """Feature table with its columns tiled to `size` rows"""
+    reps = -(-size // len(features))
+    tiled = copy.copy(features)
+    for column in ("requires_al", "ielts_min", "requires_ol"):
+        setattr(tiled, column, np.tile(getattr(features, column), reps)[:size])
+    return tiled
+
+
+def per_course(user, requirements):
+    """Per-course loop with filter_by_eligibility's accounting"""
+    has_al = has_al_eligibility(user)
+    eligible, blocked_al, blocked_other = 0, 0, 0
+    for req in requirements:
+        if req["requires_al"] and not has_al:
+            blocked_al += 1
+        elif meets_requirements(user, req):
+            eligible += 1
+        else:
+            blocked_other += 1
+    return eligible, blocked_al, blocked_other
+
+
+def batch(user, features):
+    eligible, blocked_al = eligibility_masks(user, features=features)
+    n_eligible, n_al = int(eligible.sum()), int(blocked_al.sum())
+    return n_eligible, n_al, eligible.size - n_eligible - n_al
+
+
+def timed(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return np.median(samples)
+
+
+parser = argparse.ArgumentParser(description="Batch vs per-course eligibility benchmark")
+parser.add_argument("--sizes", type=str, default="300,1000,10000,100000", help="Catalog sizes")
+parser.add_argument("--repeats", type=int, default=5, help="Timed runs per size (median reported)")
+args = parser.parse_args()
+
+print("=" * 80)
+print("📊 Eligibility Benchmark: NumPy masks vs per-course loop")
+print("=" * 80)
+
+features = get_course_features()
+print(f"\nCatalog: {len(features)} courses (tiled to each size) | profiles: {len(PROFILES)}\n")
+
+changed, mismatches = compare_with_baseline(features, entry_gates=False)
+print(f"Baseline rules (default settings): {changed} decisions differ, {mismatches} profiles with different counts")
+if changed or mismatches:
+    print("❌ Eligibility differs from the baseline rules")
+    sys.exit(1)
+changed, _ = compare_with_baseline(features, entry_gates=True)
+print(f"ELIGIBILITY_ENTRY_GATES=true would change {changed} decisions "
+      f"({int((features.ielts_min > 0).sum())} IELTS, {int(features.requires_ol.sum())} O/L courses)\n")
+eligibility_agent.ELIGIBILITY_ENTRY_GATES = True
+
+print(f"{'Courses':>9} {'per-course (ms)':>16} {'batch (ms)':>11} {'speedup':>8} {'agree':>6}")
+print("-" * 56)
+
+for size in [int(s) for s in args.sizes.split(",")]:
+    table = tiled_features(features, size)
+    requirements = [
+        {"requires_al": bool(a), "ielts_min": float(i), "requires_ol": bool(o)}
+        for a, i, o in zip(table.requires_al, table.ielts_min, table.requires_ol)
+    ]
+
+    agree = all(per_course(user, requirements) == batch(user, table) for user in PROFILES)
+    loop_s = timed(lambda: [per_course(user, requirements) for user in PROFILES], args.repeats) / len(PROFILES)
+    batch_s = timed(lambda: [batch(user, table) for user in PROFILES], args.repeats) / len(PROFILES)
+    print(f"{size:>9} {loop_s * 1e3:>16.3f} {batch_s * 1e3:>11.3f} {loop_s / batch_s:>7.1f}x {'yes' if agree else 'NO':>6}")
+
+# Per-course requirement lookup (course_requirements) on top of the rule checks,
+# as filter_by_eligibility did before the batch path
+metas = [{"content_hash": h} for h in list(features.hash_index)]
+lookup_s = timed(lambda: [course_requirements(m) for m in metas], args.repeats)
+print(f"\ncourse_requirements() lookups for {len(metas)} courses: {lookup_s * 1e3:.3f} ms")
+
+print("\n" + "=" * 80)
+print("✅ Benchmark Complete!")
+print("=" * 80)
@@ -0,0 +1,71 @@
+# Load test: direct per-request embedding vs micro-batched embedding
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add backend directory to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+sys.path.insert(0, backend_dir)
+
+from core.rag.nomic_embedder import NomicEmbedder, EmbeddingBatcher
+
+CLIENT_COUNTS = [1, 8, 32]
+REQUESTS_PER_CLIENT = 8
+
+INTERESTS = ["Information Technology", "Civil Engineering", "Business", "Data Science",
+             "Electronics", "Cybersecurity", "Medicine", "Architecture"]
+
+
+def make_texts(n, run_id):
+    """Unique profile texts so neither path is helped by the cache"""
+    return [
+        f"Provide course recommendations for a student aged {18 + i % 5} "
+        f"interested in {INTERESTS[i % len(INTERESTS)]} with career goal {run_id}-{i}, "
+        f"preferring to study in Colombo."
+        for i in range(n)
+    ]
+
+
+def run_load(embed_fn, clients, run_id):
+    texts = make_texts(clients * REQUESTS_PER_CLIENT, run_id)
+    per_client = [texts[i::clients] for i in range(clients)]
+
+    def client(batch):
+        for t in batch:
+            embed_fn(t)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(client, per_client))
+    elapsed = time.perf_counter() - start
+    return len(texts) / elapsed
+
+
+print("=" * 80)
+print("📊 Embedding Load Test: direct embed() vs EmbeddingBatcher")
+print("=" * 80)
+
+# Cache disabled so every request costs a forward pass
+embedder = NomicEmbedder(cache_size=0)
+batcher = EmbeddingBatcher(embedder)
+embedder.embed("warm-up")
+
+print(f"\nRequests per client: {REQUESTS_PER_CLIENT} | "
+      f"batch window: {batcher.max_wait * 1000:.1f} ms | max batch: {batcher.max_batch_size}\n")
+print(f"{'Clients':>8} {'direct (req/s)':>16} {'batched (req/s)':>16} {'speedup':>9} {'avg batch':>10}")
+print("-" * 64)
+
+for run_id, clients in enumerate(CLIENT_COUNTS):
+    direct = run_load(embedder.embed, clients, f"d{run_id}")
+
+    batches_before, texts_before = batcher.batches, batcher.texts
+    batched = run_load(batcher.embed, clients, f"b{run_id}")
+    avg_batch = (batcher.texts - texts_before) / max(1, batcher.batches - batches_before)
+
+    print(f"{clients:>8} {direct:>16.1f} {batched:>16.1f} {batched / direct:>8.2f}x {avg_batch:>10.1f}")
+
+print("\n" + "=" * 80)
+print("✅ Load Test Complete!")
+print("=" * 80)
@@ -0,0 +1,87 @@
+# Benchmark: Python-level allocations of list vs float32-array embedding paths
+import sys
+import os
+import json
+import tracemalloc
+import numpy as np
+
+# Add backend directory to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+sys.path.insert(0, backend_dir)
+
+from core.rag.nomic_embedder import NomicEmbedder
+from utils.config import COURSE_DATA_PATH
+
+QUERY = (
+    "Provide course recommendations for a student interested in Information Technology "
+    "who wants to become a Software Engineer and prefers to study in Colombo."
+)
+
+
+def measure(fn):
+    """Peak traced allocation (bytes) and size of the returned object"""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, result
+
+
+def list_query(embedder):
+    # Old path: list from embed(), then retriever.normalize() back through NumPy to a list
+    vec = embedder.embed(QUERY)
+    return (np.array(vec) / np.linalg.norm(vec)).tolist()
+
+
+def array_query(embedder):
+    return embedder.embed_array(QUERY)
+
+
+def list_build(embedder, texts):
+    # Old path: one list per course, collected into a list of lists
+    return [embedder.embed(t) for t in texts]
+
+
+def array_build(embedder, texts):
+    matrix = np.empty((len(texts), embedder.get_dimension()), dtype=np.float32)
+    for i, t in enumerate(texts):
+        matrix[i] = embedder.embed_array(t)
+    return matrix
+
+
+print("=" * 80)
+print("📊 Embedding Memory Benchmark: list API vs float32 array API")
+print("=" * 80)
+
+# Cache disabled so both paths run the model and allocate their own vectors
+embedder = NomicEmbedder(cache_size=0)
+embedder.embed_array("warm-up")
+
+with open(COURSE_DATA_PATH, "r", encoding="utf-8") as f:
+    courses = json.load(f)
+texts = [
+    f"{c.get('Course', '')} {c.get('Department', '')} {c.get('Career Opportunities', '')}"
+    for c in courses
+]
+
+q_list_peak, _ = measure(lambda: list_query(embedder))
+q_array_peak, _ = measure(lambda: array_query(embedder))
+b_list_peak, b_list = measure(lambda: list_build(embedder, texts))
+b_array_peak, b_array = measure(lambda: array_build(embedder, texts))
+
+# Retained size of the final index payload handed to the vector store
+list_retained = sys.getsizeof(b_list) + sum(sys.getsizeof(v) + 24 * len(v) for v in b_list)
+array_retained = b_array.nbytes
+
+print(f"\nCourses: {len(texts)} | dimension: {embedder.get_dimension()}\n")
+print(f"{'Scenario':<28} {'list API':>14} {'array API':>14} {'saved':>14}")
+print("-" * 72)
+print(f"{'Per query (peak bytes)':<28} {q_list_peak:>14,} {q_array_peak:>14,} {q_list_peak - q_array_peak:>14,}")
+print(f"{'Index build (peak bytes)':<28} {b_list_peak:>14,} {b_array_peak:>14,} {b_list_peak - b_array_peak:>14,}")
+print(f"{'Index payload (retained)':<28} {list_retained:>14,} {array_retained:>14,} {list_retained - array_retained:>14,}")
+
+print("\n" + "=" * 80)
+print("✅ Benchmark Complete!")
+print("=" * 80)
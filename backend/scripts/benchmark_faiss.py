@@ -0,0 +1,150 @@
+# Benchmark: ChromaDB (HNSW) vs FAISS flat / IVF-Flat / HNSW
+#
+# Usage: python scripts/benchmark_faiss.py [synthetic_size]
+# With no argument the real course index is used; with a size, the catalog is
+# tiled with small random perturbations to simulate a larger one.
+import sys
+import os
+import time
+import shutil
+import tempfile
+import numpy as np
+
+# Add backend directory to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+sys.path.insert(0, backend_dir)
+
+import chromadb
+from core.rag.retriever import get_collection, build_user_profile, generate_embedding
+from core.agents.career_intent import CAREER_DOMAIN_MAP
+from vectorstore.numpy_store import NumpyVectorStore
+from vectorstore.faiss_store import FaissVectorStore
+
+TOP_K = 25
+REPEATS = 100
+CHROMA_BATCH = 5000
+
+# Search-time knobs swept per approximate index type (recall vs latency)
+SEARCH_PARAMS = {
+    "flat": [{}],
+    "ivf": [{"nprobe": 8}, {"nprobe": 32}],
+    "hnsw": [{"ef_search": 64}, {"ef_search": 256}],
+}
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000)
+
+
+def build_queries():
+    """One query profile per mapped career goal"""
+    profiles = []
+    for career, domains in CAREER_DOMAIN_MAP.items():
+        profiles.append({
+            "age": "20",
+            "al_stream": "Physical Science",
+            "interest_area": domains[0].title(),
+            "career_goal": career.title(),
+            "study_method": "Full Time",
+            "preferred_locations": "Colombo",
+        })
+    return [generate_embedding(build_user_profile(p)) for p in profiles]
+
+
+def synthetic_catalog(source, size, seed=0):
+    """Tile the real embeddings with noise and re-normalize"""
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, source.count(), size=size)
+    matrix = np.asarray(source.embeddings, dtype=np.float32)[rows]
+    matrix += rng.normal(0, 0.02, size=matrix.shape).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    ids = [f"syn-{i}" for i in range(size)]
+    return NumpyVectorStore(matrix, ids, [""] * size, [{"row": str(i)} for i in range(size)])
+
+
+def time_queries(store, query_vecs):
+    samples = []
+    results = []
+    for vec in query_vecs:
+        store.query(query_embeddings=[vec], n_results=TOP_K)  # warm-up
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            res = store.query(query_embeddings=[vec], n_results=TOP_K)
+            samples.append(time.perf_counter() - start)
+        results.append(res["ids"][0])
+    return samples, results
+
+
+def build_chroma(source, path):
+    start = time.perf_counter()
+    client = chromadb.PersistentClient(path=path)
+    collection = client.create_collection(name="courses", metadata={"hnsw:space": "cosine"})
+    for i in range(0, source.count(), CHROMA_BATCH):
+        collection.add(
+            ids=source.ids[i:i + CHROMA_BATCH],
+            embeddings=np.asarray(source.embeddings[i:i + CHROMA_BATCH]),
+            documents=source.documents[i:i + CHROMA_BATCH],
+            metadatas=source.metadatas[i:i + CHROMA_BATCH]
+        )
+    build = time.perf_counter() - start
+    del client, collection
+
+    start = time.perf_counter()
+    collection = chromadb.PersistentClient(path=path).get_collection("courses")
+    collection.query(query_embeddings=[source.embeddings[0]], n_results=1)  # forces the HNSW load
+    load = time.perf_counter() - start
+    return collection, build, load
+
+
+def build_faiss(source, index_type, path):
+    start = time.perf_counter()
+    FaissVectorStore.build(
+        source.embeddings, source.ids, source.documents, source.metadatas, index_type=index_type
+    ).save(path)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store = FaissVectorStore.load(path, mmap=True)
+    load = time.perf_counter() - start
+    return store, build, load
+
+
+print("=" * 80)
+print("📊 Vector Store Benchmark: ChromaDB (HNSW) vs FAISS")
+print("=" * 80)
+
+source = NumpyVectorStore.from_chroma(get_collection())
+if len(sys.argv) > 1:
+    source = synthetic_catalog(source, int(sys.argv[1]))
+query_vecs = build_queries()
+print(f"\nCatalog size: {source.count()} | Queries: {len(query_vecs)} | top_k={TOP_K} | repeats={REPEATS}\n")
+
+# Exact search is the ground truth for recall
+_, truth = time_queries(source, query_vecs)
+
+workdir = tempfile.mkdtemp(prefix="faiss-bench-")
+rows = []
+try:
+    collection, build, load = build_chroma(source, os.path.join(workdir, "chroma"))
+    rows.append(("chroma", build, load) + time_queries(collection, query_vecs))
+
+    for index_type in ("flat", "ivf", "hnsw"):
+        store, build, load = build_faiss(source, index_type, os.path.join(workdir, index_type))
+        for params in SEARCH_PARAMS[index_type]:
+            store.set_search_params(**params)
+            label = "".join(f" {k.split('_')[0]}={v}" for k, v in params.items())
+            rows.append((f"faiss-{index_type}{label}", build, load) + time_queries(store, query_vecs))
+finally:
+    shutil.rmtree(workdir, ignore_errors=True)
+
+print(f"{'Backend':<20} {'build (s)':>10} {'load (ms)':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'recall@' + str(TOP_K):>12}")
+print("-" * 78)
+for name, build, load, samples, ids in rows:
+    recall = np.mean([len(set(r) & set(t)) / len(t) for r, t in zip(ids, truth) if t])
+    print(f"{name:<20} {build:>10.2f} {load * 1000:>10.1f} {percentile_ms(samples, 50):>10.3f} "
+          f"{percentile_ms(samples, 99):>10.3f} {recall:>12.3f}")
+
+print("\n" + "=" * 80)
+print("✅ Benchmark Complete!")
+print("=" * 80)
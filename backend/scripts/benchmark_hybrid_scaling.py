@@ -0,0 +1,170 @@
+# Benchmark: hybrid BM25 + dense retrieval vs pure dense search on synthetic catalogs
+#
+# Usage: python scripts/benchmark_hybrid_scaling.py [--sizes 10000 100000 1000000] [--dim 256]
+#
+# Synthetic courses are copies of the real catalog: each copy keeps its
+# source document's terms plus an institution token, and its source
+# embedding plus small noise. --dim truncates embeddings (Matryoshka) so
+# the 1M-course matrix fits in memory; both methods use the same vectors.
+import sys
+import os
+import time
+import argparse
+import numpy as np
+
+# Add backend directory to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+sys.path.insert(0, backend_dir)
+
+from core.rag.retriever import load_numpy_store, build_user_profile, generate_embedding
+from core.rag.bm25 import BM25Index, tokenize
+from core.rag.hybrid import HybridRetriever, build_lexical_query
+from core.rag.nomic_embedder import NomicEmbedder
+from core.agents.career_intent import CAREER_DOMAIN_MAP
+from vectorstore.numpy_store import NumpyVectorStore
+
+TOP_K = 25
+REPEATS = 20
+COURSES_PER_INSTITUTION = 300
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Hybrid vs dense retrieval scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=256, help="Embedding dimension (Matryoshka truncation)")
+    parser.add_argument("--lexical-k", type=int, nargs="+", default=[200, 1000])
+    return parser.parse_args()
+
+
+def build_profiles():
+    """One student profile per mapped career goal"""
+    return [{
+        "age": "20",
+        "al_stream": "Physical Science",
+        "interest_area": domains[0].title(),
+        "career_goal": career.title(),
+        "study_method": "Full Time",
+        "preferred_locations": "Colombo",
+    } for career, domains in CAREER_DOMAIN_MAP.items()]
+
+
+def source_term_counts(documents):
+    """CSR-style (offsets, term ids, tfs) for the real documents"""
+    vocabulary, offsets, terms, tfs = {}, [0], [], []
+    for text in documents:
+        counts = {}
+        for token in tokenize(text):
+            term = vocabulary.setdefault(token, len(vocabulary))
+            counts[term] = counts.get(term, 0) + 1
+        terms.extend(counts.keys())
+        tfs.extend(counts.values())
+        offsets.append(len(terms))
+    lengths = np.diff(offsets)
+    doc_lengths = np.asarray([len(tokenize(t)) for t in documents], dtype=np.float32)
+    return vocabulary, np.asarray(offsets), np.asarray(terms, dtype=np.int32), \
+        np.asarray(tfs, dtype=np.float32), lengths, doc_lengths
+
+
+def synthetic_catalog(source, matrix, counts, size, seed=0):
+    """Tile the real catalog to `size` courses (vectorized, no re-tokenizing)"""
+    rng = np.random.default_rng(seed)
+    vocabulary, offsets, terms, tfs, nnz, doc_lengths = counts
+    vocabulary = dict(vocabulary)
+    src = rng.integers(0, matrix.shape[0], size=size)
+
+    # Embeddings: source row + noise, re-normalized (chunked to bound peak memory)
+    embeddings = np.empty((size, matrix.shape[1]), dtype=np.float32)
+    for start in range(0, size, 100_000):
+        rows = src[start:start + 100_000]
+        block = matrix[rows] + rng.normal(0, 0.02, size=(rows.size, matrix.shape[1])).astype(np.float32)
+        block /= np.linalg.norm(block, axis=1, keepdims=True)
+        embeddings[start:start + rows.size] = block
+
+    # Term triplets: each copy gets its source's postings plus one institution token
+    lens = nnz[src]
+    total = int(lens.sum())
+    gather = np.repeat(offsets[src] - np.concatenate(([0], np.cumsum(lens)[:-1])), lens) + np.arange(total)
+    institutions = np.arange(size) // COURSES_PER_INSTITUTION
+    first_inst = len(vocabulary)
+    for i in range(int(institutions.max()) + 1):
+        vocabulary[f"inst{i}"] = first_inst + i
+
+    doc_ids = np.concatenate([np.repeat(np.arange(size, dtype=np.int32), lens), np.arange(size, dtype=np.int32)])
+    term_ids = np.concatenate([terms[gather], (first_inst + institutions).astype(np.int32)])
+    term_tfs = np.concatenate([tfs[gather], np.ones(size, dtype=np.float32)])
+    del gather
+
+    start = time.perf_counter()
+    lexical = BM25Index.from_term_counts(vocabulary, doc_ids, term_ids, term_tfs, doc_lengths[src] + 1)
+    bm25_build = time.perf_counter() - start
+
+    ids = [f"syn-{i}" for i in range(size)]
+    documents = [""] * size
+    metadatas = [{}] * size
+    dense = NumpyVectorStore(embeddings, ids, documents, metadatas)
+    return dense, lexical, bm25_build
+
+
+def time_search(fn, queries):
+    samples, results = [], []
+    for q in queries:
+        fn(q)  # warm-up
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            rows = fn(q)
+            samples.append(time.perf_counter() - start)
+        results.append(set(rows.tolist()))
+    return samples, results
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 80)
+    print("📊 Hybrid Retrieval Scaling Benchmark: BM25 + dense rerank vs pure dense")
+    print("=" * 80)
+
+    base = load_numpy_store()
+    matrix = np.asarray(base.embeddings, dtype=np.float32)
+    if args.dim < matrix.shape[1]:
+        matrix = NomicEmbedder.matryoshka_truncate(matrix, args.dim)
+    counts = source_term_counts(base.documents)
+
+    profiles = build_profiles()
+    vectors = [generate_embedding(build_user_profile(p)) for p in profiles]
+    if args.dim < vectors[0].shape[0]:
+        vectors = list(NomicEmbedder.matryoshka_truncate(np.stack(vectors), args.dim))
+    queries = list(zip(vectors, [build_lexical_query(p) for p in profiles]))
+
+    print(f"\nQueries: {len(queries)} | top_k={TOP_K} | dim={args.dim} | repeats={REPEATS}\n")
+    print(f"{'Courses':>9} {'method':<16} {'p50 (ms)':>10} {'p99 (ms)':>10} {'recall@' + str(TOP_K):>10}")
+    print("-" * 60)
+
+    for size in args.sizes:
+        dense, lexical, bm25_build = synthetic_catalog(base, matrix, counts, size)
+
+        dense_times, truth = time_search(lambda q: dense.search(q[0], TOP_K)[0], queries)
+        print(f"{size:>9} {'dense (exact)':<16} {np.percentile(dense_times, 50) * 1000:>10.2f} "
+              f"{np.percentile(dense_times, 99) * 1000:>10.2f} {1.0:>10.3f}")
+
+        for lexical_k in args.lexical_k:
+            for fusion in ("dense", "rrf"):
+                hybrid = HybridRetriever(dense, lexical, lexical_k=lexical_k, fusion=fusion)
+                times, found = time_search(lambda q: hybrid.search(q[0], q[1], TOP_K)[0], queries)
+                recall = np.mean([len(f & t) / len(t) for f, t in zip(found, truth)])
+                label = f"hybrid-{fusion} {lexical_k}"
+                print(f"{'':>9} {label:<16} {np.percentile(times, 50) * 1000:>10.2f} "
+                      f"{np.percentile(times, 99) * 1000:>10.2f} {recall:>10.3f}")
+
+        print(f"{'':>9} (BM25 build {bm25_build:.1f}s, {len(lexical.vocabulary)} terms, "
+              f"{lexical.postings_docs.size / 1e6:.1f}M postings)")
+        del dense, lexical
+
+    print("\n" + "=" * 80)
+    print("✅ Benchmark Complete!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
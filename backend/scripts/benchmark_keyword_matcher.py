@@ -0,0 +1,105 @@
+# Microbenchmark: shared KeywordMatcher vs per-keyword `in` loops
+#
+# Runs every agent rule over the CourseData.json texts both ways, checks
+# that they agree, and reports the time per text. The agents scan short
+# texts (title + department, study method); document-length rows show
+# where CPython's `in` catches up with the single scan.
+import sys
+import os
+import time
+import numpy as np
+
+# Add backend directory to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+sys.path.insert(0, backend_dir)
+
+from core.rag.loader import load_courses
+from core.rag.index_builder import build_text, build_metadata
+from core.rag.predicates import ONSITE_KEYWORDS, ONLINE_KEYWORDS, STUDY_METHOD_MATCHER
+from core.agents.career_intent import CAREER_DOMAIN_MAP, CAREER_MATCHER
+from core.agents.eligibility_agent import (
+    AL_KEYWORDS, EXEMPTION_KEYWORDS, DEGREE_KEYWORDS, AL_RULE_MATCHER
+)
+
+REPEATS = 20
+
+
+def loop_careers(text):
+    text = text.lower()
+    return {career for career, domains in CAREER_DOMAIN_MAP.items() if any(d in text for d in domains)}
+
+
+def loop_al_rule(text):
+    text = text.lower()
+    found = set()
+    if any(k in text for k in AL_KEYWORDS):
+        found.add("al")
+    if any(k in text for k in EXEMPTION_KEYWORDS):
+        found.add("exemption")
+    if any(k in text for k in DEGREE_KEYWORDS):
+        found.add("degree")
+    return found
+
+
+def loop_study_method(text):
+    text = text.lower()
+    found = set()
+    if any(k in text for k in ONSITE_KEYWORDS):
+        found.add("onsite")
+    if any(k in text for k in ONLINE_KEYWORDS):
+        found.add("online")
+    return found
+
+
+def per_text_us(fn, texts):
+    samples = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        samples.append(time.perf_counter() - start)
+    return np.median(samples) / len(texts) * 1e6
+
+
+print("=" * 80)
+print("📊 Keyword Matcher Microbenchmark: one precompiled scan vs `any(k in text)` loops")
+print("=" * 80)
+
+courses = load_courses()
+metadatas = [build_metadata(c) for c in courses]
+title_texts = [f"{m['course']} {m['department']}" for m in metadatas]
+documents = [build_text(c) for c in courses]
+# parse_requires_al() text: index metadata (title + department), and with the full entry requirements
+al_texts = [f"{m['course']} {m['department']}" for m in metadatas]
+requirement_texts = [f"{m['course']} {c.get('Entry Requirements') or ''} {m['department']}" for c, m in zip(courses, metadatas)]
+method_texts = [m["study_method"] for m in metadatas]
+
+cases = [
+    ("career domains / title+dept", loop_careers, CAREER_MATCHER.match, title_texts,
+     sum(len(v) for v in CAREER_DOMAIN_MAP.values())),
+    ("career domains / document", loop_careers, CAREER_MATCHER.match, documents,
+     sum(len(v) for v in CAREER_DOMAIN_MAP.values())),
+    ("A/L rule / title+dept", loop_al_rule, AL_RULE_MATCHER.match, al_texts,
+     len(AL_KEYWORDS) + len(EXEMPTION_KEYWORDS) + len(DEGREE_KEYWORDS)),
+    ("A/L rule / entry requirements", loop_al_rule, AL_RULE_MATCHER.match, requirement_texts,
+     len(AL_KEYWORDS) + len(EXEMPTION_KEYWORDS) + len(DEGREE_KEYWORDS)),
+    ("study method", loop_study_method, STUDY_METHOD_MATCHER.match, method_texts,
+     len(ONSITE_KEYWORDS) + len(ONLINE_KEYWORDS)),
+]
+
+print(f"\nTexts: {len(courses)} courses | median of {REPEATS} runs\n")
+print(f"{'Rule / text':<30} {'keywords':>8} {'avg chars':>9} {'loops (µs)':>11} {'matcher (µs)':>13} {'speedup':>8} {'agree':>6}")
+print("-" * 92)
+
+for name, loop_fn, matcher_fn, texts, n_keywords in cases:
+    agree = all(loop_fn(t) == matcher_fn(t) for t in texts)
+    loop_us = per_text_us(loop_fn, texts)
+    matcher_us = per_text_us(matcher_fn, texts)
+    avg_chars = np.mean([len(t) for t in texts])
+    print(f"{name:<30} {n_keywords:>8} {avg_chars:>9.0f} {loop_us:>11.2f} {matcher_us:>13.2f} "
+          f"{loop_us / matcher_us:>7.1f}x {'yes' if agree else 'NO':>6}")
+
+print("\n" + "=" * 80)
+print("✅ Benchmark Complete!")
+print("=" * 80)
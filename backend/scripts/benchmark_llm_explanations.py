@@ -0,0 +1,222 @@
+# Benchmark: LLM explanations, sequential sync client vs concurrent async client
+#
+# Starts a local OpenAI-compatible stub server (/v1/chat/completions) with
+# injected latency and points the LLM client at it, then explains the top N
+# courses three ways:
+#   sequential  - try_llm_sync() one prompt at a time (the old path)
+#   concurrent  - generate_llm_explanations() on the pooled AsyncOpenAI client
+#   deadline    - concurrent, with one prompt slower than the request deadline
+#                 (it must be cancelled and served by the template)
+#   cached      - add_explanations() with the persistent explanation cache
+#                 (temporary SQLite file): only the first request calls the LLM
+# The stub records how many TCP connections were opened, to show pooling.
+# The explanation cache is off for the first three paths.
+import sys
+import os
+import io
+import re
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import contextlib
+
+# Add backend directory to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+sys.path.insert(0, backend_dir)
+
+os.environ["EXPLANATION_LLM_ENABLED"] = "true"
+os.environ["EXPLANATION_CACHE_PATH"] = os.path.join(tempfile.mkdtemp(), "explanations.sqlite3")
+
+from aiohttp import web
+from openai import OpenAI
+from llm import deepseek_client
+from core.rag.loader import load_courses
+from core.rag.index_builder import build_metadata
+from core.agents import explanation_agent
+from core.agents.explanation_agent import try_llm_sync, generate_llm_explanations, add_explanations, build_explanation_prompt
+from core.services.explanation_cache import get_explanation_cache_stats
+
+USER = {"interest_area": "Information Technology", "career_goal": "Software Engineer"}
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token)"""
+    return max(1, round(len(text) / 4))
+
+
+class StubLLM:
+    """
+    OpenAI-compatible chat completions endpoint with injected latency
+
+    Latency is `latency` per call plus `per_token` per completion token.
+    Replies are "Stub explanation N." followed by `reply_words` filler words;
+    batched prompts (one "[cN] ..." line per course) get a JSON array with one
+    item per course id, minus `drop_ids`, or invalid JSON if `malformed` is set.
+    """
+
+    def __init__(self, latency, slow_marker=None, slow_latency=0.0, per_token=0.0, reply_words=0):
+        self.latency = latency
+        self.slow_marker = slow_marker
+        self.slow_latency = slow_latency
+        self.per_token = per_token
+        self.reply_words = reply_words
+        self.drop_ids = set()
+        self.malformed = False
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.connections = set()
+
+    def explanation(self):
+        return " ".join([f"Stub explanation {self.requests}."] + ["word"] * self.reply_words)
+
+    async def handle(self, request):
+        body = await request.json()
+        prompt = body["messages"][-1]["content"]
+        self.requests += 1
+        self.connections.add(request.transport.get_extra_info("peername"))
+
+        ids = re.findall(r"^\[(c\d+)\]", prompt, flags=re.MULTILINE)
+        if ids:
+            items = [{"id": i, "explanation": self.explanation()} for i in ids if i not in self.drop_ids]
+            content = json.dumps(items)[:-5] if self.malformed else json.dumps(items)
+        else:
+            content = self.explanation()
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in body["messages"])
+        completion_tokens = estimate_tokens(content)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            slow = self.slow_marker is not None and self.slow_marker in prompt
+            await asyncio.sleep((self.slow_latency if slow else self.latency) + self.per_token * completion_tokens)
+        finally:
+            self.in_flight -= 1
+        return web.json_response({
+            "id": f"stub-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens}
+        })
+
+    def reset(self):
+        self.requests = self.max_in_flight = 0
+        self.prompt_tokens = self.completion_tokens = 0
+        self.connections = set()
+
+
+async def main(args):
+    stub = StubLLM(args.latency)
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", stub.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}/v1"
+
+    # Point both clients at the stub
+    deepseek_client.config.update({"mode": "production", "base_url": base_url, "api_key": "stub"})
+    deepseek_client.client = OpenAI(base_url=base_url, api_key="stub")
+
+    courses = load_courses()[:args.top_n]
+    candidates = [{"metadata": build_metadata(c), "score": 1.0} for c in courses]
+    prompts = [build_explanation_prompt(USER, c["metadata"]) for c in candidates]
+
+    print(f"\nStub latency: {args.latency * 1000:.0f} ms | top_n={args.top_n} | "
+          f"deadline={args.deadline:.1f}s | requests={args.requests}\n")
+    print(f"{'Path':<12} {'requests':>8} {'wall (s)':>9} {'per req (ms)':>13} {'LLM':>5} {'template':>9} "
+          f"{'LLM calls':>10} {'max in flight':>14} {'connections':>12}")
+    print("-" * 101)
+
+    def row(name, wall, llm, total):
+        print(f"{name:<12} {args.requests:>8} {wall:>9.2f} {wall / args.requests * 1000:>13.0f} "
+              f"{llm:>5} {total - llm:>9} {stub.requests:>10} {stub.max_in_flight:>14} {len(stub.connections):>12}")
+
+    explanation_agent.EXPLANATION_CACHE_ENABLED = False
+
+    # Sequential sync client (run in a thread: the stub shares this event loop)
+    stub.reset()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = await asyncio.to_thread(
+            lambda: [try_llm_sync(p) for _ in range(args.requests) for p in prompts]
+        )
+    row("sequential", time.perf_counter() - start, sum(1 for r in results if r), len(results))
+
+    # Concurrent async client, one request after another (pooled connections are reused)
+    stub.reset()
+    start = time.perf_counter()
+    llm = 0
+    for _ in range(args.requests):
+        llm += len(await generate_llm_explanations(USER, candidates, deadline=args.deadline))
+    row("concurrent", time.perf_counter() - start, llm, args.requests * len(candidates))
+
+    # One prompt slower than the deadline: cancelled, template explanation kept
+    stub.reset()
+    stub.slow_marker = candidates[-1]["metadata"]["course"]
+    stub.slow_latency = args.deadline * 3
+    start = time.perf_counter()
+    llm = 0
+    template_ok = True
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(args.requests):
+            ranked = await add_explanations(USER, [dict(c) for c in candidates], top_n=args.top_n)
+            llm += sum(1 for c in ranked if c["explanation"].startswith("Stub explanation"))
+            template_ok &= ranked[-1]["explanation"] == explanation_agent.template_explanation(
+                USER, candidates[-1]["metadata"])
+    row("deadline", time.perf_counter() - start, llm, args.requests * len(candidates))
+
+    # Persistent explanation cache: the LLM is only asked on a miss
+    explanation_agent.EXPLANATION_CACHE_ENABLED = True
+    stub.reset()
+    stub.slow_marker = None
+    start = time.perf_counter()
+    llm = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(args.requests):
+            ranked = await add_explanations(USER, [dict(c) for c in candidates], top_n=args.top_n)
+            llm += sum(1 for c in ranked if c["explanation"].startswith("Stub explanation"))
+    row("cached", time.perf_counter() - start, llm, args.requests * len(candidates))
+
+    print(f"\nSlow prompt fell back to the template explanation: {'yes' if template_ok else 'NO'}")
+    print(f"Explanation stats: {explanation_agent.get_explanation_stats()}")
+    print(f"Explanation cache: {get_explanation_cache_stats()}")
+
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM explanation benchmark against a local stub server")
+    parser.add_argument("--latency", type=float, default=0.4, help="Stub response latency in seconds")
+    parser.add_argument("--top-n", type=int, default=5, help="Courses explained per request")
+    parser.add_argument("--deadline", type=float, default=1.0, help="Per-request deadline in seconds")
+    parser.add_argument("--requests", type=int, default=3, help="Requests per path")
+    args = parser.parse_args()
+
+    explanation_agent.EXPLANATION_LLM_DEADLINE = args.deadline
+
+    print("=" * 101)
+    print("📊 LLM Explanation Benchmark: sequential sync client vs concurrent pooled async client")
+    print("=" * 101)
+
+    asyncio.run(main(args))
+
+    print("\n" + "=" * 101)
+    print("✅ Benchmark Complete!")
+    print("=" * 101)
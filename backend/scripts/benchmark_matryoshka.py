@@ -0,0 +1,76 @@
+# Benchmark: Matryoshka reduced-dimension embeddings vs the 768-d baseline
+import sys
+import os
+import time
+import numpy as np
+
+# Add backend directory to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+sys.path.insert(0, backend_dir)
+
+from core.rag.nomic_embedder import NomicEmbedder
+from core.rag.index_builder import build_text
+from core.rag.loader import load_courses
+from core.agents.career_intent import CAREER_DOMAIN_MAP
+from vectorstore.numpy_store import NumpyVectorStore
+
+DIMENSIONS = [768, 512, 256, 128, 64]
+TOP_K = 10
+REPEATS = 200
+
+
+def query_texts():
+    """One student profile per mapped career goal"""
+    return [
+        f"Provide course recommendations for a student interested in {domains[0]} "
+        f"who wants to become a {career} and prefers full time study in Colombo."
+        for career, domains in CAREER_DOMAIN_MAP.items()
+    ]
+
+
+def build_store(matrix):
+    n = matrix.shape[0]
+    ids = [str(i) for i in range(n)]
+    return NumpyVectorStore(matrix, ids, [""] * n, [{} for _ in range(n)])
+
+
+print("=" * 80)
+print("📊 Matryoshka Benchmark: recall@10, index size and latency per dimension")
+print("=" * 80)
+
+# Embed once at full size; every reduced dimension is derived with the same
+# transform NomicEmbedder applies when EMBEDDING_DIMENSION is set
+embedder = NomicEmbedder(cache_size=0, dimension=768)
+docs = embedder.embed_batch_array([build_text(c) for c in load_courses()], show_progress=False)
+queries = embedder.embed_batch_array(query_texts(), show_progress=False)
+
+baseline = build_store(docs)
+truth = [set(baseline.search(q, TOP_K)[0].tolist()) for q in queries]
+
+print(f"\nCourses: {docs.shape[0]} | queries: {queries.shape[0]} | top_k={TOP_K}\n")
+print(f"{'Dim':>5} {'recall@10':>10} {'index (KB)':>11} {'p50 (µs)':>10} {'p99 (µs)':>10}")
+print("-" * 50)
+
+for dim in DIMENSIONS:
+    if dim == 768:
+        d_docs, d_queries = docs, queries
+    else:
+        d_docs = NomicEmbedder.matryoshka_truncate(docs, dim)
+        d_queries = NomicEmbedder.matryoshka_truncate(queries, dim)
+    store = build_store(d_docs)
+
+    recalls, samples = [], []
+    for q, expected in zip(d_queries, truth):
+        recalls.append(len(set(store.search(q, TOP_K)[0].tolist()) & expected) / TOP_K)
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            store.search(q, TOP_K)
+            samples.append(time.perf_counter() - start)
+
+    print(f"{dim:>5} {np.mean(recalls):>10.3f} {d_docs.nbytes / 1024:>11.1f} "
+          f"{np.percentile(samples, 50) * 1e6:>10.1f} {np.percentile(samples, 99) * 1e6:>10.1f}")
+
+print("\n" + "=" * 80)
+print("✅ Benchmark Complete!")
+print("=" * 80)
@@ -0,0 +1,112 @@
+# Parity + latency/RSS comparison: torch vs ONNX (fp32) vs ONNX (int8) embedders
+#
+# Each backend runs in its own subprocess so peak RSS is measured in isolation:
+#   python scripts/benchmark_onnx_embedder.py
+import sys
+import os
+import json
+import time
+import resource
+import subprocess
+import tempfile
+import numpy as np
+
+# Add backend directory to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+sys.path.insert(0, backend_dir)
+
+QUERY_REPEATS = 50
+BACKENDS = [
+    ("torch", "torch", False),
+    ("onnx-fp32", "onnx", False),
+    ("onnx-int8", "onnx", True),
+]
+
+QUERY = (
+    "Provide course recommendations for a student interested in Information Technology "
+    "who wants to become a Software Engineer and prefers to study in Colombo."
+)
+
+
+def run_backend(backend, quantize, out_path):
+    """Child process: embed the whole catalog + time single queries"""
+    from core.rag.nomic_embedder import NomicEmbedder
+    from core.rag.index_builder import build_text
+    from core.rag.loader import load_courses
+
+    load_start = time.perf_counter()
+    embedder = NomicEmbedder(cache_size=0, backend=backend, quantize=quantize)
+    load_s = time.perf_counter() - load_start
+
+    texts = [build_text(c) for c in load_courses()]
+
+    start = time.perf_counter()
+    catalog = embedder.embed_batch_array(texts, normalize=True, show_progress=False)
+    catalog_s = time.perf_counter() - start
+
+    embedder.embed_array(QUERY)  # warm-up
+    samples = []
+    for _ in range(QUERY_REPEATS):
+        start = time.perf_counter()
+        embedder.embed_array(QUERY)
+        samples.append(time.perf_counter() - start)
+
+    np.save(out_path, catalog)
+    # ru_maxrss is KiB on Linux
+    rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({
+        "load_s": load_s,
+        "catalog_s": catalog_s,
+        "docs": len(texts),
+        "query_p50_ms": float(np.percentile(samples, 50) * 1000),
+        "query_p99_ms": float(np.percentile(samples, 99) * 1000),
+        "peak_rss_mb": rss_mb,
+    }))
+
+
+def main():
+    print("=" * 80)
+    print("📊 Embedder Backend Comparison: torch vs ONNX Runtime")
+    print("=" * 80)
+
+    tmp_dir = tempfile.mkdtemp()
+    stats, vectors = {}, {}
+    for label, backend, quantize in BACKENDS:
+        out_path = os.path.join(tmp_dir, f"{label}.npy")
+        print(f"\n▶ Running {label}...")
+        proc = subprocess.run(
+            [sys.executable, __file__, "--child", backend, str(quantize), out_path],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(f"   ❌ {label} failed:\n{proc.stderr[-2000:]}")
+            continue
+        stats[label] = json.loads(proc.stdout.strip().splitlines()[-1])
+        vectors[label] = np.load(out_path)
+
+    if "torch" not in vectors:
+        print("\n❌ Torch baseline failed; cannot compute parity.")
+        return
+
+    print(f"\n{'Backend':<11} {'load (s)':>9} {'catalog (s)':>12} {'q p50 (ms)':>11} {'q p99 (ms)':>11} "
+          f"{'RSS (MB)':>9} {'min cos':>8} {'mean cos':>9}")
+    print("-" * 88)
+    baseline = vectors["torch"]
+    for label, s in stats.items():
+        # Vectors are L2-normalized, so the row-wise dot product is the cosine
+        cos = np.sum(baseline * vectors[label], axis=1)
+        print(f"{label:<11} {s['load_s']:>9.2f} {s['catalog_s']:>12.2f} {s['query_p50_ms']:>11.2f} "
+              f"{s['query_p99_ms']:>11.2f} {s['peak_rss_mb']:>9.0f} {cos.min():>8.4f} {cos.mean():>9.4f}")
+
+    print(f"\nParity is measured over all {baseline.shape[0]} catalog documents against the torch vectors.")
+    print("\n" + "=" * 80)
+    print("✅ Comparison Complete!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--child":
+        run_backend(sys.argv[2], sys.argv[3] == "True", sys.argv[4])
+    else:
+        main()
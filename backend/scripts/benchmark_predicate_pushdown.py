@@ -0,0 +1,94 @@
+# Benchmark: wasted retrieval candidates with and without predicate pushdown
+#
+# "Wasted" = retrieved candidates that filter_by_eligibility or the
+# location / study-method checks in filtering_agent throw away afterwards.
+# "pushdown" filters on eligibility and preferences, i.e. the
+# RETRIEVAL_PUSHDOWN_PREFERENCES=true mode.
+import sys
+import os
+import io
+import time
+import contextlib
+import numpy as np
+
+# Add backend directory to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+sys.path.insert(0, backend_dir)
+
+from core.rag.retriever import rag_search, index_supports_predicates
+from core.rag.predicates import build_where_filter
+from core.agents.eligibility_agent import filter_by_eligibility
+from core.agents.filtering_agent import matches_location, matches_study_method
+
+TOP_K = 25
+
+PROFILES = [
+    {"al_stream": "Physical Science", "al_results": "B C C", "ielts": "6.5",
+     "interest_area": "Information Technology", "career_goal": "Software Engineer",
+     "study_method": "Full Time", "preferred_locations": "Colombo"},
+    {"al_stream": "", "al_results": "", "ol_results": "Maths A",
+     "interest_area": "Business", "career_goal": "Accountant",
+     "study_method": "Full Time", "preferred_locations": "Kandy"},
+    {"al_stream": "Commerce", "al_results": "A B B", "ielts": "5.5",
+     "interest_area": "Management", "career_goal": "Business Analyst",
+     "study_method": "Online", "preferred_locations": "Colombo"},
+    {"al_stream": "Biological Science", "al_results": "B B C",
+     "interest_area": "Health Sciences", "career_goal": "Nurse",
+     "study_method": "Full Time", "preferred_locations": "Jaffna"},
+    {"al_stream": "", "al_results": "", "ol_results": "English B",
+     "interest_area": "Engineering", "career_goal": "Civil Engineer",
+     "study_method": "Part Time", "preferred_locations": "Matara, Galle"},
+    {"al_stream": "Physical Science", "al_results": "C C S", "ielts": "6.0",
+     "interest_area": "Engineering", "career_goal": "Electrical Engineer",
+     "study_method": "Full Time", "preferred_locations": "Kurunegala"},
+]
+
+
+def kept(user, candidates):
+    """Candidates that survive eligibility + location/study-method checks"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        eligible = filter_by_eligibility(user, candidates)
+        return [c for c in eligible
+                if matches_location(user, c["metadata"]) and matches_study_method(user, c["metadata"])]
+
+
+def run(user, where):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        results = rag_search(user, top_k=TOP_K, where=where)
+        elapsed = time.perf_counter() - start
+    survivors = kept(user, results)
+    return len(results), len(survivors), elapsed
+
+
+print("=" * 80)
+print("📊 Predicate Pushdown Benchmark: wasted candidates per query")
+print("=" * 80)
+
+if not index_supports_predicates():
+    print("\n❌ Index has no filter metadata. Rebuild it with scripts/build_index.py first.")
+    sys.exit(1)
+
+print(f"\nQueries: {len(PROFILES)} | top_k={TOP_K}\n")
+print(f"{'Profile':<32} {'mode':<9} {'retrieved':>9} {'kept':>5} {'wasted':>7} {'ms':>7}")
+print("-" * 74)
+
+totals = {"post-filter": [], "pushdown": []}
+for user in PROFILES:
+    label = f"{user['career_goal']} @ {user['preferred_locations']}"[:32]
+    run(user, None)  # warm-up: the query embedding is cached for both modes
+    for mode, where in (("post-filter", None), ("pushdown", build_where_filter(user))):
+        retrieved, survivors, elapsed = run(user, where)
+        totals[mode].append((retrieved - survivors, survivors, elapsed))
+        print(f"{label:<32} {mode:<9} {retrieved:>9} {survivors:>5} {retrieved - survivors:>7} {elapsed * 1000:>7.1f}")
+
+print("-" * 74)
+for mode, rows in totals.items():
+    wasted, survivors, elapsed = np.array(rows).T
+    print(f"{mode:<12} mean wasted {wasted.mean():>5.1f} / {TOP_K} | mean kept {survivors.mean():>5.1f} | "
+          f"mean latency {elapsed.mean() * 1000:.1f} ms")
+
+print("\n" + "=" * 80)
+print("✅ Benchmark Complete!")
+print("=" * 80)
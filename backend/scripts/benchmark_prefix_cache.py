@@ -0,0 +1,154 @@
+# Benchmark: time to first token with and without the prefix KV cache
+#
+# Runs LocalLLMClient.chat_tinyllama / chat_gemma with max_tokens=1 on the
+# prompts the explanation agent sends (EXPLANATION_SYSTEM +
+# build_explanation_prompt per course, and the batched prompt), on CPU,
+# with prefix reuse off and on, and checks that the first-token logits match.
+#
+# --model loads a real checkpoint (local path or hub id) for both chat
+# formats. Without it, a stand-in is built offline: a randomly initialised
+# Llama with TinyLlama-1.1B's layer sizes (fewer layers, --layers) and a
+# BPE tokenizer trained on the course catalog. Time to first token is the
+# prompt's forward pass, so the relative saving depends on the share of
+# prompt tokens in the reused prefix, not on the weights.
+import sys
+import os
+import io
+import time
+import argparse
+import contextlib
+import numpy as np
+import torch
+
+# Add backend directory to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+sys.path.insert(0, backend_dir)
+
+from transformers import AutoTokenizer, AutoModelForCausalLM, LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast
+from llm.airllm_client import LocalLLMClient
+from core.rag.loader import load_courses
+from core.rag.index_builder import build_text, build_metadata
+from core.agents.explanation_agent import (
+    EXPLANATION_SYSTEM,
+    BATCH_EXPLANATION_SYSTEM,
+    build_explanation_prompt,
+    build_batch_explanation_prompt,
+)
+
+USER = {"interest_area": "Information Technology", "career_goal": "Software Engineer"}
+
+
+def stand_in_model(texts, layers):
+    from tokenizers import Tokenizer, models, pre_tokenizers, decoders, trainers, processors
+
+    tok = Tokenizer(models.BPE(unk_token="<unk>"))
+    tok.pre_tokenizer = pre_tokenizers.Metaspace()
+    tok.decoder = decoders.Metaspace()
+    specials = ["<unk>", "<s>", "</s>", "<|system|>", "<|user|>", "<|assistant|>"]
+    tok.train_from_iterator(texts, trainers.BpeTrainer(vocab_size=8000, special_tokens=specials))
+    tok.post_processor = processors.TemplateProcessing(single="<s> $A", special_tokens=[("<s>", tok.token_to_id("<s>"))])
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=tok, bos_token="<s>", eos_token="</s>", unk_token="<unk>")
+
+    config = LlamaConfig(
+        vocab_size=len(tokenizer), hidden_size=2048, intermediate_size=5632, num_hidden_layers=layers,
+        num_attention_heads=32, num_key_value_heads=4, max_position_embeddings=2048
+    )
+    torch.manual_seed(0)
+    return LlamaForCausalLM(config).eval(), tokenizer
+
+
+def time_first_token(chat, prompts, system, repeats):
+    samples = []
+    for _ in range(repeats):
+        for prompt in prompts:
+            start = time.perf_counter()
+            chat(prompt, system=system, max_tokens=1)
+            samples.append(time.perf_counter() - start)
+    return np.median(samples) * 1000
+
+
+def reuse_check(client, model, tokenizer, prefix, formatted_prompt):
+    """Reused tokens and max |difference| of next-token logits: full forward pass vs cached prefix + rest"""
+    ids = tokenizer(formatted_prompt, return_tensors="pt")["input_ids"]
+    past_key_values, reused = client._prefix_past("check", model, tokenizer, prefix, ids[0].tolist())
+    if past_key_values is None:
+        return 0, float("nan")
+    with torch.no_grad():
+        full = model(ids).logits[0, -1]
+        cached = model(ids[:, reused:], past_key_values=past_key_values).logits[0, -1]
+    return reused, (full - cached).abs().max().item()
+
+
+parser = argparse.ArgumentParser(description="Prefix KV-cache time-to-first-token benchmark")
+parser.add_argument("--model", default="", help="Local path or hub id of a causal LM (default: offline stand-in)")
+parser.add_argument("--layers", type=int, default=4, help="Stand-in layers (TinyLlama-1.1B has 22)")
+parser.add_argument("--courses", type=int, default=5, help="Per-course explanation prompts")
+parser.add_argument("--repeats", type=int, default=3, help="Passes over the prompts")
+parser.add_argument("--threads", type=int, default=0, help="torch CPU threads (0 = torch default)")
+args = parser.parse_args()
+
+if args.threads:
+    torch.set_num_threads(args.threads)
+
+print("=" * 92)
+print("📊 Prefix KV-Cache Benchmark: time to first token on CPU")
+print("=" * 92)
+
+courses = load_courses()
+metas = [build_metadata(c) for c in courses[:args.courses]]
+per_course = [build_explanation_prompt(USER, m) for m in metas]
+batched, _ = build_batch_explanation_prompt(USER, metas)
+
+if args.model:
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForCausalLM.from_pretrained(args.model, torch_dtype=torch.float32).eval()
+    model_label = args.model
+else:
+    corpus = [build_text(c) for c in courses] + per_course + [batched, EXPLANATION_SYSTEM, BATCH_EXPLANATION_SYSTEM]
+    model, tokenizer = stand_in_model(corpus, args.layers)
+    model_label = f"stand-in Llama, TinyLlama layer sizes, {args.layers} layers, random weights"
+
+with contextlib.redirect_stdout(io.StringIO()):
+    client = LocalLLMClient()
+# Both chat formats run on the same weights
+client._tinyllama_model = client._gemma_model = model
+client._tinyllama_tokenizer = client._gemma_tokenizer = tokenizer
+
+print(f"\nModel: {model_label} | torch threads: {torch.get_num_threads()} | median of "
+      f"{args.repeats} passes\n")
+print(f"{'Template':<10} {'prompt':<22} {'tokens':>7} {'reused':>7} {'no reuse (ms)':>14} "
+      f"{'reuse (ms)':>11} {'speedup':>8} {'max |Δlogit|':>13}")
+print("-" * 100)
+
+chat_formats = [
+    ("tinyllama", client.chat_tinyllama,
+     lambda system, prompt: f"<|system|>\n{system}</s>\n<|user|>\n{prompt}</s>\n<|assistant|>\n",
+     lambda system: f"<|system|>\n{system}</s>\n<|user|>\n"),
+    ("gemma", client.chat_gemma,
+     lambda system, prompt: f"{system}\n\nUser: {prompt}\n\nAssistant:",
+     lambda system: f"{system}\n\nUser:"),
+]
+cases = [
+    ("per-course explanation", EXPLANATION_SYSTEM, per_course),
+    ("batched explanation", BATCH_EXPLANATION_SYSTEM, [batched] * len(per_course)),
+]
+
+for name, chat, fmt, prefix_of in chat_formats:
+    for label, system, prompts in cases:
+        tokens = np.mean([len(tokenizer(fmt(system, p))["input_ids"]) for p in prompts])
+        with contextlib.redirect_stdout(io.StringIO()):
+            client.prefix_cache_size = 0
+            chat(prompts[0], system=system, max_tokens=1)
+            baseline = time_first_token(chat, prompts, system, args.repeats)
+            client.prefix_cache_size = 8
+            chat(prompts[0], system=system, max_tokens=1)  # computes the prefix once
+            reuse = time_first_token(chat, prompts, system, args.repeats)
+        reused, diff = reuse_check(client, model, tokenizer, prefix_of(system), fmt(system, prompts[0]))
+        print(f"{name:<10} {label:<22} {tokens:>7.0f} {reused:>7} {baseline:>14.1f} {reuse:>11.1f} "
+              f"{baseline / reuse:>7.2f}x {diff:>13.2e}")
+
+print(f"\nPrefix cache: {client.prefix_cache_stats()}")
+print("\n" + "=" * 92)
+print("✅ Benchmark Complete!")
+print("=" * 92)
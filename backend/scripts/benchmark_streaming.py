@@ -0,0 +1,139 @@
+# Benchmark: time to first result, /recommend vs /recommend/stream
+#
+# Serves LLM explanations from the local OpenAI-compatible stub in
+# benchmark_llm_explanations.py at several injected latencies and serves
+# the FastAPI app with uvicorn on a local port (httpx's ASGI transport
+# buffers whole responses, so it cannot show streaming). For each latency it reports how long
+# /recommend takes to respond and, for /recommend/stream, when the ranked
+# list, the first and the last explanation and the final event arrive.
+# The response and explanation caches are disabled so every request runs
+# the pipeline and calls the LLM.
+import sys
+import os
+import io
+import json
+import time
+import asyncio
+import argparse
+import contextlib
+
+# Add backend directory to path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+backend_dir = os.path.dirname(script_dir)
+sys.path.insert(0, backend_dir)
+
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+os.environ["EXPLANATION_LLM_ENABLED"] = "true"
+os.environ["EXPLANATION_CACHE_ENABLED"] = "false"
+
+import httpx
+import uvicorn
+from aiohttp import web
+from openai import OpenAI
+from llm import deepseek_client
+from core.agents import explanation_agent
+from core.agents.orchestrator import warm_up
+from api.main import app
+from benchmark_llm_explanations import StubLLM
+
+PROFILE = {
+    "age": "20",
+    "ol_results": "Maths A",
+    "al_stream": "Physical Science",
+    "al_results": "B C C",
+    "ielts": "6.5",
+    "interest_area": "Information Technology",
+    "career_goal": "Software Engineer",
+    "study_method": "Full Time",
+    "preferred_locations": "Colombo",
+    "current_location": "Colombo",
+}
+
+
+async def time_plain(client):
+    start = time.perf_counter()
+    r = await client.post("/recommend", json=PROFILE)
+    r.raise_for_status()
+    return time.perf_counter() - start
+
+
+async def time_stream(client):
+    marks = {}
+    explanations = []
+    start = time.perf_counter()
+    async with client.stream("POST", "/recommend/stream", json=PROFILE) as r:
+        event = None
+        async for line in r.aiter_lines():
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                elapsed = time.perf_counter() - start
+                marks.setdefault(event, elapsed)
+                if event == "explanation":
+                    explanations.append((elapsed, json.loads(line[len("data:"):])["source"]))
+    return marks, explanations
+
+
+async def main(args):
+    stub = StubLLM(args.latencies[0])
+    stub_app = web.Application()
+    stub_app.router.add_post("/v1/chat/completions", stub.handle)
+    runner = web.AppRunner(stub_app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/v1"
+    deepseek_client.config.update({"mode": "production", "base_url": base_url, "api_key": "stub"})
+    deepseek_client.client = OpenAI(base_url=base_url, api_key="stub")
+
+    print(f"{'LLM latency':>11} {'/recommend':>11} {'stream: results':>16} {'1st expl.':>10} "
+          f"{'last expl.':>11} {'done':>7} {'LLM expl.':>10}")
+    print("-" * 84)
+
+    # Warm-up already ran; skip the app's lifespan hook
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port, lifespan="off", log_level="warning"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60) as client:
+        with contextlib.redirect_stdout(io.StringIO()):
+            await time_stream(client)
+        for latency in args.latencies:
+            stub.latency = latency
+            with contextlib.redirect_stdout(io.StringIO()):
+                plain = await time_plain(client)
+                marks, explanations = await time_stream(client)
+            llm = sum(1 for _, source in explanations if source == "llm")
+            print(f"{latency * 1000:>9.0f}ms {plain * 1000:>9.0f}ms {marks['recommendations'] * 1000:>14.0f}ms "
+                  f"{explanations[0][0] * 1000:>8.0f}ms {explanations[-1][0] * 1000:>9.0f}ms "
+                  f"{marks['done'] * 1000:>5.0f}ms {llm:>6}/{len(explanations)}")
+
+    server.should_exit = True
+    await serve_task
+    await runner.cleanup()
+
+
+parser = argparse.ArgumentParser(description="Time to first result, /recommend vs /recommend/stream")
+parser.add_argument("--latencies", type=float, nargs="+", default=[0.2, 1.0, 3.0],
+                    help="Stub LLM latencies in seconds")
+parser.add_argument("--deadline", type=float, default=8.0, help="LLM explanation deadline in seconds")
+parser.add_argument("--port", type=int, default=8765, help="Local port for the API server")
+args = parser.parse_args()
+
+explanation_agent.EXPLANATION_LLM_DEADLINE = args.deadline
+
+print("=" * 84)
+print("📊 Streaming Benchmark: time to first result vs LLM latency")
+print("=" * 84)
+
+with contextlib.redirect_stdout(io.StringIO()):
+    warm_up()
+print()
+asyncio.run(main(args))
+
+print("\nTimes from request start. The stub answers every explanation prompt after")
+print("the given latency; top 5 courses are explained.")
+print("\n" + "=" * 84)
+print("✅ Benchmark Complete!")
+print("=" * 84)
@@ -1,7 +1,8 @@
+import argparse
 import shutil
+import time
 import traceback
 print("DEBUG: Script started")
-import json
 import os
 import sys
 import numpy as np
@@ -14,22 +15,92 @@ sys.path.insert(0, backend_dir)
 
 # Import Nomic embedder
 from core.rag.nomic_embedder import get_nomic_embedder
+from core.rag.index_builder import (
+    build_text, build_metadata, content_hash, assign_ids, embed_corpus, build_chunk_index,
+    index_version, write_index_version
+)
+from core.rag.loader import load_courses
+from core.rag.predicates import build_filter_metadata
+from vectorstore.numpy_store import NumpyVectorStore
+from utils.config import (
+    EMBEDDINGS_DIR, NUMPY_INDEX_DIR, MULTIVECTOR_INDEX_DIR, RETRIEVAL_BACKEND, INDEX_BATCH_SIZE, INDEX_WORKERS,
+    FAISS_INDEX_DIR, FAISS_INDEX_TYPE, FAISS_NLIST, FAISS_HNSW_M
+)
 
-try:
-    # Initialize Nomic embedding model
-    print("Loading embedding model: nomic-ai/nomic-embed-text-v1.5...")
-    embedder = get_nomic_embedder()
 
-    # Load JSON
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    backend_dir = os.path.dirname(script_dir)
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build the course vector index")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only embed new/changed courses, delete removed ones and keep unchanged embeddings"
+    )
+    parser.add_argument("--batch-size", type=int, default=INDEX_BATCH_SIZE,
+                        help="Documents per forward pass")
+    parser.add_argument("--workers", type=int, default=INDEX_WORKERS,
+                        help="Worker processes for embedding (each loads the model once)")
+    parser.add_argument("--verify", action="store_true",
+                        help="Compare every batched vector against per-document embedding")
+    parser.add_argument("--multivector", action="store_true",
+                        default=RETRIEVAL_BACKEND == "multivector",
+                        help="Also build the field-chunk multi-vector index")
+    parser.add_argument("--faiss", action="store_true",
+                        default=RETRIEVAL_BACKEND == "faiss",
+                        help="Also build the FAISS index (FAISS_INDEX_TYPE)")
+    return parser.parse_args()
+
+
+def embed_documents(embedder, texts, args):
+    """Embed documents with the batched pipeline and report throughput"""
+    embeddings, stats = embed_corpus(
+        texts, embedder, batch_size=args.batch_size, workers=args.workers
+    )
+    print(f"⚡ Embedded {stats['docs']} docs in {stats['seconds']:.2f}s "
+          f"({stats['docs_per_sec']:.1f} docs/sec, batch size {args.batch_size}, "
+          f"{args.workers} worker(s), padding {stats.get('padding_ratio', 0.0):.1%})")
+    if stats.get("verified"):
+        print(f"🔎 {stats['verified']} most padded docs match the per-document path "
+              f"(max |diff| {stats['verify_max_diff']:.2e})")
+
+    if args.verify and texts:
+        serial = np.stack([embedder.embed_array(t, normalize=True) for t in texts])
+        cosine = np.sum(serial * embeddings, axis=1)
+        print(f"🔎 Verify vs per-document path: max |diff| {np.abs(serial - embeddings).max():.2e}, "
+              f"min cosine {cosine.min():.6f}")
+    return embeddings
+
+
+def write_faiss_index(store):
+    """Write the FAISS index (FAISS_INDEX_TYPE) from the exported NumPy rows"""
+    from vectorstore.faiss_store import FaissVectorStore
 
-    with open(os.path.join(backend_dir, "data", "raw", "CourseData.json"), "r", encoding="utf-8") as f:
-        courses = json.load(f)
+    print(f"Writing FAISS {FAISS_INDEX_TYPE} index...")
+    FaissVectorStore.build(
+        store.embeddings, store.ids, store.documents, store.metadatas,
+        index_type=FAISS_INDEX_TYPE, nlist=FAISS_NLIST, hnsw_m=FAISS_HNSW_M
+    ).save(FAISS_INDEX_DIR)
 
-    # Chroma DB client - using PersistentClient with cosine similarity
-    persist_dir = os.path.join(backend_dir, "data", "embeddings")
 
+def write_multivector_index(embedder, courses, ids, documents, metadatas, args):
+    """Chunk courses by field and write the multi-vector index (reusing unchanged courses)"""
+    from vectorstore.multivector_store import MultiVectorStore, CHUNK_EMBEDDINGS_FILE
+
+    previous = None
+    if args.incremental and os.path.exists(os.path.join(MULTIVECTOR_INDEX_DIR, CHUNK_EMBEDDINGS_FILE)):
+        previous = MultiVectorStore.load(MULTIVECTOR_INDEX_DIR, mmap=False)
+
+    print("\nBuilding multi-vector field-chunk index...")
+    store, chunk_stats = build_chunk_index(
+        courses, ids, documents, metadatas, embedder,
+        batch_size=args.batch_size, workers=args.workers, previous=previous
+    )
+    store.save(MULTIVECTOR_INDEX_DIR)
+    print(f"🧩 {chunk_stats['chunks']} chunks for {store.count()} courses "
+          f"(embedded {chunk_stats['embedded']}, reused {chunk_stats['reused']})")
+
+
+def full_rebuild(embedder, persist_dir, ids, documents, metadatas, args):
+    """Delete the index directory and embed every course"""
     # Clear existing embeddings to ensure clean rebuild
     if os.path.exists(persist_dir):
         print(f"Clearing existing embeddings at {persist_dir}...")
@@ -50,68 +121,16 @@ try:
 
     collection = chroma.create_collection(
         name="courses",
-        metadata={"hnsw:space": "cosine"}  # Use cosine similarity instead of L2
+        metadata={
+            "hnsw:space": "cosine",  # Use cosine similarity instead of L2
+            "embedding_dimension": embedder.get_dimension()  # Queries must match this
+        }
     )
 
-    print("Created new collection with cosine similarity")
-
-    # Build course text with richer structure
-    def build_text(course):
-        return f"""
-        Course Title: {course.get('Course', 'N/A')}
-        Offered By: {course.get('Department', 'N/A')} at {course.get('Campus', 'N/A')}
-        Study Language: {course.get('Study Language', 'N/A')}
-        Study Method: {course.get('Study Method', 'N/A')}
-        Duration: {course.get('Duration', 'N/A')}
-
-        Admission Requirements:
-        {course.get('Entry Requirements', 'N/A')}
-
-        Career Opportunities:
-        {course.get('Career Opportunities', 'N/A')}
-
-        English Requirement Level: {course.get('English Level', 'N/A')}
-        Fees: {course.get('Course Fees', 'N/A')}
-        Location: {course.get('Location', 'N/A')}
-
-        URL: {course.get('URL', 'N/A')}
-        """
-
-    # Normalize embeddings for better similarity
-    def normalize(v):
-        """Normalize embedding vector"""
-        return (np.array(v) / np.linalg.norm(v)).tolist()
-
-    # Generate embeddings with Nomic
-    def embed_text(text):
-        return embedder.embed(text, normalize=True)
-
-
-    # Build embeddings
-    ids, documents, embeddings, metadatas = [], [], [], []
-
-    print(f"Processing {len(courses)} courses...")
-    for idx, c in enumerate(courses):
-        print(f"Processing course {idx + 1}/{len(courses)}: {c.get('Course', 'Unknown')}")
-        
-        text = build_text(c)
-        vector = embed_text(text)
-        
-        # Create clean metadata - convert all values to strings
-        metadata = {
-            "course": str(c.get('Course', '')),
-            "department": str(c.get('Department', '')),
-            "campus": str(c.get('Campus', '')),
-            "duration": str(c.get('Duration', '')),
-            "location": str(c.get('Location', '')),
-            "study_method": str(c.get('Study Method', '')),
-            "url": str(c.get('URL', ''))
-        }
+    print(f"Created new collection with cosine similarity (dimension: {embedder.get_dimension()})")
 
-        ids.append(str(idx))
-        documents.append(text)
-        embeddings.append(vector)
-        metadatas.append(metadata)
+    print(f"Processing {len(documents)} courses...")
+    embeddings = embed_documents(embedder, documents, args)
 
     print("\nAdding to ChromaDB...")
     collection.add(
@@ -121,11 +140,162 @@ try:
         metadatas=metadatas
     )
 
-    # PersistentClient auto-saves, no need to call persist()
-    print(f"\n✅ Vector index created successfully with Nomic embeddings!")
-    print(f"   Total courses indexed: {len(courses)}")
-    print(f"   Embeddings saved to: {persist_dir}")
+    # Export the same rows as a memory-mapped matrix for the exact NumPy backend
+    print("Writing NumPy exact-search index...")
+    store = NumpyVectorStore(
+        embeddings=embeddings,
+        ids=ids,
+        documents=documents,
+        metadatas=metadatas
+    )
+    store.save(NUMPY_INDEX_DIR)
+    if args.faiss:
+        write_faiss_index(store)
+
+    return {"embedded": len(ids), "skipped": 0, "deleted": 0, "metadata_updated": 0}
+
+
+def incremental_update(embedder, persist_dir, ids, documents, metadatas, args):
+    """
+    Upsert only new/changed courses and delete removed ones.
+
+    Ids are content hashes, so a changed course shows up as a new id plus a
+    removed one. Returns None when no compatible index exists.
+    """
+    if not os.path.exists(persist_dir):
+        print("No existing index found.")
+        return None
+
+    chroma = chromadb.PersistentClient(path=persist_dir)
+    try:
+        collection = chroma.get_collection("courses")
+    except Exception:
+        print("No existing 'courses' collection found.")
+        return None
+
+    built_with = int((collection.metadata or {}).get("embedding_dimension", 768))
+    if built_with != embedder.get_dimension():
+        print(f"Existing index is {built_with}-d but the embedder produces "
+              f"{embedder.get_dimension()}-d vectors.")
+        return None
+
+    existing = collection.get(include=["metadatas"])
+    existing_meta = dict(zip(existing["ids"], existing["metadatas"]))
+
+    new_rows = [i for i, cid in enumerate(ids) if cid not in existing_meta]
+    changed_meta = [i for i, cid in enumerate(ids)
+                    if cid in existing_meta and existing_meta[cid] != metadatas[i]]
+    current = set(ids)
+    removed = [cid for cid in existing_meta if cid not in current]
+
+    print(f"Courses: {len(ids)} | new/changed: {len(new_rows)} | "
+          f"metadata-only changes: {len(changed_meta)} | removed: {len(removed)}")
+
+    if removed:
+        print(f"Deleting {len(removed)} removed courses...")
+        collection.delete(ids=removed)
+
+    if new_rows:
+        embeddings = embed_documents(embedder, [documents[i] for i in new_rows], args)
+        print(f"\nUpserting {len(new_rows)} courses into ChromaDB...")
+        collection.upsert(
+            ids=[ids[i] for i in new_rows],
+            documents=[documents[i] for i in new_rows],
+            embeddings=embeddings,
+            metadatas=[metadatas[i] for i in new_rows]
+        )
+
+    if changed_meta:
+        # Same text (same embedding), different derived metadata
+        collection.update(
+            ids=[ids[i] for i in changed_meta],
+            metadatas=[metadatas[i] for i in changed_meta]
+        )
+
+    if (new_rows or changed_meta or removed or not os.path.exists(NUMPY_INDEX_DIR)
+            or (args.faiss and not os.path.exists(FAISS_INDEX_DIR))):
+        print("Re-exporting NumPy exact-search index...")
+        store = NumpyVectorStore.from_chroma(collection)
+        store.save(NUMPY_INDEX_DIR)
+        if args.faiss:
+            write_faiss_index(store)
+
+    return {
+        "embedded": len(new_rows),
+        "skipped": len(ids) - len(new_rows),
+        "deleted": len(removed),
+        "metadata_updated": len(changed_meta)
+    }
+
+
+def main():
+    args = parse_args()
+
+    try:
+        start_time = time.perf_counter()
+
+        # Initialize Nomic embedding model
+        print("Loading embedding model: nomic-ai/nomic-embed-text-v1.5...")
+        embedder = get_nomic_embedder()
+
+        # Load JSON
+        courses = load_courses()
+
+        # Chroma DB client - using PersistentClient with cosine similarity
+        persist_dir = EMBEDDINGS_DIR
+
+        # Build documents, metadata and content-derived ids
+        documents = [build_text(c) for c in courses]
+        metadatas = []
+        for c, text in zip(courses, documents):
+            # Create clean metadata - convert all values to strings
+            metadata = build_metadata(c)
+            # Structured fields for where-filter pushdown (locations, study method, A/L, IELTS)
+            metadata.update(build_filter_metadata(c, metadata))
+            metadata["content_hash"] = content_hash(text)
+            metadatas.append(metadata)
+        ids = assign_ids(documents)
+
+        stats = None
+        if args.incremental:
+            print("\n🔁 Incremental build")
+            stats = incremental_update(embedder, persist_dir, ids, documents, metadatas, args)
+            if stats is None:
+                print("Falling back to a full rebuild.")
+
+        if stats is None:
+            print("\n🧱 Full rebuild")
+            stats = full_rebuild(embedder, persist_dir, ids, documents, metadatas, args)
+
+        if args.multivector:
+            write_multivector_index(embedder, courses, ids, documents, metadatas, args)
+
+        # Lets the API drop cached responses computed against the previous index
+        version = index_version(ids, metadatas, embedder.get_dimension())
+        write_index_version(persist_dir, version)
+
+        elapsed = time.perf_counter() - start_time
+
+        # PersistentClient auto-saves, no need to call persist()
+        print(f"\n✅ Vector index updated successfully with Nomic embeddings!")
+        print(f"   Total courses indexed: {len(courses)}")
+        print(f"   Embedded: {stats['embedded']} | Skipped (unchanged): {stats['skipped']} | "
+              f"Deleted: {stats['deleted']} | Metadata updated: {stats['metadata_updated']}")
+        print(f"   Index version: {version}")
+        print(f"   Wall time: {elapsed:.2f}s")
+        print(f"   Embeddings saved to: {persist_dir}")
+        print(f"   NumPy index saved to: {NUMPY_INDEX_DIR}")
+        if args.faiss:
+            print(f"   FAISS index saved to: {FAISS_INDEX_DIR}")
+        if args.multivector:
+            print(f"   Multi-vector index saved to: {MULTIVECTOR_INDEX_DIR}")
+
+    except Exception as e:
+        print(f"\n❌ CRITICAL ERROR: {e}")
+        traceback.print_exc()
+        # Non-zero exit so deploy scripts do not ship a half-built index
+        sys.exit(1)
+
 
-except Exception as e:
-    print(f"\n❌ CRITICAL ERROR: {e}")
-    traceback.print_exc()
+if __name__ == "__main__":
+    main()
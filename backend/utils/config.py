@@ -1 +1,202 @@
 # Configuration
+"""
+Central configuration for the recommendation backend.
+
+All values can be overridden with environment variables (or a .env file).
+"""
+
+import os
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# -------------------------
+# Paths
+# -------------------------
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BACKEND_DIR, "data")
+COURSE_DATA_PATH = os.path.join(DATA_DIR, "raw", "CourseData.json")
+EMBEDDINGS_DIR = os.getenv("EMBEDDINGS_DIR", os.path.join(DATA_DIR, "embeddings"))
+
+# -------------------------
+# Eligibility
+# -------------------------
+# Gate catalog courses on the IELTS / O/L rules of their "Entry Requirements". The index
+# metadata never carried that text, so these gates have not applied to retrieved courses;
+# enabling them blocks 11 IELTS courses for students without a score and 76 O/L courses
+# for students without O/L results
+ELIGIBILITY_ENTRY_GATES = os.getenv("ELIGIBILITY_ENTRY_GATES", "false").lower() == "true"
+
+# -------------------------
+# Retrieval
+# -------------------------
+# Vector backend used by rag_search: "chroma" (HNSW, default), "numpy" (exact, in-process),
+# "faiss" (flat / IVF-Flat / HNSW, see FAISS_INDEX_TYPE) or "multivector" (field chunks, max-sim)
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "chroma").lower()
+
+# Directory holding the memory-mapped NumPy index (embeddings.npy + records.json)
+NUMPY_INDEX_DIR = os.getenv("NUMPY_INDEX_DIR", os.path.join(EMBEDDINGS_DIR, "numpy"))
+
+# Directory holding the multi-vector field-chunk index (built by build_index.py --multivector)
+MULTIVECTOR_INDEX_DIR = os.getenv("MULTIVECTOR_INDEX_DIR", os.path.join(EMBEDDINGS_DIR, "multivector"))
+
+# Search strategy: "dense" (vector search over the whole catalog) or "hybrid"
+# (BM25 candidate pool reranked with dense scores from the NumPy index)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "dense").lower()
+
+# Hybrid: lexical candidate pool size and how the two stages are combined ("dense" or "rrf")
+HYBRID_LEXICAL_K = int(os.getenv("HYBRID_LEXICAL_K", "200"))
+HYBRID_FUSION = os.getenv("HYBRID_FUSION", "dense").lower()
+HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+
+# Apply eligibility/preference predicates inside the vector query (needs an index built
+# with filter metadata; older indexes are queried unfiltered)
+RETRIEVAL_PREDICATE_PUSHDOWN = os.getenv("RETRIEVAL_PREDICATE_PUSHDOWN", "true").lower() == "true"
+
+# Also push the location/study-method preferences down (hard filters; the search is
+# retried with eligibility predicates only when they leave fewer than top-k courses)
+RETRIEVAL_PUSHDOWN_PREFERENCES = os.getenv("RETRIEVAL_PUSHDOWN_PREFERENCES", "false").lower() == "true"
+
+# Directory holding the FAISS index (index.faiss + records.json)
+FAISS_INDEX_DIR = os.getenv("FAISS_INDEX_DIR", os.path.join(EMBEDDINGS_DIR, "faiss"))
+
+# FAISS index type: "flat" (exact inner product), "ivf" (IVF-Flat) or "hnsw"
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat").lower()
+
+# IVF cluster count (0 = sqrt(catalog size)) and lists probed per query
+FAISS_NLIST = int(os.getenv("FAISS_NLIST", "0"))
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "8"))
+
+# HNSW neighbours per node and search depth
+FAISS_HNSW_M = int(os.getenv("FAISS_HNSW_M", "32"))
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "64"))
+
+# -------------------------
+# Embedding model
+# -------------------------
+# Forward-pass backend for NomicEmbedder: "torch" (SentenceTransformer) or "onnx" (ONNX Runtime)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+
+# Output embedding dimension. Below 768 uses Matryoshka truncation (e.g. 512/256/128);
+# the index must be rebuilt with the same value
+EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "768"))
+
+# Directory for the exported ONNX model + tokenizer (exported on first use if missing)
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(BACKEND_DIR, "models", "onnx", "nomic-embed-text-v1.5"))
+
+# Use the dynamic int8-quantized ONNX model
+ONNX_QUANTIZE = os.getenv("ONNX_QUANTIZE", "true").lower() == "true"
+
+# Tokenizer truncation length for the ONNX backend (course documents are well below this)
+ONNX_MAX_SEQ_LENGTH = int(os.getenv("ONNX_MAX_SEQ_LENGTH", "512"))
+
+# -------------------------
+# Index build
+# -------------------------
+# Documents per forward pass when building the index
+INDEX_BATCH_SIZE = int(os.getenv("INDEX_BATCH_SIZE", "32"))
+
+# Worker processes for index embedding (each loads the model once; 1 = in-process)
+INDEX_WORKERS = int(os.getenv("INDEX_WORKERS", "1"))
+
+# Batched vectors are not bit-identical to per-document embedding (padding changes the
+# float summation order). Every build re-embeds the most padded documents one at a time
+# and fails if any component differs by more than the tolerance (sample 0 = no check)
+INDEX_VERIFY_SAMPLE = int(os.getenv("INDEX_VERIFY_SAMPLE", "8"))
+INDEX_VERIFY_TOLERANCE = float(os.getenv("INDEX_VERIFY_TOLERANCE", "1e-4"))
+
+# -------------------------
+# Embedding cache
+# -------------------------
+# Max number of cached query embeddings in NomicEmbedder (0 disables the cache)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "1024"))
+
+# Seconds before a cached query embedding expires (0 = never)
+EMBEDDING_CACHE_TTL = float(os.getenv("EMBEDDING_CACHE_TTL", "3600"))
+
+# -------------------------
+# Embedding micro-batching
+# -------------------------
+# Coalesce concurrent single-text embed calls into one batched forward pass
+EMBEDDING_BATCHING_ENABLED = os.getenv("EMBEDDING_BATCHING_ENABLED", "false").lower() == "true"
+
+# How long the batcher waits for more requests after the first one (milliseconds)
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+
+# Maximum number of texts per batched forward pass
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+
+# Seconds a caller waits for its batched embedding before giving up (empty vector)
+EMBEDDING_BATCH_TIMEOUT = float(os.getenv("EMBEDDING_BATCH_TIMEOUT", "30"))
+
+# -------------------------
+# Career goal resolver
+# -------------------------
+# Max number of memoized career-goal resolutions (0 disables the cache)
+CAREER_RESOLVER_CACHE_SIZE = int(os.getenv("CAREER_RESOLVER_CACHE_SIZE", "1024"))
+
+# Resolve goals that match no CAREER_DOMAIN_MAP key by embedding similarity to the keys
+CAREER_EMBEDDING_FALLBACK = os.getenv("CAREER_EMBEDDING_FALLBACK", "true").lower() == "true"
+
+# Minimum cosine similarity between a goal and a career key for the embedding fallback
+CAREER_SIMILARITY_THRESHOLD = float(os.getenv("CAREER_SIMILARITY_THRESHOLD", "0.75"))
+
+# -------------------------
+# Recommendation response cache
+# -------------------------
+# Serve repeated /recommend requests (same profile + parameters + index version) from cache
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+
+# Max number of responses kept in memory
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+# Seconds before a cached response expires (0 = never)
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "600"))
+
+# Optional on-disk tier shared across workers/restarts ("" disables it)
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR", "")
+
+# Max number of responses kept on disk (oldest are pruned)
+RESPONSE_CACHE_DISK_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_DISK_MAX_ENTRIES", "10000"))
+
+# Seconds between re-checks of the version tag (index build, catalog file, settings);
+# a rebuilt index invalidates cached responses within this interval
+RESPONSE_CACHE_VERSION_REFRESH = float(os.getenv("RESPONSE_CACHE_VERSION_REFRESH", "5"))
+
+# -------------------------
+# Pipeline execution
+# -------------------------
+# Run blocking pipeline stages (embedding + search, agent rules) on a thread pool instead of the event loop
+PIPELINE_OFFLOAD = os.getenv("PIPELINE_OFFLOAD", "true").lower() == "true"
+
+# Threads in the shared pipeline pool
+PIPELINE_THREADS = int(os.getenv("PIPELINE_THREADS", str(min(8, (os.cpu_count() or 1) + 2))))
+
+# Max concurrent calls per stage (0 = only bounded by the pool)
+PIPELINE_RETRIEVAL_CONCURRENCY = int(os.getenv("PIPELINE_RETRIEVAL_CONCURRENCY", str(os.cpu_count() or 1)))
+PIPELINE_AGENT_CONCURRENCY = int(os.getenv("PIPELINE_AGENT_CONCURRENCY", "4"))
+
+# -------------------------
+# Explanations
+# -------------------------
+# Ask the LLM for the top-N explanations (template explanations are used otherwise and as fallback)
+EXPLANATION_LLM_ENABLED = os.getenv("EXPLANATION_LLM_ENABLED", "false").lower() == "true"
+
+# "per_course" (one prompt per course, sent concurrently) or "batched" (one prompt for all
+# top-N courses with a JSON reply; courses missing from the reply are asked per course)
+EXPLANATION_LLM_MODE = os.getenv("EXPLANATION_LLM_MODE", "per_course").lower()
+
+# Max LLM explanation calls in flight per worker (shared by all requests)
+EXPLANATION_LLM_CONCURRENCY = int(os.getenv("EXPLANATION_LLM_CONCURRENCY", "5"))
+
+# Seconds a request waits for its LLM explanations before falling back to templates
+EXPLANATION_LLM_DEADLINE = float(os.getenv("EXPLANATION_LLM_DEADLINE", "8"))
+
+# Persistent LLM explanation cache (SQLite, shared by all workers on the host)
+EXPLANATION_CACHE_ENABLED = os.getenv("EXPLANATION_CACHE_ENABLED", "true").lower() == "true"
+EXPLANATION_CACHE_PATH = os.getenv("EXPLANATION_CACHE_PATH", os.path.join(DATA_DIR, "cache", "explanations.sqlite3"))
+EXPLANATION_CACHE_MAX_ENTRIES = int(os.getenv("EXPLANATION_CACHE_MAX_ENTRIES", "50000"))
+
+# Seconds before a cached explanation expires (0 = never)
+EXPLANATION_CACHE_TTL = float(os.getenv("EXPLANATION_CACHE_TTL", str(30 * 24 * 3600)))
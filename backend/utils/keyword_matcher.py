@@ -0,0 +1,102 @@
+"""
+Multi-Pattern Keyword Matcher
+
+Finds which keyword classes occur in a text in a single scan, replacing
+`any(keyword in text for keyword in keywords)` loops (one scan per keyword).
+
+All keywords are compiled into one regex shaped like a trie
+("comput(?:er (?:science|engineering)|ing)"), so the regex engine skips
+positions that cannot start a keyword and branches on characters instead
+of trying every keyword. Each search returns the longest keyword starting
+at the next candidate position and the scan resumes one character later,
+so overlapping keywords are found too; keywords that are a prefix of a
+match ("computer" within "computer science") are implied. The result
+equals plain substring tests for every keyword.
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    """Regex for a character trie ("" marks the end of a keyword)"""
+    ends_here = "" in node
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    group = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if ends_here:
+        # Greedy: try the longer keyword first, fall back to the one ending here
+        return "(?:" + group + ")?"
+    return group
+
+
+class KeywordMatcher:
+    """
+    Precompiled matcher for named keyword classes (case-insensitive substring semantics).
+    """
+
+    def __init__(self, keyword_classes: Dict[str, Iterable[str]]):
+        """
+        Args:
+            keyword_classes: class name -> keywords (a keyword may appear in several classes)
+        """
+        classes_of: Dict[str, Set[str]] = {}
+        for name, keywords in keyword_classes.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword:
+                    classes_of.setdefault(keyword, set()).add(name)
+
+        self.keyword_classes = {name: list(keywords) for name, keywords in keyword_classes.items()}
+        self.keywords = sorted(classes_of)
+
+        # A match of `keyword` also means every keyword that is a prefix of it matched
+        self._implied: Dict[str, FrozenSet[str]] = {}
+        self._implied_keywords: Dict[str, FrozenSet[str]] = {}
+        for keyword in self.keywords:
+            prefixes = [k for k in self.keywords if keyword.startswith(k)]
+            self._implied_keywords[keyword] = frozenset(prefixes)
+            self._implied[keyword] = frozenset(c for k in prefixes for c in classes_of[k])
+
+        trie: Dict[str, dict] = {}
+        for keyword in self.keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        self._pattern = re.compile(_trie_pattern(trie)) if self.keywords else None
+
+    def _longest_matches(self, text: str) -> Set[str]:
+        found: Set[str] = set()
+        if self._pattern is None or not text:
+            return found
+        text = text.lower()
+        search = self._pattern.search
+        match = search(text)
+        while match:
+            found.add(match.group())
+            match = search(text, match.start() + 1)
+        return found
+
+    def match(self, text: str) -> Set[str]:
+        """
+        Keyword classes with at least one keyword in the text.
+
+        Args:
+            text: Text to scan
+
+        Returns:
+            Set of matched class names
+        """
+        classes: Set[str] = set()
+        for keyword in self._longest_matches(text):
+            classes |= self._implied[keyword]
+        return classes
+
+    def matched_keywords(self, text: str) -> List[str]:
+        """Every keyword that occurs in the text (sorted)"""
+        found: Set[str] = set()
+        for keyword in self._longest_matches(text):
+            found |= self._implied_keywords[keyword]
+        return sorted(found)
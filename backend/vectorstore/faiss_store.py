@@ -1 +1,267 @@
-# FAISS Store
+"""
+FAISS Vector Store
+
+Persistent FAISS-backed course index with three index types:
+- "flat": exact inner-product search (IndexFlatIP), best for small catalogs
+- "ivf":  IVF-Flat, clusters the catalog and probes nprobe lists per query
+- "hnsw": HNSW graph over inner product, fast approximate search at scale
+
+Embeddings are L2-normalized, so inner product equals cosine similarity and
+distances are reported like Chroma's cosine space (1 - similarity).
+
+FAISS row i maps to ids[i] / documents[i] / metadatas[i] in records.json.
+The query() method mirrors chromadb's Collection.query() output; `where`
+filters are evaluated on the metadata and passed to FAISS as an id
+selector, so the top-k is taken among matching rows only.
+"""
+
+import json
+import math
+import os
+import numpy as np
+import faiss
+from typing import List, Dict, Any, Optional, Sequence
+
+from vectorstore.filters import where_mask
+
+
+INDEX_FILE = "index.faiss"
+RECORDS_FILE = "records.json"
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+
+
+class FaissVectorStore:
+    """
+    FAISS index plus the id <-> course mapping needed to format results.
+    """
+
+    def __init__(
+        self,
+        index: "faiss.Index",
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        index_type: str = "flat"
+    ):
+        """
+        Args:
+            index: Populated FAISS index (row i = ids[i])
+            ids: Course ids aligned with the index rows
+            documents: Indexed course documents aligned with the rows
+            metadatas: Course metadata dicts aligned with the rows
+            index_type: One of "flat", "ivf", "hnsw"
+        """
+        if not (len(ids) == len(documents) == len(metadatas) == index.ntotal):
+            raise ValueError("ids, documents, metadatas and index rows must have the same length")
+
+        self.index = index
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.index_type = index_type
+
+    # -------------------------
+    # Construction / persistence
+    # -------------------------
+    @classmethod
+    def build(
+        cls,
+        embeddings: np.ndarray,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        index_type: str = "flat",
+        nlist: int = 0,
+        hnsw_m: int = 32,
+        ef_construction: int = 200
+    ) -> "FaissVectorStore":
+        """
+        Build an index from normalized embeddings.
+
+        Args:
+            embeddings: (n, dim) float32 matrix, one row per course
+            ids: Course ids aligned with the rows
+            documents: Course documents aligned with the rows
+            metadatas: Course metadata aligned with the rows
+            index_type: "flat", "ivf" or "hnsw"
+            nlist: IVF cluster count (0 = sqrt(n))
+            hnsw_m: HNSW neighbours per node
+            ef_construction: HNSW build-time search depth
+
+        Returns:
+            FaissVectorStore instance
+        """
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown FAISS index type '{index_type}' (expected one of {INDEX_TYPES})")
+
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        n, dim = vectors.shape
+
+        if index_type == "ivf":
+            # Keep enough training points per centroid (FAISS wants ~39 per list)
+            nlist = nlist or max(1, int(math.sqrt(n)))
+            nlist = max(1, min(nlist, n // 39 or 1))
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+        elif index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(dim, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = ef_construction
+        else:
+            index = faiss.IndexFlatIP(dim)
+
+        index.add(vectors)
+        return cls(index, list(ids), list(documents), list(metadatas), index_type=index_type)
+
+    @classmethod
+    def load(
+        cls,
+        index_dir: str,
+        mmap: bool = True,
+        nprobe: int = 8,
+        ef_search: int = 64
+    ) -> "FaissVectorStore":
+        """
+        Load a store saved with save().
+
+        Args:
+            index_dir: Directory containing index.faiss and records.json
+            mmap: Memory-map the index file where the index type supports it
+            nprobe: IVF lists probed per query
+            ef_search: HNSW search depth
+
+        Returns:
+            FaissVectorStore instance
+        """
+        path = os.path.join(index_dir, INDEX_FILE)
+        index = None
+        if mmap:
+            try:
+                index = faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError:
+                index = None
+        if index is None:
+            index = faiss.read_index(path)
+
+        with open(os.path.join(index_dir, RECORDS_FILE), "r", encoding="utf-8") as f:
+            records = json.load(f)
+
+        store = cls(
+            index,
+            ids=records["ids"],
+            documents=records["documents"],
+            metadatas=records["metadatas"],
+            index_type=records.get("index_type", "flat")
+        )
+        store.set_search_params(nprobe=nprobe, ef_search=ef_search)
+        return store
+
+    def save(self, index_dir: str) -> None:
+        """
+        Persist the store as index.faiss + records.json.
+
+        Args:
+            index_dir: Target directory (created if missing)
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        faiss.write_index(self.index, os.path.join(index_dir, INDEX_FILE))
+        with open(os.path.join(index_dir, RECORDS_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "index_type": self.index_type,
+                "ids": self.ids,
+                "documents": self.documents,
+                "metadatas": self.metadatas
+            }, f, ensure_ascii=False)
+
+    def set_search_params(self, nprobe: int = 8, ef_search: int = 64) -> None:
+        """Tune recall/latency for approximate index types"""
+        if self.index_type == "ivf":
+            faiss.extract_index_ivf(self.index).nprobe = nprobe
+        elif self.index_type == "hnsw":
+            self.index.hnsw.efSearch = ef_search
+
+    # -------------------------
+    # Search
+    # -------------------------
+    def count(self) -> int:
+        """Number of indexed rows"""
+        return self.index.ntotal
+
+    @property
+    def dimension(self) -> int:
+        """Embedding dimension the index was built with"""
+        return self.index.d
+
+    def search(self, query_vecs: np.ndarray, top_k: int = 10, mask: Optional[np.ndarray] = None):
+        """
+        Top-k search for a batch of query vectors.
+
+        Args:
+            query_vecs: (q, dim) normalized query embeddings
+            top_k: Number of results per query
+            mask: Optional boolean row mask; only True rows are candidates
+
+        Returns:
+            Tuple of (row indices, cosine distances), each (q, k); missing hits are -1
+        """
+        q = np.ascontiguousarray(np.atleast_2d(query_vecs), dtype=np.float32)
+        if q.shape[1] != self.dimension:
+            raise ValueError(
+                f"Query dimension {q.shape[1]} does not match index dimension {self.dimension}"
+            )
+        if mask is None:
+            k = max(1, min(top_k, self.count()))
+            scores, rows = self.index.search(q, k)
+            return rows, 1.0 - scores
+
+        allowed = np.flatnonzero(mask).astype(np.int64)
+        k = max(1, min(top_k, allowed.size))
+        params = self._search_parameters(faiss.IDSelectorBatch(allowed))
+        scores, rows = self.index.search(q, k, params=params)
+        return rows, 1.0 - scores
+
+    def _search_parameters(self, selector):
+        """Per-query parameters carrying the id selector and current nprobe/efSearch"""
+        if self.index_type == "ivf":
+            return faiss.SearchParametersIVF(sel=selector, nprobe=faiss.extract_index_ivf(self.index).nprobe)
+        if self.index_type == "hnsw":
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=self.index.hnsw.efSearch)
+        return faiss.SearchParameters(sel=selector)
+
+    def query(
+        self,
+        query_embeddings: List[Sequence[float]],
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, List[List[Any]]]:
+        """
+        Chroma-compatible query.
+
+        Args:
+            query_embeddings: List of query vectors
+            n_results: Number of results per query
+            where: Optional Chroma-style metadata filter
+
+        Returns:
+            Dict with 'ids', 'documents', 'metadatas', 'distances' (one list per query)
+        """
+        mask = where_mask(self.metadatas, where) if where else None
+
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        if self.count() == 0 or (mask is not None and not mask.any()):
+            for _ in query_embeddings:
+                for key in results:
+                    results[key].append([])
+            return results
+
+        rows, distances = self.search(
+            np.asarray(query_embeddings, dtype=np.float32), top_k=n_results, mask=mask
+        )
+        for row_ids, row_dist in zip(rows, distances):
+            hits = [(int(i), float(d)) for i, d in zip(row_ids, row_dist) if i >= 0]
+            results["ids"].append([self.ids[i] for i, _ in hits])
+            results["documents"].append([self.documents[i] for i, _ in hits])
+            results["metadatas"].append([self.metadatas[i] for i, _ in hits])
+            results["distances"].append([d for _, d in hits])
+
+        return results
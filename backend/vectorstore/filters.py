@@ -0,0 +1,68 @@
+"""
+Metadata Filters
+
+Evaluates Chroma-style `where` filters against metadata dicts so the
+in-process stores (NumPy, FAISS) accept the same predicates as Chroma.
+
+Supported: {"key": value}, {"key": {"$eq"|"$ne"|"$gt"|"$gte"|"$lt"|"$lte"|"$in"|"$nin": ...}},
+{"$and": [...]}, {"$or": [...]}. A missing key never matches (as in Chroma).
+"""
+
+import numpy as np
+from typing import Dict, Any, List
+
+_MISSING = object()
+
+_OPERATORS = {
+    "$eq": lambda v, x: v == x,
+    "$ne": lambda v, x: v != x,
+    "$gt": lambda v, x: v > x,
+    "$gte": lambda v, x: v >= x,
+    "$lt": lambda v, x: v < x,
+    "$lte": lambda v, x: v <= x,
+    "$in": lambda v, x: v in x,
+    "$nin": lambda v, x: v not in x,
+}
+
+
+def matches_where(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    """
+    Check one metadata dict against a where filter
+
+    Args:
+        metadata: Stored course metadata
+        where: Chroma-style filter
+
+    Returns:
+        True if the record satisfies every clause
+    """
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, c) for c in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, c) for c in condition):
+                return False
+        else:
+            value = metadata.get(key, _MISSING)
+            if value is _MISSING:
+                return False
+            if isinstance(condition, dict):
+                for op, operand in condition.items():
+                    if op not in _OPERATORS:
+                        raise ValueError(f"Unsupported where operator '{op}'")
+                    try:
+                        if not _OPERATORS[op](value, operand):
+                            return False
+                    except TypeError:
+                        return False
+            elif value != condition:
+                return False
+    return True
+
+
+def where_mask(metadatas: List[Dict[str, Any]], where: Dict[str, Any]) -> np.ndarray:
+    """Boolean row mask of the records matching a where filter"""
+    return np.fromiter(
+        (matches_where(m, where) for m in metadatas), dtype=bool, count=len(metadatas)
+    )
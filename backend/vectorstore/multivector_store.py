@@ -0,0 +1,210 @@
+"""
+Multi-Vector Store
+
+Several embeddings per course (one per field chunk, see core/rag/chunker.py)
+with max-sim aggregation: a course scores as its best-matching chunk.
+
+Storage is compact: one contiguous float32 chunk matrix (memory-mapped),
+an int32 parent row per chunk, and ids/documents/metadatas stored once per
+course. Chunks are grouped by parent, so the per-course max is a single
+np.maximum.reduceat over the chunk scores.
+
+The query() method mirrors chromadb's Collection.query() output with one
+entry per course (never one per chunk).
+"""
+
+import json
+import os
+import numpy as np
+from typing import List, Dict, Any, Optional, Sequence
+
+from vectorstore.filters import where_mask
+
+
+CHUNK_EMBEDDINGS_FILE = "chunk_embeddings.npy"
+CHUNK_PARENTS_FILE = "chunk_parents.npy"
+RECORDS_FILE = "records.json"
+
+
+class MultiVectorStore:
+    """
+    Max-sim course search over field-chunk embeddings.
+    """
+
+    def __init__(
+        self,
+        chunk_embeddings: np.ndarray,
+        chunk_parents: np.ndarray,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        chunk_fields: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            chunk_embeddings: (n_chunks, dim) float32 matrix, normalized rows
+            chunk_parents: (n_chunks,) course row of each chunk, non-decreasing
+            ids: Course ids (one per course)
+            documents: Course documents (one per course)
+            metadatas: Course metadata dicts (one per course)
+            chunk_fields: Optional field name per chunk (for diagnostics)
+        """
+        if chunk_embeddings.ndim != 2 or chunk_embeddings.shape[0] != len(chunk_parents):
+            raise ValueError("chunk_embeddings and chunk_parents must have one row per chunk")
+        if not (len(ids) == len(documents) == len(metadatas)):
+            raise ValueError("ids, documents and metadatas must have the same length")
+
+        parents = np.asarray(chunk_parents, dtype=np.int32)
+        if parents.size and (np.any(np.diff(parents) < 0) or parents[-1] >= len(ids)):
+            raise ValueError("chunk_parents must be sorted and refer to existing courses")
+        counts = np.bincount(parents, minlength=len(ids))
+        if np.any(counts == 0):
+            raise ValueError("Every course needs at least one chunk")
+
+        self.chunk_embeddings = chunk_embeddings
+        self.chunk_parents = parents
+        self.chunk_fields = chunk_fields
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        # First chunk row of each course (reduceat segment starts)
+        self.chunk_starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+
+    # -------------------------
+    # Construction / persistence
+    # -------------------------
+    @classmethod
+    def load(cls, index_dir: str, mmap: bool = True) -> "MultiVectorStore":
+        """
+        Load a store saved with save().
+
+        Args:
+            index_dir: Directory containing the chunk arrays and records.json
+            mmap: Memory-map the chunk matrix instead of reading it into RAM
+
+        Returns:
+            MultiVectorStore instance
+        """
+        embeddings = np.load(
+            os.path.join(index_dir, CHUNK_EMBEDDINGS_FILE),
+            mmap_mode="r" if mmap else None
+        )
+        parents = np.load(os.path.join(index_dir, CHUNK_PARENTS_FILE))
+        with open(os.path.join(index_dir, RECORDS_FILE), "r", encoding="utf-8") as f:
+            records = json.load(f)
+
+        return cls(
+            chunk_embeddings=embeddings,
+            chunk_parents=parents,
+            ids=records["ids"],
+            documents=records["documents"],
+            metadatas=records["metadatas"],
+            chunk_fields=records.get("chunk_fields")
+        )
+
+    def save(self, index_dir: str) -> None:
+        """
+        Persist the store as chunk_embeddings.npy + chunk_parents.npy + records.json.
+
+        Args:
+            index_dir: Target directory (created if missing)
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        np.save(
+            os.path.join(index_dir, CHUNK_EMBEDDINGS_FILE),
+            np.ascontiguousarray(self.chunk_embeddings, dtype=np.float32)
+        )
+        np.save(os.path.join(index_dir, CHUNK_PARENTS_FILE), self.chunk_parents)
+        with open(os.path.join(index_dir, RECORDS_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "ids": self.ids,
+                "documents": self.documents,
+                "metadatas": self.metadatas,
+                "chunk_fields": self.chunk_fields
+            }, f, ensure_ascii=False)
+
+    def chunks_of(self, row: int) -> np.ndarray:
+        """Chunk embedding rows belonging to course row `row`"""
+        end = self.chunk_starts[row + 1] if row + 1 < self.count() else self.chunk_count()
+        return self.chunk_embeddings[self.chunk_starts[row]:end]
+
+    # -------------------------
+    # Search
+    # -------------------------
+    def count(self) -> int:
+        """Number of courses"""
+        return len(self.ids)
+
+    def chunk_count(self) -> int:
+        """Number of stored chunk vectors"""
+        return self.chunk_embeddings.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        """Embedding dimension the index was built with"""
+        return self.chunk_embeddings.shape[1]
+
+    def course_scores(self, query_vec: Sequence[float]) -> np.ndarray:
+        """Max-sim score of every course for one normalized query vector"""
+        q = np.asarray(query_vec, dtype=np.float32)
+        if q.shape != (self.dimension,):
+            raise ValueError(
+                f"Query dimension {q.shape[-1] if q.ndim else 0} does not match "
+                f"index dimension {self.dimension}"
+            )
+        return np.maximum.reduceat(self.chunk_embeddings @ q, self.chunk_starts)
+
+    def search(self, query_vec: Sequence[float], top_k: int = 10, mask: Optional[np.ndarray] = None):
+        """
+        Top-k courses by max-sim for a single query vector.
+
+        Args:
+            query_vec: Normalized query embedding
+            top_k: Number of courses to return
+            mask: Optional boolean course mask; only True rows are candidates
+
+        Returns:
+            Tuple of (course rows, cosine distances), best match first
+        """
+        scores = self.course_scores(query_vec)
+        candidates = np.arange(scores.size) if mask is None else np.flatnonzero(mask)
+        scores = scores[candidates]
+
+        k = min(top_k, candidates.size)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if k < candidates.size:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(candidates.size)
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return candidates[top], 1.0 - scores[top]
+
+    def query(
+        self,
+        query_embeddings: List[Sequence[float]],
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, List[List[Any]]]:
+        """
+        Chroma-compatible query (one result per course).
+
+        Args:
+            query_embeddings: List of query vectors
+            n_results: Number of courses per query
+            where: Optional Chroma-style metadata filter
+
+        Returns:
+            Dict with 'ids', 'documents', 'metadatas', 'distances' (one list per query)
+        """
+        mask = where_mask(self.metadatas, where) if where else None
+
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for query_vec in query_embeddings:
+            rows, distances = self.search(query_vec, top_k=n_results, mask=mask)
+            results["ids"].append([self.ids[i] for i in rows])
+            results["documents"].append([self.documents[i] for i in rows])
+            results["metadatas"].append([self.metadatas[i] for i in rows])
+            results["distances"].append([float(d) for d in distances])
+
+        return results
@@ -0,0 +1,206 @@
+"""
+NumPy Exact Vector Store
+
+In-process exact nearest-neighbour search for small catalogs.
+
+All course embeddings live in one contiguous float32 matrix that is
+memory-mapped from an .npy file, so a query is a single matrix-vector
+product followed by an argpartition top-k. For a few hundred courses this
+is faster than walking an HNSW graph and always returns the true top-k.
+
+The query() method mirrors chromadb's Collection.query() output (including
+`where` metadata filters), so rag_search can use either store without
+changing its formatting code.
+"""
+
+import json
+import os
+import numpy as np
+from typing import List, Dict, Any, Optional, Sequence
+
+from vectorstore.filters import where_mask
+
+
+EMBEDDINGS_FILE = "embeddings.npy"
+RECORDS_FILE = "records.json"
+
+
+class NumpyVectorStore:
+    """
+    Exact cosine-similarity search over a float32 embedding matrix.
+
+    Embeddings are expected to be L2-normalized (as produced by
+    NomicEmbedder), so the dot product equals cosine similarity and the
+    reported distance matches Chroma's cosine space: 1 - similarity.
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]]
+    ):
+        """
+        Args:
+            embeddings: (n, dim) float32 matrix, one row per course
+            ids: Course ids aligned with the matrix rows
+            documents: Indexed course documents aligned with the rows
+            metadatas: Course metadata dicts aligned with the rows
+        """
+        if embeddings.ndim != 2:
+            raise ValueError(f"Expected a 2-D embedding matrix, got shape {embeddings.shape}")
+        if not (len(ids) == len(documents) == len(metadatas) == embeddings.shape[0]):
+            raise ValueError("ids, documents, metadatas and embeddings must have the same length")
+
+        self.embeddings = embeddings
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+
+    # -------------------------
+    # Construction / persistence
+    # -------------------------
+    @classmethod
+    def load(cls, index_dir: str, mmap: bool = True) -> "NumpyVectorStore":
+        """
+        Load a store saved with save().
+
+        Args:
+            index_dir: Directory containing embeddings.npy and records.json
+            mmap: Memory-map the embedding matrix instead of reading it into RAM
+
+        Returns:
+            NumpyVectorStore instance
+        """
+        embeddings = np.load(
+            os.path.join(index_dir, EMBEDDINGS_FILE),
+            mmap_mode="r" if mmap else None
+        )
+        with open(os.path.join(index_dir, RECORDS_FILE), "r", encoding="utf-8") as f:
+            records = json.load(f)
+
+        return cls(
+            embeddings=embeddings,
+            ids=records["ids"],
+            documents=records["documents"],
+            metadatas=records["metadatas"]
+        )
+
+    @classmethod
+    def from_chroma(cls, collection) -> "NumpyVectorStore":
+        """
+        Build a store from an existing Chroma collection.
+
+        Args:
+            collection: chromadb Collection with stored embeddings
+
+        Returns:
+            NumpyVectorStore instance holding the same rows
+        """
+        data = collection.get(include=["embeddings", "documents", "metadatas"])
+        embeddings = np.ascontiguousarray(np.asarray(data["embeddings"], dtype=np.float32))
+        return cls(
+            embeddings=embeddings,
+            ids=list(data["ids"]),
+            documents=list(data["documents"]),
+            metadatas=list(data["metadatas"])
+        )
+
+    def save(self, index_dir: str) -> None:
+        """
+        Persist the store as embeddings.npy + records.json.
+
+        Args:
+            index_dir: Target directory (created if missing)
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        np.save(
+            os.path.join(index_dir, EMBEDDINGS_FILE),
+            np.ascontiguousarray(self.embeddings, dtype=np.float32)
+        )
+        with open(os.path.join(index_dir, RECORDS_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "ids": self.ids,
+                "documents": self.documents,
+                "metadatas": self.metadatas
+            }, f, ensure_ascii=False)
+
+    # -------------------------
+    # Search
+    # -------------------------
+    def count(self) -> int:
+        """Number of indexed rows"""
+        return self.embeddings.shape[0]
+
+    @property
+    def dimension(self) -> int:
+        """Embedding dimension the index was built with"""
+        return self.embeddings.shape[1]
+
+    def search(self, query_vec: Sequence[float], top_k: int = 10, mask: Optional[np.ndarray] = None):
+        """
+        Exact top-k search for a single query vector.
+
+        Args:
+            query_vec: Normalized query embedding
+            top_k: Number of nearest rows to return
+            mask: Optional boolean row mask; only True rows are candidates
+
+        Returns:
+            Tuple of (row indices, cosine distances), best match first
+        """
+        q = np.asarray(query_vec, dtype=np.float32)
+        if q.shape != (self.dimension,):
+            raise ValueError(
+                f"Query dimension {q.shape[-1] if q.ndim else 0} does not match "
+                f"index dimension {self.dimension}"
+            )
+
+        candidates = None if mask is None else np.flatnonzero(mask)
+        n = self.count() if candidates is None else candidates.size
+        k = min(top_k, n)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = self.embeddings @ q
+        if candidates is not None:
+            scores = scores[candidates]
+
+        if k < n:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(n)
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        rows = top if candidates is None else candidates[top]
+        return rows, 1.0 - scores[top]
+
+    def query(
+        self,
+        query_embeddings: List[Sequence[float]],
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, List[List[Any]]]:
+        """
+        Chroma-compatible query.
+
+        Args:
+            query_embeddings: List of query vectors
+            n_results: Number of results per query
+            where: Optional Chroma-style metadata filter
+
+        Returns:
+            Dict with 'ids', 'documents', 'metadatas', 'distances' (one list per query)
+        """
+        mask = where_mask(self.metadatas, where) if where else None
+
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for query_vec in query_embeddings:
+            rows, distances = self.search(query_vec, top_k=n_results, mask=mask)
+            results["ids"].append([self.ids[i] for i in rows])
+            results["documents"].append([self.documents[i] for i in rows])
+            results["metadatas"].append([self.metadatas[i] for i in rows])
+            results["distances"].append([float(d) for d in distances])
+
+        return results